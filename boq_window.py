@@ -1,27 +1,261 @@
 """Smeta window implementation."""
 
+import hashlib
+import json
 import os
-from datetime import timezone
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
 import math
 import re
 
 from PyQt6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit,
-    QTableWidget, QTableWidgetItem, QPushButton, QHeaderView, QMessageBox,
+    QTableView, QPushButton, QHeaderView, QMessageBox,
     QDialog, QSpinBox, QDialogButtonBox, QRadioButton, QButtonGroup,
-    QFormLayout, QInputDialog, QComboBox, QDoubleSpinBox
+    QFormLayout, QInputDialog, QComboBox, QDoubleSpinBox, QProgressDialog,
+    QFileDialog, QCheckBox, QListView
 )
-from PyQt6.QtCore import Qt, QSettings
-from PyQt6.QtGui import QFont, QShortcut, QKeySequence
+from PyQt6.QtCore import (
+    Qt, QSettings, QTimer, QAbstractTableModel, QAbstractListModel, QModelIndex,
+    QObject, QThread, pyqtSignal, QCoreApplication
+)
+from PyQt6.QtGui import QShortcut, QKeySequence
 
-from dialogs import SmetaItemDialog
+from dialogs import SmetaItemDialog, _title_font
 from template_management import TemplateManagementWindow
 from currency_settings import CurrencySettingsManager
 
+try:
+    import orjson  # optional: much faster JSON encoding/decoding for large Smetas
+except ImportError:
+    orjson = None
+
+try:
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
+    from openpyxl.utils import get_column_letter
+    HAS_OPENPYXL = True
+except ImportError:
+    HAS_OPENPYXL = False
+
+
+
+# Non-standard shortcuts, built once instead of parsed from strings per window
+_EDIT_KEY = QKeySequence(Qt.Modifier.CTRL | Qt.Key.Key_E)
+_MOVE_UP_KEY = QKeySequence(Qt.Modifier.CTRL | Qt.Key.Key_Up)
+_MOVE_DOWN_KEY = QKeySequence(Qt.Modifier.CTRL | Qt.Key.Key_Down)
+
+
+def _json_bytes(data):
+    """Serialize data to indented UTF-8 JSON bytes, via orjson when installed"""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8')
+
+
+def _load_json(file_path):
+    """Read a UTF-8 JSON file in one read, parsing it with orjson when installed"""
+    with open(file_path, 'rb') as f:
+        data = f.read()
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+# Product fields needed to refresh the prices of a loaded Smeta
+_PRICE_REFRESH_PROJECTION = {
+    'price': 1, 'price_azn': 1, 'currency': 1,
+    'category': 1, 'mehsul_menbeyi': 1, 'qeyd': 1,
+}
+
+
+# Cloud Smetas fetched per page in the load-from-cloud dialog
+_CLOUD_BOQ_PAGE_SIZE = 50
+
+
+# Quantity/margin of an item that a combined Smeta does not contain
+_NO_COMBINED_ENTRY = {'quantity': 0, 'margin_percent': 0}
+
+
+def _load_combine_file(file_path):
+    """Read one Smeta file for combining; returns (boq, error message)"""
+    try:
+        boq_data = _load_json(file_path)
+        return {
+            'name': boq_data.get('boq_name', os.path.basename(file_path)),
+            'items': boq_data.get('items', [])
+        }, None
+    except Exception as e:
+        return None, str(e)
+
+
+# Button flags for yes/no confirmations, resolved once
+_YES = QMessageBox.StandardButton.Yes
+_YES_NO = QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+
+
+def _confirm(parent, title, text):
+    """Ask a yes/no question; True if the user answered yes"""
+    return QMessageBox.question(parent, title, text, _YES_NO) == _YES
+
+
+def _contiguous_ranges(rows):
+    """Group sorted row numbers into (first, last) runs of consecutive rows"""
+    ranges = []
+    for row in rows:
+        if ranges and row == ranges[-1][1] + 1:
+            ranges[-1][1] = row
+        else:
+            ranges.append([row, row])
+    return [tuple(r) for r in ranges]
+
+
+def _debounce_timer(parent, slot, msec):
+    """Single-shot timer that runs slot once its start() calls pause for msec"""
+    timer = QTimer(parent)
+    timer.setSingleShot(True)
+    timer.setInterval(msec)
+    timer.timeout.connect(slot)
+    return timer
+
+
+def _numeric_sort_key(key):
+    return lambda x: float(x.get(key, 0) or 0)
+
+
+def _text_sort_key(key):
+    return lambda x: str(x.get(key, '') or '').lower()
+
+
+# Sort key per table column, built once; list.sort calls it once per item
+_BOQ_SORT_KEYS = {
+    0: _numeric_sort_key('id'),
+    1: _text_sort_key('name'),
+    2: _text_sort_key('category'),
+    3: _numeric_sort_key('quantity'),
+    4: _text_sort_key('unit'),
+    5: lambda x: float(x.get('unit_price_azn', x.get('unit_price', 0)) or 0),
+    6: _numeric_sort_key('total'),
+    7: _numeric_sort_key('margin_percent'),
+    # Computed field: total * (1 + margin_percent/100)
+    8: lambda x: x.get('total', 0) * (1 + x.get('margin_percent', 0) / 100),
+    9: _text_sort_key('source'),
+    10: _text_sort_key('note'),
+    11: lambda x: x.get('is_custom', False),
+}
+
+# Light mode stylesheet for the whole Smeta window
+_BOQ_WINDOW_QSS = """
+QMainWindow {
+    background-color: #f5f5f5;
+}
+QTableView {
+    background-color: white;
+    border: 1px solid #ddd;
+    border-radius: 5px;
+}
+QLabel#boqTitle {
+    color: #2196F3;
+    padding: 10px;
+}
+QLabel#fieldLabel {
+    font-size: 14px;
+    font-weight: bold;
+}
+#headerInput {
+    font-size: 14px;
+    padding: 5px;
+}
+QLabel#costLabel {
+    font-size: 14px;
+    color: #666;
+    padding: 10px;
+}
+QLabel#marginTotalLabel {
+    font-size: 14px;
+    color: #FF9800;
+    padding: 10px;
+}
+QLabel#summaryLabel {
+    font-size: 16px;
+    font-weight: bold;
+    color: #4CAF50;
+    padding: 10px;
+}
+QPushButton#navBtn {
+    background-color: #607D8B;
+    color: white;
+    border: none;
+    border-radius: 4px;
+    font-weight: bold;
+}
+QPushButton#acBreakerBtn, QPushButton#acCableBtn {
+    color: white;
+    padding: 6px 12px;
+    border: none;
+    border-radius: 4px;
+    font-size: 12px;
+    font-weight: bold;
+}
+QPushButton#acBreakerBtn { background-color: #3F51B5; }
+QPushButton#acBreakerBtn:hover { background-color: #303F9F; }
+QPushButton#acCableBtn { background-color: #4CAF50; }
+QPushButton#acCableBtn:hover { background-color: #388E3C; }
+QPushButton#addCustomBtn {
+    background-color: #2196F3;
+    color: white;
+    padding: 8px 15px;
+    border: none;
+    border-radius: 5px;
+    font-size: 13px;
+    font-weight: bold;
+}
+QPushButton#addCustomBtn:hover { background-color: #0b7dda; }
+QPushButton#editBtn, QPushButton#deleteBtn, QPushButton#saveBoqBtn,
+QPushButton#loadBoqBtn, QPushButton#exportExcelBtn,
+QPushButton#loadCloudBoqBtn, QPushButton#combineBoqBtn,
+QPushButton#templateMgmtBtn {
+    color: white;
+    padding: 10px 20px;
+    border: none;
+    border-radius: 5px;
+    font-size: 14px;
+    font-weight: bold;
+}
+QPushButton#editBtn, QPushButton#loadBoqBtn { background-color: #FF9800; }
+QPushButton#editBtn:hover, QPushButton#loadBoqBtn:hover { background-color: #e68900; }
+QPushButton#deleteBtn { background-color: #f44336; }
+QPushButton#deleteBtn:hover { background-color: #da190b; }
+QPushButton#saveBoqBtn { background-color: #9C27B0; }
+QPushButton#saveBoqBtn:hover { background-color: #7B1FA2; }
+QPushButton#exportExcelBtn { background-color: #4CAF50; }
+QPushButton#exportExcelBtn:hover { background-color: #45a049; }
+QPushButton#loadCloudBoqBtn { background-color: #00BCD4; }
+QPushButton#loadCloudBoqBtn:hover { background-color: #0097A7; }
+QPushButton#combineBoqBtn { background-color: #673AB7; }
+QPushButton#combineBoqBtn:hover { background-color: #5E35B1; }
+QPushButton#templateMgmtBtn { background-color: #795548; }
+QPushButton#templateMgmtBtn:hover { background-color: #6D4C41; }
+"""
+
 
 class SmetaWindow(QMainWindow):
     """Bill of Quantities Window"""
 
+    # (attribute, label, slot, objectName, button row) for the bottom buttons
+    _ACTION_BUTTONS = (
+        ("add_custom_btn", "➕ Xüsusi Qeyd", "add_custom_item", "addCustomBtn", 1),
+        ("edit_btn", "✏️ Redaktə Et", "edit_item", "editBtn", 1),
+        ("delete_btn", "🗑️ Sil", "delete_item", "deleteBtn", 1),
+        ("save_boq_btn", "💾 Smeta Yadda Saxla", "save_boq", "saveBoqBtn", 1),
+        ("load_boq_btn", "📂 Smeta Yüklə", "load_boq", "loadBoqBtn", 1),
+        ("load_cloud_boq_btn", "☁️ Buluddan Yüklə", "load_from_cloud", "loadCloudBoqBtn", 2),
+        ("export_excel_btn", "📊 Excel-ə İxrac Et", "export_to_excel", "exportExcelBtn", 2),
+        ("combine_boq_btn", "🔗 Smeta-ları Birləşdir", "combine_boqs_to_excel", "combineBoqBtn", 2),
+        ("template_mgmt_btn", "📋 Şablonlar", "open_template_management", "templateMgmtBtn", 2),
+    )
+
     def __init__(self, parent=None, db=None):
         super().__init__(parent)
         self.parent_window = parent
@@ -31,7 +265,20 @@ class SmetaWindow(QMainWindow):
         self.next_id = 1
         self.boq_name = "Smeta 1"  # Default name
         self.string_count = 0
-        self._updating_table = False
+        self._export_thread = None
+        self._export_worker = None
+        self._export_progress = None
+        self._cloud_save_thread = None
+        self._cloud_save_worker = None
+        self._cloud_save_message = ""
+        # Closing only hides this window, so a running export or cloud save
+        # carries on; it must still finish before the application exits
+        QCoreApplication.instance().aboutToQuit.connect(self._finish_background_tasks)
+        # Content hashes of the last local/cloud save, to skip unchanged saves
+        self._last_saved_hash = None
+        self._last_saved_path = None
+        self._last_cloud_hash = None
+        self._pending_cloud_hash = None
         self._breaker_ratings = [
             6, 10, 16, 20, 25, 32, 40, 50, 63,
             80, 100, 125, 160, 200, 250, 320, 400
@@ -71,78 +318,51 @@ class SmetaWindow(QMainWindow):
         title_layout = QHBoxLayout()
 
         title = QLabel("Bill of Quantities")
-        title_font = QFont()
-        title_font.setPointSize(16)
-        title_font.setBold(True)
-        title.setFont(title_font)
-        title.setStyleSheet("color: #2196F3; padding: 10px;")
+        title.setFont(_title_font(16))
+        title.setObjectName("boqTitle")
 
         # Move Up/Down buttons (small, at top)
         self.move_up_btn = QPushButton("⬆️")
         self.move_up_btn.clicked.connect(self.move_item_up)
         self.move_up_btn.setFixedSize(40, 30)
-        self.move_up_btn.setStyleSheet("background-color: #607D8B; color: white; border: none; border-radius: 4px; font-weight: bold;")
+        self.move_up_btn.setObjectName("navBtn")
         self.move_up_btn.setToolTip("Yuxarı daşı (Ctrl+Up)")
 
         self.move_down_btn = QPushButton("⬇️")
         self.move_down_btn.clicked.connect(self.move_item_down)
         self.move_down_btn.setFixedSize(40, 30)
-        self.move_down_btn.setStyleSheet("background-color: #607D8B; color: white; border: none; border-radius: 4px; font-weight: bold;")
+        self.move_down_btn.setObjectName("navBtn")
         self.move_down_btn.setToolTip("Aşağı daşı (Ctrl+Down)")
 
         # Smeta Name input
         name_label = QLabel("Smeta Adı:")
-        name_label.setStyleSheet("font-size: 14px; font-weight: bold;")
+        name_label.setObjectName("fieldLabel")
         self.boq_name_input = QLineEdit(self.boq_name)
         self.boq_name_input.setMaximumWidth(200)
-        self.boq_name_input.setStyleSheet("font-size: 14px; padding: 5px;")
-        self.boq_name_input.textChanged.connect(self.update_boq_name)
+        self.boq_name_input.setObjectName("headerInput")
+        # Apply the name once typing pauses rather than on every keystroke
+        self._name_timer = _debounce_timer(self, self.update_boq_name, 200)
+        self.boq_name_input.textChanged.connect(self._name_timer.start)
 
         # String count input
         string_label = QLabel("String Sayı:")
-        string_label.setStyleSheet("font-size: 14px; font-weight: bold;")
+        string_label.setObjectName("fieldLabel")
         self.string_input = QSpinBox()
         self.string_input.setRange(0, 999999)
         self.string_input.setValue(self.string_count)
         self.string_input.setMaximumWidth(120)
-        self.string_input.setStyleSheet("font-size: 14px; padding: 5px;")
+        self.string_input.setObjectName("headerInput")
         self.string_input.valueChanged.connect(self.update_string_count)
 
         # AC Breaker Wizard button
         self.ac_breaker_btn = QPushButton("⚡ AC Avtomat Sehirbazı")
         self.ac_breaker_btn.clicked.connect(self.open_ac_breaker_wizard)
-        self.ac_breaker_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #3F51B5;
-                color: white;
-                padding: 6px 12px;
-                border: none;
-                border-radius: 4px;
-                font-size: 12px;
-                font-weight: bold;
-            }
-            QPushButton:hover {
-                background-color: #303F9F;
-            }
-        """)
+        self.ac_breaker_btn.setObjectName("acBreakerBtn")
 
         # AC Cable Wizard button
         self.ac_cable_btn = QPushButton("🔌 AC Kabel Sehirbazı")
         self.ac_cable_btn.clicked.connect(self.open_ac_cable_wizard)
-        self.ac_cable_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #4CAF50;
-                color: white;
-                padding: 6px 12px;
-                border: none;
-                border-radius: 4px;
-                font-size: 12px;
-                font-weight: bold;
-            }
-            QPushButton:hover {
-                background-color: #388E3C;
-            }
-        """)
+        self.ac_cable_btn.setObjectName("acCableBtn")
 
         title_layout.addWidget(title)
         title_layout.addWidget(self.ac_breaker_btn)
@@ -157,30 +377,27 @@ class SmetaWindow(QMainWindow):
 
         main_layout.addLayout(title_layout)
 
-        # Table with margin column
-        self.table = QTableWidget()
-        self.table.setColumnCount(12)
-        self.table.setHorizontalHeaderLabels([
-            "№", "Adı", "Kateqoriya", "Miqdar", "Ölçü Vahidi", "Vahid Qiymət", "Cəmi", "Marja %", "Yekun", "Mənbə", "Qeyd", "Növ"
-        ])
+        # Table with margin column (model reads straight from boq_items)
+        self.table = QTableView()
+        self.table_model = SmetaTableModel(self)
+        self.table.setModel(self.table_model)
         self._hide_table_row_header()
 
         # Table styling
         self.table.setAlternatingRowColors(True)
-        self.table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        self.table.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
         self.table.setEditTriggers(
-            QTableWidget.EditTrigger.SelectedClicked | QTableWidget.EditTrigger.EditKeyPressed
+            QTableView.EditTrigger.SelectedClicked | QTableView.EditTrigger.EditKeyPressed
         )
-        self.table.setSortingEnabled(True)  # Enable column sorting
-        self.table.itemChanged.connect(self.on_table_item_changed)
 
-        # Resize columns
+        # Resize columns; sorting is done on boq_items by sort_by_column
         header = self.table.horizontalHeader()
+        header.setSectionsClickable(True)
         header.setSortIndicatorShown(True)
         header.sectionClicked.connect(self.sort_by_column)
         
         # Set interactive resizing
-        for i in range(self.table.columnCount()):
+        for i in range(self.table_model.columnCount()):
             header.setSectionResizeMode(i, QHeaderView.ResizeMode.Interactive)
         
         # Set default column widths and minimums
@@ -197,7 +414,7 @@ class SmetaWindow(QMainWindow):
         header.sectionResized.connect(self.on_column_resized)
 
         main_layout.addWidget(self.table)
-        self.table.cellDoubleClicked.connect(self.on_table_double_clicked)
+        self.table.doubleClicked.connect(self.on_table_double_clicked)
         self.table.installEventFilter(self)
 
         # Summary labels
@@ -205,13 +422,15 @@ class SmetaWindow(QMainWindow):
         summary_layout.addStretch()
 
         self.cost_label = QLabel("Maya Dəyəri: 0.00 AZN")
-        self.cost_label.setStyleSheet("font-size: 14px; color: #666; padding: 10px;")
+        self.cost_label.setObjectName("costLabel")
 
         self.margin_total_label = QLabel("Ümumi Marja: 0.00 AZN")
-        self.margin_total_label.setStyleSheet("font-size: 14px; color: #FF9800; padding: 10px;")
+        self.margin_total_label.setObjectName("marginTotalLabel")
 
         self.summary_label = QLabel("Yekun Məbləğ: 0.00 AZN")
-        self.summary_label.setStyleSheet("font-size: 16px; font-weight: bold; color: #4CAF50; padding: 10px;")
+        self.summary_label.setObjectName("summaryLabel")
+        # Inline edits in quick succession recompute the totals only once
+        self._summary_timer = _debounce_timer(self, self.update_summary, 50)
 
         summary_layout.addWidget(self.cost_label)
         summary_layout.addWidget(self.margin_total_label)
@@ -219,194 +438,28 @@ class SmetaWindow(QMainWindow):
 
         main_layout.addLayout(summary_layout)
 
-        # Buttons - reorganized into two rows
+        # Buttons - reorganized into two rows (row 1: edit actions,
+        # row 2: export/cloud/templates); styles come from objectName
         button_layout1 = QHBoxLayout()
         button_layout2 = QHBoxLayout()
 
-        self.add_custom_btn = QPushButton("➕ Xüsusi Qeyd")
-        self.add_custom_btn.clicked.connect(self.add_custom_item)
-        self.add_custom_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #2196F3;
-                color: white;
-                padding: 8px 15px;
-                border: none;
-                border-radius: 5px;
-                font-size: 13px;
-                font-weight: bold;
-            }
-            QPushButton:hover {
-                background-color: #0b7dda;
-            }
-        """)
-
-        self.edit_btn = QPushButton("✏️ Redaktə Et")
-        self.edit_btn.clicked.connect(self.edit_item)
-        self.edit_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #FF9800;
-                color: white;
-                padding: 10px 20px;
-                border: none;
-                border-radius: 5px;
-                font-size: 14px;
-                font-weight: bold;
-            }
-            QPushButton:hover {
-                background-color: #e68900;
-            }
-        """)
-
-        self.delete_btn = QPushButton("🗑️ Sil")
-        self.delete_btn.clicked.connect(self.delete_item)
-        self.delete_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #f44336;
-                color: white;
-                padding: 10px 20px;
-                border: none;
-                border-radius: 5px;
-                font-size: 14px;
-                font-weight: bold;
-            }
-            QPushButton:hover {
-                background-color: #da190b;
-            }
-        """)
-
-        self.save_boq_btn = QPushButton("💾 Smeta Yadda Saxla")
-        self.save_boq_btn.clicked.connect(self.save_boq)
-        self.save_boq_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #9C27B0;
-                color: white;
-                padding: 10px 20px;
-                border: none;
-                border-radius: 5px;
-                font-size: 14px;
-                font-weight: bold;
-            }
-            QPushButton:hover {
-                background-color: #7B1FA2;
-            }
-        """)
-
-        self.load_boq_btn = QPushButton("📂 Smeta Yüklə")
-        self.load_boq_btn.clicked.connect(self.load_boq)
-        self.load_boq_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #FF9800;
-                color: white;
-                padding: 10px 20px;
-                border: none;
-                border-radius: 5px;
-                font-size: 14px;
-                font-weight: bold;
-            }
-            QPushButton:hover {
-                background-color: #e68900;
-            }
-        """)
-
-        self.export_excel_btn = QPushButton("📊 Excel-ə İxrac Et")
-        self.export_excel_btn.clicked.connect(self.export_to_excel)
-        self.export_excel_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #4CAF50;
-                color: white;
-                padding: 10px 20px;
-                border: none;
-                border-radius: 5px;
-                font-size: 14px;
-                font-weight: bold;
-            }
-            QPushButton:hover {
-                background-color: #45a049;
-            }
-        """)
-
-        self.load_cloud_boq_btn = QPushButton("☁️ Buluddan Yüklə")
-        self.load_cloud_boq_btn.clicked.connect(self.load_from_cloud)
-        self.load_cloud_boq_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #00BCD4;
-                color: white;
-                padding: 10px 20px;
-                border: none;
-                border-radius: 5px;
-                font-size: 14px;
-                font-weight: bold;
-            }
-            QPushButton:hover {
-                background-color: #0097A7;
-            }
-        """)
-
-        self.combine_boq_btn = QPushButton("🔗 Smeta-ları Birləşdir")
-        self.combine_boq_btn.clicked.connect(self.combine_boqs_to_excel)
-        self.combine_boq_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #673AB7;
-                color: white;
-                padding: 10px 20px;
-                border: none;
-                border-radius: 5px;
-                font-size: 14px;
-                font-weight: bold;
-            }
-            QPushButton:hover {
-                background-color: #5E35B1;
-            }
-        """)
-
-        # Template Management button
-        self.template_mgmt_btn = QPushButton("📋 Şablonlar")
-        self.template_mgmt_btn.clicked.connect(self.open_template_management)
-        self.template_mgmt_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #795548;
-                color: white;
-                padding: 10px 20px;
-                border: none;
-                border-radius: 5px;
-                font-size: 14px;
-                font-weight: bold;
-            }
-            QPushButton:hover {
-                background-color: #6D4C41;
-            }
-        """)
-
-        # Row 1: Edit actions
-        button_layout1.addWidget(self.add_custom_btn)
-        button_layout1.addWidget(self.edit_btn)
-        button_layout1.addWidget(self.delete_btn)
-        button_layout1.addWidget(self.save_boq_btn)
-        button_layout1.addWidget(self.load_boq_btn)
-        button_layout1.addStretch()
+        for attr, text, slot, object_name, row in self._ACTION_BUTTONS:
+            button = QPushButton(text)
+            button.clicked.connect(getattr(self, slot))
+            button.setObjectName(object_name)
+            setattr(self, attr, button)
+            (button_layout1 if row == 1 else button_layout2).addWidget(button)
 
-        # Row 2: Export/Cloud/Templates
-        button_layout2.addWidget(self.load_cloud_boq_btn)
-        button_layout2.addWidget(self.export_excel_btn)
-        button_layout2.addWidget(self.combine_boq_btn)
-        button_layout2.addWidget(self.template_mgmt_btn)
+        button_layout1.addStretch()
         button_layout2.addStretch()
 
         main_layout.addLayout(button_layout1)
         main_layout.addLayout(button_layout2)
         central_widget.setLayout(main_layout)
 
-        # Apply light mode styling
-        self.setStyleSheet("""
-            QMainWindow {
-                background-color: #f5f5f5;
-            }
-            QTableWidget {
-                background-color: white;
-                border: 1px solid #ddd;
-                border-radius: 5px;
-            }
-        """)
+        # Apply light mode styling; widgets are matched by objectName so the
+        # whole window is styled from this one sheet
+        self.setStyleSheet(_BOQ_WINDOW_QSS)
 
         # Setup keyboard shortcuts
         self.setup_shortcuts()
@@ -414,23 +467,23 @@ class SmetaWindow(QMainWindow):
     def setup_shortcuts(self):
         """Setup keyboard shortcuts for SmetaWindow"""
         # Ctrl+S: Save Smeta
-        QShortcut(QKeySequence("Ctrl+S"), self).activated.connect(self.save_boq)
+        QShortcut(QKeySequence.StandardKey.Save, self).activated.connect(self.save_boq)
 
         # Ctrl+O: Load Smeta
-        QShortcut(QKeySequence("Ctrl+O"), self).activated.connect(self.load_boq)
+        QShortcut(QKeySequence.StandardKey.Open, self).activated.connect(self.load_boq)
 
         # Ctrl+E: Edit selected item
-        QShortcut(QKeySequence("Ctrl+E"), self).activated.connect(self.edit_item)
+        QShortcut(_EDIT_KEY, self).activated.connect(self.edit_item)
         # Enter handling is implemented via eventFilter on the table.
 
         # Delete: Delete selected item(s)
-        QShortcut(QKeySequence("Delete"), self).activated.connect(self.delete_item)
+        QShortcut(QKeySequence.StandardKey.Delete, self).activated.connect(self.delete_item)
 
         # Ctrl+Up: Move item up
-        QShortcut(QKeySequence("Ctrl+Up"), self).activated.connect(self.move_item_up)
+        QShortcut(_MOVE_UP_KEY, self).activated.connect(self.move_item_up)
 
         # Ctrl+Down: Move item down
-        QShortcut(QKeySequence("Ctrl+Down"), self).activated.connect(self.move_item_down)
+        QShortcut(_MOVE_DOWN_KEY, self).activated.connect(self.move_item_down)
 
     def _hide_table_row_header(self):
         """Hide Qt's separate row-number gutter from the BOQ table."""
@@ -448,21 +501,13 @@ class SmetaWindow(QMainWindow):
 
         dialog = SmetaItemDialog(self, self.db, mode="add_from_db", string_count=self.string_count)
         if dialog.exec():
-            data = dialog.get_data()
-            data['id'] = self.next_id
-            self.next_id += 1
-            self.boq_items.append(data)
-            self.refresh_table()
+            self.append_items([dialog.get_data()])
 
     def add_custom_item(self):
         """Add custom item (not from database)"""
         dialog = SmetaItemDialog(self, self.db, mode="custom", string_count=self.string_count)
         if dialog.exec():
-            data = dialog.get_data()
-            data['id'] = self.next_id
-            self.next_id += 1
-            self.boq_items.append(data)
-            self.refresh_table()
+            self.append_items([dialog.get_data()])
 
     def open_ac_breaker_wizard(self):
         """Collect inverter specs, calculate breaker ratings, and add to BoQ."""
@@ -776,10 +821,7 @@ class SmetaWindow(QMainWindow):
 
         # Show preview and confirm
         details = f"Kabel ölçüsü: {phase_size} mm² (faza) + {neutral_size} mm² (neytral)\nParalel: {n_parallel}\nGərginlik düşümü: {v_drop:.2f} V ({drop_percent:.2f}%)\nAdı: {name}\nMiqdar: {distance} m\nHesab üçün: {kva}kVA, {pf}pf, {voltage}V, {max_drop_percent}% düşmə limiti"
-        reply = QMessageBox.question(self, "Kabel Hesablandı", details + "\n\nBOQ-ya əlavə etmək istəyirsiniz?", 
-                                   QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
-
-        if reply == QMessageBox.StandardButton.Yes:
+        if _confirm(self, "Kabel Hesablandı", details + "\n\nBOQ-ya əlavə etmək istəyirsiniz?"):
             existing_item = self._find_boq_item_by_name(name)
             if existing_item:
                 existing_item['quantity'] = existing_item.get('quantity', 0) + (distance * n_parallel)
@@ -878,7 +920,7 @@ class SmetaWindow(QMainWindow):
         """Edit selected item"""
         if not self.isActiveWindow():
             return
-        selected_row = self.table.currentRow()
+        selected_row = self.table.currentIndex().row()
         if selected_row < 0:
             QMessageBox.warning(self, "Xəbərdarlıq", "Redaktə etmək üçün qeyd seçin!")
             return
@@ -890,12 +932,14 @@ class SmetaWindow(QMainWindow):
         if dialog.exec():
             data = dialog.get_data()
             data['id'] = item['id']
+            self._ensure_item_totals(data)
             self.boq_items[selected_row] = data
-            self.refresh_table()
+            self.table_model.rows_changed(selected_row)
+            self._summary_timer.start()
 
-    def on_table_double_clicked(self, row, column):
+    def on_table_double_clicked(self, index):
         """Handle double click on table cells."""
-        if column in (3, 7):
+        if index.column() in (3, 7):
             return
         self.edit_item()
 
@@ -921,27 +965,18 @@ class SmetaWindow(QMainWindow):
         else:
             message = f"{len(selected_rows)} qeydi silmək istədiyinizdən əminsiniz?"
 
-        reply = QMessageBox.question(
-            self,
-            "Təsdiq",
-            message,
-            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
-        )
-
-        if reply == QMessageBox.StandardButton.Yes:
-            # Get row indices and sort in descending order
-            # This allows us to delete from bottom to top without affecting other indices
-            rows_to_delete = sorted([index.row() for index in selected_rows], reverse=True)
+        if _confirm(self, "Təsdiq", message):
+            # Remove contiguous runs of rows bottom to top, so earlier
+            # indices stay valid and each run is one slice deletion
+            rows = sorted(index.row() for index in selected_rows)
+            for first, last in reversed(_contiguous_ranges(rows)):
+                self.table_model.remove_rows(first, last)
 
-            # Delete items from the list
-            for row in rows_to_delete:
-                del self.boq_items[row]
-
-            self.refresh_table()
+            self.update_summary()
 
     def move_item_up(self):
         """Move selected item up in the list"""
-        selected_row = self.table.currentRow()
+        selected_row = self.table.currentIndex().row()
         if selected_row < 0:
             QMessageBox.warning(self, "Xəbərdarlıq", "Yuxarı daşımaq üçün qeyd seçin!")
             return
@@ -953,16 +988,16 @@ class SmetaWindow(QMainWindow):
         self.boq_items[selected_row], self.boq_items[selected_row - 1] = \
             self.boq_items[selected_row - 1], self.boq_items[selected_row]
 
-        # Renumber items
+        # Renumber items; only the two swapped rows need repainting
         self._renumber_items()
-        self.refresh_table()
+        self.table_model.rows_changed(selected_row - 1, selected_row)
 
         # Keep selection on the moved item
         self.table.selectRow(selected_row - 1)
 
     def move_item_down(self):
         """Move selected item down in the list"""
-        selected_row = self.table.currentRow()
+        selected_row = self.table.currentIndex().row()
         if selected_row < 0:
             QMessageBox.warning(self, "Xəbərdarlıq", "Aşağı daşımaq üçün qeyd seçin!")
             return
@@ -974,9 +1009,9 @@ class SmetaWindow(QMainWindow):
         self.boq_items[selected_row], self.boq_items[selected_row + 1] = \
             self.boq_items[selected_row + 1], self.boq_items[selected_row]
 
-        # Renumber items
+        # Renumber items; only the two swapped rows need repainting
         self._renumber_items()
-        self.refresh_table()
+        self.table_model.rows_changed(selected_row, selected_row + 1)
 
         # Keep selection on the moved item
         self.table.selectRow(selected_row + 1)
@@ -989,86 +1024,53 @@ class SmetaWindow(QMainWindow):
 
     def refresh_table(self):
         """Refresh the Smeta table"""
-        self._updating_table = True
         self._hide_table_row_header()
-        self.table.setRowCount(0)
-
         for item in self.boq_items:
-            row_position = self.table.rowCount()
-            self.table.insertRow(row_position)
-
-            # Get margin percent (default 0)
-            margin_pct = item.get('margin_percent', 0)
-            currency = item.get('currency', 'AZN') or 'AZN'
-            unit_price = item.get('unit_price', 0)
-            unit_price_azn = item.get('unit_price_azn')
-            if unit_price_azn is None:
-                unit_price_azn = self.currency_manager.convert_to_azn(unit_price, currency)
-                item['unit_price_azn'] = unit_price_azn
-
-            cost_total = item.get('total')
-            if cost_total is None:
-                cost_total = item.get('quantity', 0) * unit_price_azn
-                item['total'] = cost_total
-            final_total = cost_total * (1 + margin_pct / 100)
-
-            # Column 0: №
-            id_item = QTableWidgetItem(str(item['id']))
-            id_item.setFlags(id_item.flags() & ~Qt.ItemFlag.ItemIsEditable)
-            self.table.setItem(row_position, 0, id_item)
-            # Column 1: Adı
-            name_item = QTableWidgetItem(item['name'])
-            name_item.setFlags(name_item.flags() & ~Qt.ItemFlag.ItemIsEditable)
-            self.table.setItem(row_position, 1, name_item)
-            # Column 2: Kateqoriya
-            category_item = QTableWidgetItem(item.get('category', '') or 'N/A')
-            category_item.setFlags(category_item.flags() & ~Qt.ItemFlag.ItemIsEditable)
-            self.table.setItem(row_position, 2, category_item)
-            # Column 3: Miqdar
-            quantity_item = QTableWidgetItem(f"{item['quantity']:.2f}")
-            quantity_item.setFlags(quantity_item.flags() | Qt.ItemFlag.ItemIsEditable)
-            self.table.setItem(row_position, 3, quantity_item)
-            # Column 4: Ölçü Vahidi
-            unit_item = QTableWidgetItem(item['unit'])
-            unit_item.setFlags(unit_item.flags() & ~Qt.ItemFlag.ItemIsEditable)
-            self.table.setItem(row_position, 4, unit_item)
-            # Column 5: Vahid Qiymət
-            if currency == "AZN":
-                price_text = f"{unit_price:.2f} AZN"
-            else:
-                price_text = f"AZN {unit_price_azn:.2f} ({unit_price:.2f} {currency})"
-            price_item = QTableWidgetItem(price_text)
-            price_item.setFlags(price_item.flags() | Qt.ItemFlag.ItemIsEditable)
-            self.table.setItem(row_position, 5, price_item)
-            # Column 6: Cəmi (cost)
-            cost_item = QTableWidgetItem(f"{cost_total:.2f}")
-            cost_item.setFlags(cost_item.flags() & ~Qt.ItemFlag.ItemIsEditable)
-            self.table.setItem(row_position, 6, cost_item)
-            # Column 7: Marja %
-            margin_item = QTableWidgetItem(f"{margin_pct:.1f}%")
-            margin_item.setFlags(margin_item.flags() | Qt.ItemFlag.ItemIsEditable)
-            self.table.setItem(row_position, 7, margin_item)
-            # Column 8: Yekun (with margin)
-            final_item = QTableWidgetItem(f"{final_total:.2f}")
-            final_item.setFlags(final_item.flags() & ~Qt.ItemFlag.ItemIsEditable)
-            self.table.setItem(row_position, 8, final_item)
-            # Column 9: Mənbə
-            source_item = QTableWidgetItem(item.get('source', '') or 'N/A')
-            source_item.setFlags(source_item.flags() & ~Qt.ItemFlag.ItemIsEditable)
-            self.table.setItem(row_position, 9, source_item)
-            # Column 10: Qeyd
-            note_item = QTableWidgetItem(item.get('note', '') or 'N/A')
-            note_item.setFlags(note_item.flags() & ~Qt.ItemFlag.ItemIsEditable)
-            self.table.setItem(row_position, 10, note_item)
-            # Column 11: Növ
-            item_type = "Xüsusi" if item.get('is_custom') else "DB"
-            type_item = QTableWidgetItem(item_type)
-            type_item.setFlags(type_item.flags() & ~Qt.ItemFlag.ItemIsEditable)
-            self.table.setItem(row_position, 11, type_item)
+            self._ensure_item_totals(item)
+        self.table_model.refresh()
 
         # Update summary
         self.update_summary()
-        self._updating_table = False
+
+    def _ensure_item_totals(self, item):
+        """Fill in AZN unit price and cost total for items that lack them"""
+        currency = item.get('currency', 'AZN') or 'AZN'
+        unit_price = item.get('unit_price', 0)
+        unit_price_azn = item.get('unit_price_azn')
+        if unit_price_azn is None:
+            unit_price_azn = self.currency_manager.convert_to_azn(unit_price, currency)
+            item['unit_price_azn'] = unit_price_azn
+        if item.get('total') is None:
+            item['total'] = item.get('quantity', 0) * unit_price_azn
+
+    def reset_boq(self, db=None):
+        """Start a fresh, empty Smeta so a closed window can be shown again
+        instead of building all of its widgets anew"""
+        if db is not self.db:
+            self.db = db
+            self.currency_manager = CurrencySettingsManager(self.db)
+        self.boq_items = []
+        self.next_id = 1
+        self.string_count = 0
+        # Earlier save hashes describe another Smeta (and maybe another
+        # database); a cloud save still in flight must not mark this one saved
+        self._last_saved_hash = None
+        self._last_saved_path = None
+        self._last_cloud_hash = None
+        self._pending_cloud_hash = None
+        self.boq_name_input.setText("Smeta 1")
+        self.update_boq_name()
+        self.string_input.setValue(self.string_count)
+        self.refresh_table()
+
+    def append_items(self, items):
+        """Number items and append them, inserting only their rows into the table"""
+        for item in items:
+            item['id'] = self.next_id
+            self.next_id += 1
+            self._ensure_item_totals(item)
+        self.table_model.append_items(items)
+        self._summary_timer.start()
 
     def on_column_resized(self, logicalIndex, oldSize, newSize):
         """Save column width preferences, ensuring minimum size."""
@@ -1082,19 +1084,16 @@ class SmetaWindow(QMainWindow):
         self.column_widths[logicalIndex] = newSize
         self.settings.setValue(f"column_width_{logicalIndex}", newSize)
 
-    def on_table_item_changed(self, item):
-        """Handle inline edits in the Smeta table."""
-        if self._updating_table:
-            return
-        if item.column() not in (3, 7):
-            return
+    def apply_cell_edit(self, row, column, text):
+        """Handle inline edits in the Smeta table; returns True if applied."""
+        if column not in (3, 7):
+            return False
 
-        row = item.row()
         if row < 0 or row >= len(self.boq_items):
-            return
+            return False
 
-        if item.column() == 3:
-            text = item.text().strip().replace(',', '.')
+        if column == 3:
+            text = text.strip().replace(',', '.')
             if not text:
                 quantity = self.boq_items[row].get('quantity', 1)
             else:
@@ -1114,23 +1113,10 @@ class SmetaWindow(QMainWindow):
             total = quantity * unit_price_azn
             self.boq_items[row]['total'] = total
 
-            margin_pct = self.boq_items[row].get('margin_percent', 0)
-            final_total = total * (1 + margin_pct / 100)
-
-            self._updating_table = True
-            item.setText(f"{quantity:.2f}")
-            cost_item = self.table.item(row, 6)
-            if cost_item:
-                cost_item.setText(f"{total:.2f}")
-            final_item = self.table.item(row, 8)
-            if final_item:
-                final_item.setText(f"{final_total:.2f}")
-            self._updating_table = False
-
-            self.update_summary()
-            return
-        if item.column() == 5:
-            text = item.text().strip().replace(',', '.')
+            self._summary_timer.start()
+            return True
+        if column == 5:
+            text = text.strip().replace(',', '.')
             numbers = re.findall(r"[-+]?\d*\.?\d+", text)
             if not numbers:
                 unit_price_azn = self.boq_items[row].get('unit_price_azn', 0)
@@ -1149,23 +1135,10 @@ class SmetaWindow(QMainWindow):
             total = quantity * unit_price_azn
             self.boq_items[row]['total'] = total
 
-            margin_pct = self.boq_items[row].get('margin_percent', 0)
-            final_total = total * (1 + margin_pct / 100)
-
-            self._updating_table = True
-            item.setText(f"{unit_price_azn:.2f} AZN")
-            cost_item = self.table.item(row, 6)
-            if cost_item:
-                cost_item.setText(f"{total:.2f}")
-            final_item = self.table.item(row, 8)
-            if final_item:
-                final_item.setText(f"{final_total:.2f}")
-            self._updating_table = False
+            self._summary_timer.start()
+            return True
 
-            self.update_summary()
-            return
-
-        text = item.text().strip().replace('%', '')
+        text = text.strip().replace('%', '')
         text = text.replace(',', '.')
         if not text:
             margin_pct = 0.0
@@ -1178,22 +1151,19 @@ class SmetaWindow(QMainWindow):
         margin_pct = max(0.0, min(100.0, margin_pct))
         self.boq_items[row]['margin_percent'] = margin_pct
 
-        cost_total = self.boq_items[row].get('total', 0)
-        final_total = cost_total * (1 + margin_pct / 100)
-
-        self._updating_table = True
-        item.setText(f"{margin_pct:.1f}%")
-        final_item = self.table.item(row, 8)
-        if final_item:
-            final_item.setText(f"{final_total:.2f}")
-        self._updating_table = False
-
-        self.update_summary()
+        self._summary_timer.start()
+        return True
 
     def update_summary(self):
         """Update the summary labels with cost total, margin total, and final amount"""
-        cost_total = sum(item['total'] for item in self.boq_items)
-        margin_total = sum(item['total'] * (item.get('margin_percent', 0) / 100) for item in self.boq_items)
+        self._summary_timer.stop()
+        # One pass over the items for both totals
+        cost_total = margin_total = 0.0
+        for item in self.boq_items:
+            total = item['total']
+            cost_total += total
+            margin_total += total * item.get('margin_percent', 0)
+        margin_total /= 100
         final_total = cost_total + margin_total
 
         self.cost_label.setText(f"Maya Dəyəri: {cost_total:.2f} AZN")
@@ -1202,24 +1172,8 @@ class SmetaWindow(QMainWindow):
 
     def sort_by_column(self, column):
         """Sort boq_items by the clicked column"""
-        # Map column indices to item keys
-        column_keys = {
-            0: 'id',
-            1: 'name',
-            2: 'category',
-            3: 'quantity',
-            4: 'unit',
-            5: 'unit_price',
-            6: 'total',
-            7: 'margin_percent',
-            8: 'final_total',  # computed, not stored
-            9: 'source',
-            10: 'note',
-            11: 'is_custom'
-        }
-
-        key = column_keys.get(column)
-        if not key:
+        sort_key = _BOQ_SORT_KEYS.get(column)
+        if sort_key is None:
             return
 
         # Check current sort order from header
@@ -1229,283 +1183,110 @@ class SmetaWindow(QMainWindow):
         # Sort the boq_items list
         reverse = (current_order == Qt.SortOrder.DescendingOrder)
 
+        self.table_model.layoutAboutToBeChanged.emit()
         try:
-            if key == 'final_total':
-                # Computed field: total * (1 + margin_percent/100)
-                self.boq_items.sort(key=lambda x: x.get('total', 0) * (1 + x.get('margin_percent', 0) / 100), reverse=reverse)
-            elif key in ['quantity', 'unit_price', 'total', 'id', 'margin_percent']:
-                # Numeric sort
-                if key == 'unit_price':
-                    self.boq_items.sort(key=lambda x: float(x.get('unit_price_azn', x.get('unit_price', 0)) or 0), reverse=reverse)
-                else:
-                    self.boq_items.sort(key=lambda x: float(x.get(key, 0) or 0), reverse=reverse)
-            elif key == 'is_custom':
-                # Boolean sort
-                self.boq_items.sort(key=lambda x: x.get(key, False), reverse=reverse)
-            else:
-                # String sort
-                self.boq_items.sort(key=lambda x: str(x.get(key, '') or '').lower(), reverse=reverse)
+            self.boq_items.sort(key=sort_key, reverse=reverse)
 
             # Renumber after sort
             self._renumber_items()
 
-            # Refresh table without triggering sort again
-            self.table.setSortingEnabled(False)
-            self.refresh_table()
-            self.table.setSortingEnabled(True)
-
         except Exception as e:
             print(f"Sort error: {e}")
+        finally:
+            # Reordering leaves totals untouched, so no summary update
+            self.table_model.layoutChanged.emit()
 
     def export_to_excel(self):
-        """Export Smeta to Excel file"""
+        """Export Smeta to Excel file (workbook is written in background)"""
         if not self.boq_items:
             QMessageBox.warning(self, "Xəbərdarlıq", "Smeta boşdur! İxrac etmək üçün məhsul əlavə edin.")
             return
+        if self._export_thread is not None:
+            return
 
-        try:
-            # Import openpyxl
-            try:
-                from openpyxl import Workbook
-                from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
-            except ImportError:
-                QMessageBox.critical(
-                    self,
-                    "Xəta",
-                    "openpyxl kitabxanası tapılmadı!\n\nYükləmək üçün terminal-da:\npip install openpyxl"
-                )
-                return
-
-            # Ask user for file location
-            from PyQt6.QtWidgets import QFileDialog
-            file_path, _ = QFileDialog.getSaveFileName(
-                self,
-                "Smeta-u Excel-ə İxrac Et",
-                "Smeta.xlsx",
-                "Excel Files (*.xlsx)"
-            )
-
-            if not file_path:
-                return
-
-            # Create workbook
-            wb = Workbook()
-            ws = wb.active
-            ws.title = "Bill of Quantities"
-
-            # Define styles
-            header_fill = PatternFill(start_color="2196F3", end_color="2196F3", fill_type="solid")
-            header_font = Font(bold=True, color="FFFFFF", size=12)
-            header_alignment = Alignment(horizontal="center", vertical="center")
+        # Check openpyxl is available before asking for a file name
+        if not self._require_openpyxl():
+            return
 
-            total_fill = PatternFill(start_color="4CAF50", end_color="4CAF50", fill_type="solid")
-            total_font = Font(bold=True, color="FFFFFF", size=12)
+        # Ask user for file location
+        file_path, _ = QFileDialog.getSaveFileName(
+            self,
+            "Smeta-u Excel-ə İxrac Et",
+            "Smeta.xlsx",
+            "Excel Files (*.xlsx)"
+        )
 
-            border = Border(
-                left=Side(style='thin'),
-                right=Side(style='thin'),
-                top=Side(style='thin'),
-                bottom=Side(style='thin')
-            )
+        if not file_path:
+            return
 
-            # Add title
-            ws.merge_cells('A1:L1')
-            ws['A1'] = "BILL OF QUANTITIES (BOQ)"
-            ws['A1'].font = Font(bold=True, size=16, color="2196F3")
-            ws['A1'].alignment = Alignment(horizontal="center", vertical="center")
-            ws.row_dimensions[1].height = 30
-
-            # Margin header style
-            margin_fill = PatternFill(start_color="FF9800", end_color="FF9800", fill_type="solid")
-
-            # Add headers
-            headers = ["№", "Adı", "Kateqoriya", "Miqdar", "Ölçü Vahidi", "Vahid Qiymət (AZN)", "Cəmi (AZN)", "Marja %", "Yekun (AZN)", "Mənbə", "Qeyd", "Növ"]
-            for col_num, header in enumerate(headers, 1):
-                cell = ws.cell(row=3, column=col_num)
-                cell.value = header
-                # Use orange color for margin columns
-                if col_num in [8, 9]:
-                    cell.fill = margin_fill
-                else:
-                    cell.fill = header_fill
-                cell.font = header_font
-                cell.alignment = header_alignment
-                cell.border = border
-
-            # Add data
-            data_start_row = 4
-            data_end_row = data_start_row + len(self.boq_items) - 1
-            for row_num, item in enumerate(self.boq_items, data_start_row):
-                margin_pct = item.get('margin_percent', 0)
-
-                # Column 1: №
-                ws.cell(row=row_num, column=1, value=item['id']).border = border
-                # Column 2: Adı
-                ws.cell(row=row_num, column=2, value=item['name']).border = border
-                # Column 3: Kateqoriya
-                ws.cell(row=row_num, column=3, value=item.get('category', '') or 'N/A').border = border
-                # Column 4: Miqdar
-                ws.cell(row=row_num, column=4, value=item['quantity']).border = border
-                # Column 5: Ölçü Vahidi
-                ws.cell(row=row_num, column=5, value=item['unit']).border = border
-                # Column 6: Vahid Qiymət (AZN)
-                unit_price_azn = item.get('unit_price_azn')
-                if unit_price_azn is None:
-                    currency = item.get('currency', 'AZN') or 'AZN'
-                    unit_price_azn = self.currency_manager.convert_to_azn(item.get('unit_price', 0), currency)
-                ws.cell(row=row_num, column=6, value=unit_price_azn).border = border
-                # Column 7: Cəmi (cost)
-                ws.cell(row=row_num, column=7, value=f"=D{row_num}*F{row_num}").border = border
-                # Column 8: Marja %
-                ws.cell(row=row_num, column=8, value=margin_pct).border = border
-                # Column 9: Yekun (with margin)
-                ws.cell(row=row_num, column=9, value=f"=G{row_num}*(1+H{row_num}/100)").border = border
-                # Column 10: Mənbə
-                ws.cell(row=row_num, column=10, value=item.get('source', '') or 'N/A').border = border
-                # Column 11: Qeyd
-                ws.cell(row=row_num, column=11, value=item.get('note', '') or 'N/A').border = border
-                # Column 12: Növ
-                item_type = "Xüsusi" if item.get('is_custom') else "DB"
-                ws.cell(row=row_num, column=12, value=item_type).border = border
-
-                # Format numbers
-                ws.cell(row=row_num, column=4).number_format = '0.00'
-                ws.cell(row=row_num, column=6).number_format = '0.00'
-                ws.cell(row=row_num, column=7).number_format = '0.00'
-                ws.cell(row=row_num, column=8).number_format = '0.0'
-                ws.cell(row=row_num, column=9).number_format = '0.00'
-
-            # Add total row
-            total_row = len(self.boq_items) + 5
-
-            # Cost total label
-            ws.merge_cells(f'A{total_row}:F{total_row}')
-            cost_label_cell = ws[f'A{total_row}']
-            cost_label_cell.value = "MAYA DƏYƏRİ:"
-            cost_label_cell.fill = header_fill
-            cost_label_cell.font = total_font
-            cost_label_cell.alignment = Alignment(horizontal="right", vertical="center")
-            cost_label_cell.border = border
-
-            # Cost total value
-            cost_value_cell = ws[f'G{total_row}']
-            cost_value_cell.value = f"=SUM(G{data_start_row}:G{data_end_row})"
-            cost_value_cell.fill = header_fill
-            cost_value_cell.font = total_font
-            cost_value_cell.alignment = Alignment(horizontal="center", vertical="center")
-            cost_value_cell.border = border
-            cost_value_cell.number_format = '0.00'
-
-            # Margin total label
-            margin_label_cell = ws[f'H{total_row}']
-            margin_label_cell.value = "TOPLAM:"
-            margin_label_cell.fill = margin_fill
-            margin_label_cell.font = total_font
-            margin_label_cell.alignment = Alignment(horizontal="center", vertical="center")
-            margin_label_cell.border = border
-
-            # Final total value
-            final_value_cell = ws[f'I{total_row}']
-            final_value_cell.value = f"=SUM(I{data_start_row}:I{data_end_row})"
-            final_value_cell.fill = total_fill
-            final_value_cell.font = total_font
-            final_value_cell.alignment = Alignment(horizontal="center", vertical="center")
-            final_value_cell.border = border
-            final_value_cell.number_format = '0.00'
-
-            # Fill remaining cells in total row
-            for col in ['J', 'K', 'L']:
-                ws[f'{col}{total_row}'].fill = total_fill
-                ws[f'{col}{total_row}'].border = border
-
-            # Add margin summary row
-            margin_row = total_row + 1
-            ws.merge_cells(f'A{margin_row}:F{margin_row}')
-            margin_summary_cell = ws[f'A{margin_row}']
-            margin_summary_cell.value = "MARJA:"
-            margin_summary_cell.fill = margin_fill
-            margin_summary_cell.font = total_font
-            margin_summary_cell.alignment = Alignment(horizontal="right", vertical="center")
-            margin_summary_cell.border = border
-
-            margin_summary_value = ws[f'G{margin_row}']
-            margin_summary_value.value = f"=I{total_row}-G{total_row}"
-            margin_summary_value.fill = margin_fill
-            margin_summary_value.font = total_font
-            margin_summary_value.alignment = Alignment(horizontal="center", vertical="center")
-            margin_summary_value.border = border
-            margin_summary_value.number_format = '0.00'
-
-            # Fill remaining cells
-            for col in ['H', 'I', 'J', 'K', 'L']:
-                ws[f'{col}{margin_row}'].fill = margin_fill
-                ws[f'{col}{margin_row}'].border = border
-
-            # Adjust column widths
-            ws.column_dimensions['A'].width = 8
-            ws.column_dimensions['B'].width = 30
-            ws.column_dimensions['C'].width = 15
-            ws.column_dimensions['D'].width = 10
-            ws.column_dimensions['E'].width = 12
-            ws.column_dimensions['F'].width = 18
-            ws.column_dimensions['G'].width = 15
-            ws.column_dimensions['H'].width = 10
-            ws.column_dimensions['I'].width = 15
-            ws.column_dimensions['J'].width = 20
-            ws.column_dimensions['K'].width = 20
-            ws.column_dimensions['L'].width = 10
-
-            # Category totals sheet
-            category_ws = wb.create_sheet(title="Category Totals")
-            category_ws["A1"] = "Kateqoriya"
-            category_ws["B1"] = "Yekun (AZN)"
-            for cell in ("A1", "B1"):
-                category_ws[cell].fill = header_fill
-                category_ws[cell].font = header_font
-                category_ws[cell].alignment = header_alignment
-                category_ws[cell].border = border
-
-            categories = []
-            seen = set()
-            for item in self.boq_items:
-                category = item.get("category", "") or "N/A"
-                if category not in seen:
-                    seen.add(category)
-                    categories.append(category)
-
-            for idx, category in enumerate(categories, start=2):
-                category_ws.cell(row=idx, column=1, value=category).border = border
-                category_ws.cell(
-                    row=idx,
-                    column=2,
-                    value=f"=SUMIF('Bill of Quantities'!$C${data_start_row}:$C${data_end_row},A{idx},'Bill of Quantities'!$I${data_start_row}:$I${data_end_row})"
-                ).border = border
-                category_ws.cell(row=idx, column=2).number_format = '0.00'
-
-            total_row = len(categories) + 2
-            category_ws.cell(row=total_row, column=1, value="CƏMİ").border = border
-            category_ws.cell(row=total_row, column=1).font = total_font
-            category_ws.cell(row=total_row, column=2, value=f"=SUM(B2:B{total_row - 1})").border = border
-            category_ws.cell(row=total_row, column=2).font = total_font
-            category_ws.cell(row=total_row, column=2).number_format = '0.00'
-
-            category_ws.column_dimensions['A'].width = 25
-            category_ws.column_dimensions['B'].width = 18
-
-            # Save file
-            wb.save(file_path)
+        # Snapshot the items so edits during the export don't race the worker
+        items = []
+        for item in self.boq_items:
+            item = dict(item)
+            if item.get('unit_price_azn') is None:
+                currency = item.get('currency', 'AZN') or 'AZN'
+                item['unit_price_azn'] = self.currency_manager.convert_to_azn(item.get('unit_price', 0), currency)
+            items.append(item)
+
+        self.export_excel_btn.setEnabled(False)
+        self._export_progress = QProgressDialog("Excel faylı hazırlanır...", None, 0, 0, self)
+        self._export_progress.setWindowTitle("İxrac")
+        self._export_progress.setWindowModality(Qt.WindowModality.WindowModal)
+        self._export_progress.setMinimumDuration(300)
+
+        self._export_thread = QThread(self)
+        self._export_worker = _ExcelExportWorker(items, file_path)
+        self._export_worker.moveToThread(self._export_thread)
+        self._export_worker.finished.connect(self._on_export_finished)
+        self._export_worker.error.connect(self._on_export_error)
+        self._export_thread.started.connect(self._export_worker.run)
+        self._export_worker.finished.connect(self._export_thread.quit)
+        self._export_worker.error.connect(self._export_thread.quit)
+        self._export_thread.finished.connect(self._export_worker.deleteLater)
+        self._export_thread.finished.connect(self._export_thread.deleteLater)
+        self._export_thread.start()
+
+    def _require_openpyxl(self):
+        """Tell the user how to install openpyxl if it is missing"""
+        if HAS_OPENPYXL:
+            return True
+        QMessageBox.critical(
+            self,
+            "Xəta",
+            "openpyxl kitabxanası tapılmadı!\n\nYükləmək üçün terminal-da:\npip install openpyxl"
+        )
+        return False
+
+    def _end_export(self):
+        self._export_thread = None
+        self._export_worker = None
+        self._export_progress.close()
+        self._export_progress = None
+        self.export_excel_btn.setEnabled(True)
+
+    def _on_export_finished(self, file_path):
+        self._end_export()
+        QMessageBox.information(
+            self,
+            "Uğurlu",
+            f"Smeta uğurla Excel-ə ixrac edildi!\n\n{file_path}"
+        )
 
-            QMessageBox.information(
-                self,
-                "Uğurlu",
-                f"Smeta uğurla Excel-ə ixrac edildi!\n\n{file_path}"
-            )
+    def _on_export_error(self, message):
+        self._end_export()
+        QMessageBox.critical(self, "Xəta", f"İxrac zamanı xəta:\n{message}")
 
-        except Exception as e:
-            QMessageBox.critical(self, "Xəta", f"İxrac zamanı xəta:\n{str(e)}")
+    def _finish_background_tasks(self):
+        """Wait for a running Excel export or cloud save at application exit"""
+        # quit() directly: the workers' finished->quit is queued to this thread
+        for thread in (self._export_thread, self._cloud_save_thread):
+            if thread is not None:
+                thread.quit()
+                thread.wait()
 
     def update_boq_name(self):
         """Update Smeta name from input field"""
+        self._name_timer.stop()
         self.boq_name = self.boq_name_input.text().strip() or "Smeta 1"
 
     def update_string_count(self):
@@ -1518,10 +1299,16 @@ class SmetaWindow(QMainWindow):
             QMessageBox.warning(self, "Xəbərdarlıq", "Smeta boşdur! Yadda saxlamaq üçün məhsul əlavə edin.")
             return
 
-        try:
-            import json
-            from PyQt6.QtWidgets import QFileDialog, QCheckBox
+        # The save button is disabled during a cloud save, but Ctrl+S still
+        # lands here; a second save now would silently skip the upload
+        if self._cloud_save_thread is not None:
+            QMessageBox.warning(
+                self, "Xəbərdarlıq",
+                "Əvvəlki bulud saxlaması hələ davam edir. Bitdikdən sonra yenidən yadda saxlayın."
+            )
+            return
 
+        try:
             # Create custom dialog with checkbox
             dialog = QDialog(self)
             dialog.setWindowTitle("Smeta-u Yadda Saxla")
@@ -1588,6 +1375,10 @@ class SmetaWindow(QMainWindow):
 
             save_to_cloud = cloud_checkbox.isChecked()
 
+            # Apply a name edit still waiting on the debounce timer
+            if self._name_timer.isActive():
+                self.update_boq_name()
+
             # Ask user for file location
             default_name = f"{self.boq_name}.json" if self.boq_name else "Smeta.json"
 
@@ -1614,27 +1405,40 @@ class SmetaWindow(QMainWindow):
                 'items': self.boq_items
             }
 
-            # Save to local file
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(save_data, f, ensure_ascii=False, indent=2)
+            payload = _json_bytes(save_data)
+            content_hash = hashlib.blake2b(payload, digest_size=16).hexdigest()
+            local_unchanged = (
+                content_hash == self._last_saved_hash
+                and file_path == self._last_saved_path
+                and os.path.exists(file_path)
+            )
+            cloud_pending = (
+                save_to_cloud and self.db
+                and content_hash != self._last_cloud_hash
+            )
 
-            success_message = f"Smeta lokal faylda yadda saxlanıldı:\n{file_path}"
+            if local_unchanged and not cloud_pending:
+                QMessageBox.information(self, "Məlumat", "Yadda saxlanılacaq dəyişiklik yoxdur.")
+                return
 
-            # Save to cloud if checkbox is checked
-            if save_to_cloud and self.db:
-                try:
-                    _, is_new = self.db.save_boq_to_cloud(
-                        self.boq_name,
-                        self.boq_items,
-                        self.next_id,
-                        self.string_count
-                    )
-                    if is_new:
-                        success_message += "\n\n✅ Buludda da saxlanıldı (yeni)!"
-                    else:
-                        success_message += "\n\n✅ Buludda yeniləndi!"
-                except Exception as cloud_error:
-                    success_message += f"\n\n⚠️ Bulud saxlama xətası: {cloud_error}"
+            # Save to local file
+            if local_unchanged:
+                success_message = f"Lokal fayl artıq aktualdır:\n{file_path}"
+            else:
+                with open(file_path, 'wb') as f:
+                    f.write(payload)
+                self._last_saved_hash = content_hash
+                self._last_saved_path = file_path
+                success_message = f"Smeta lokal faylda yadda saxlanıldı:\n{file_path}"
+
+            # Save to cloud in background if checkbox is checked; the
+            # confirmation is shown once the cloud result is in
+            if cloud_pending:
+                self._pending_cloud_hash = content_hash
+                self._start_cloud_save(success_message)
+                return
+            if save_to_cloud and self.db and not cloud_pending:
+                success_message += "\n\n✅ Bulud nüsxəsi artıq aktualdır."
 
             QMessageBox.information(
                 self,
@@ -1645,12 +1449,94 @@ class SmetaWindow(QMainWindow):
         except Exception as e:
             QMessageBox.critical(self, "Xəta", f"Smeta yadda saxlanarkən xəta:\n{str(e)}")
 
+    def _start_cloud_save(self, success_message):
+        """Save a snapshot of the Smeta to the cloud on a worker thread"""
+        self.save_boq_btn.setEnabled(False)
+        self._cloud_save_message = success_message
+
+        self._cloud_save_thread = QThread(self)
+        self._cloud_save_worker = _CloudSaveWorker(
+            self.db,
+            self.boq_name,
+            [dict(item) for item in self.boq_items],
+            self.next_id,
+            self.string_count
+        )
+        self._cloud_save_worker.moveToThread(self._cloud_save_thread)
+        self._cloud_save_worker.finished.connect(self._on_cloud_save_finished)
+        self._cloud_save_thread.started.connect(self._cloud_save_worker.run)
+        self._cloud_save_worker.finished.connect(self._cloud_save_thread.quit)
+        self._cloud_save_thread.finished.connect(self._cloud_save_worker.deleteLater)
+        self._cloud_save_thread.finished.connect(self._cloud_save_thread.deleteLater)
+        self._cloud_save_thread.start()
+
+    def _on_cloud_save_finished(self, is_new, error):
+        self._cloud_save_thread = None
+        self._cloud_save_worker = None
+        self.save_boq_btn.setEnabled(True)
+
+        success_message = self._cloud_save_message
+        if not error:
+            self._last_cloud_hash = self._pending_cloud_hash
+        self._pending_cloud_hash = None
+        if error:
+            success_message += f"\n\n⚠️ Bulud saxlama xətası: {error}"
+        elif is_new:
+            success_message += "\n\n✅ Buludda da saxlanıldı (yeni)!"
+        else:
+            success_message += "\n\n✅ Buludda yeniləndi!"
+
+        QMessageBox.information(
+            self,
+            "Uğurlu",
+            success_message
+        )
+
+    def _refresh_loaded_items(self, loaded_items):
+        """Update loaded items with current product data; returns how many
+        prices changed. Missing AZN prices/totals are filled in by
+        refresh_table()."""
+        updated_count = 0
+        # Only database-linked items need the product lookup; a Smeta of
+        # custom items skips it entirely
+        linked_items = [
+            item for item in loaded_items
+            if not item.get('is_custom') and item.get('product_id')
+        ]
+        if linked_items and self.db:
+            try:
+                # One $in query instead of a round-trip per item
+                products = self.db.read_products_bulk(
+                    [item['product_id'] for item in linked_items], _PRICE_REFRESH_PROJECTION
+                )
+            except Exception:
+                # Database unavailable; keep the saved data
+                products = {}
+
+            for item in linked_items:
+                product = products.get(str(item['product_id']))
+                if not product:
+                    continue
+                # Update price, category, source, and note from database
+                old_price = item['unit_price']
+                new_price = float(product['price']) if product.get('price') else 0
+
+                item['unit_price'] = new_price
+                currency = product.get('currency', 'AZN') or 'AZN'
+                item['currency'] = currency
+                item['unit_price_azn'] = product.get('price_azn', new_price)
+                item['total'] = item['quantity'] * item['unit_price_azn']
+                item['category'] = product.get('category', '') or ''
+                item['source'] = product.get('mehsul_menbeyi', '') or ''
+                item['note'] = product.get('qeyd', '') or ''
+
+                if old_price != new_price:
+                    updated_count += 1
+        return updated_count
+
     def load_boq(self):
         """Load Smeta from JSON file and update prices from database"""
         try:
-            import json
-            from PyQt6.QtWidgets import QFileDialog
-
             # Ask user for file to load
             file_path, _ = QFileDialog.getOpenFileName(
                 self,
@@ -1664,59 +1550,23 @@ class SmetaWindow(QMainWindow):
 
             # Confirm if current Smeta will be replaced
             if self.boq_items:
-                reply = QMessageBox.question(
-                    self,
-                    "Təsdiq",
-                    "Mövcud Smeta məlumatları əvəz olunacaq. Davam etmək istəyirsiniz?",
-                    QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
-                )
-                if reply != QMessageBox.StandardButton.Yes:
+                if not _confirm(self, "Təsdiq", "Mövcud Smeta məlumatları əvəz olunacaq. Davam etmək istəyirsiniz?"):
                     return
 
             # Load from file
-            with open(file_path, 'r', encoding='utf-8') as f:
-                save_data = json.load(f)
+            save_data = _load_json(file_path)
+
+            loaded_items = save_data.get('items', [])
+
+            # Update prices from database for items that came from DB
+            updated_count = self._refresh_loaded_items(loaded_items)
 
+            # Swap the whole Smeta in at once, then redraw the table once
             self.boq_name = save_data.get('boq_name', 'Smeta 1')
             self.boq_name_input.setText(self.boq_name)
             self.next_id = save_data.get('next_id', 1)
             self.string_count = int(save_data.get('string_count', 0))
             self.string_input.setValue(self.string_count)
-            loaded_items = save_data.get('items', [])
-
-            # Update prices from database for items that came from DB
-            updated_count = 0
-            for item in loaded_items:
-                if not item.get('is_custom') and item.get('product_id') and self.db:
-                    try:
-                        # Get current product data from database
-                        product = self.db.read_product(item['product_id'])
-                        if product:
-                            # Update price, category, source, and note from database
-                            old_price = item['unit_price']
-                            new_price = float(product['price']) if product.get('price') else 0
-
-                            item['unit_price'] = new_price
-                            currency = product.get('currency', 'AZN') or 'AZN'
-                            item['currency'] = currency
-                            item['unit_price_azn'] = product.get('price_azn', new_price)
-                            item['total'] = item['quantity'] * item['unit_price_azn']
-                            item['category'] = product.get('category', '') or ''
-                            item['source'] = product.get('mehsul_menbeyi', '') or ''
-                            item['note'] = product.get('qeyd', '') or ''
-
-                            if old_price != new_price:
-                                updated_count += 1
-                    except Exception:
-                        # If product not found or error, keep the saved data
-                        pass
-                currency = item.get('currency', 'AZN') or 'AZN'
-                if 'unit_price_azn' not in item or item.get('unit_price_azn') is None:
-                    unit_price = item.get('unit_price', 0)
-                    item['unit_price_azn'] = self.currency_manager.convert_to_azn(unit_price, currency)
-                if 'total' not in item or item.get('total') is None:
-                    item['total'] = item.get('quantity', 0) * item.get('unit_price_azn', 0)
-
             self.boq_items = loaded_items
             self.refresh_table()
 
@@ -1736,8 +1586,8 @@ class SmetaWindow(QMainWindow):
             return
 
         try:
-            # Get all cloud Smetas
-            cloud_boqs = self.db.get_all_cloud_boqs()
+            # Get the first page of cloud Smetas; more are fetched on scroll
+            cloud_boqs = self.db.get_cloud_boqs_page(0, _CLOUD_BOQ_PAGE_SIZE)
 
             if not cloud_boqs:
                 QMessageBox.information(self, "Məlumat", "Buludda heç bir Smeta tapılmadı!")
@@ -1774,55 +1624,54 @@ class SmetaWindow(QMainWindow):
             search_layout.addWidget(search_input)
             layout.addLayout(search_layout)
 
-            # List widget for Smetas
-            from PyQt6.QtWidgets import QListWidget, QListWidgetItem
-            boq_list = QListWidget()
+            # List view for Smetas
+            boq_list = QListView()
+            boq_list.setUniformItemSizes(True)
+            boq_list.setSelectionMode(QListView.SelectionMode.ExtendedSelection)
             boq_list.setStyleSheet("""
-                QListWidget {
+                QListView {
                     font-size: 13px;
                     padding: 5px;
                 }
-                QListWidget::item {
+                QListView::item {
                     padding: 10px;
                     border-bottom: 1px solid #ddd;
                 }
-                QListWidget::item:hover {
+                QListView::item:hover {
                     background-color: #e3f2fd;
                 }
-                QListWidget::item:selected {
+                QListView::item:selected {
                     background-color: #2196F3;
                     color: white;
                 }
             """)
+            boq_model = CloudBoqModel(dialog)
+            boq_list.setModel(boq_model)
 
-            # Store all Smetas for filtering
+            # Smetas fetched so far, and whether the server has more
             all_boqs = cloud_boqs
-
-            def format_boq_item(boq):
-                """Format Smeta data for display"""
-                item_count = len(boq.get('items', []))
-                updated_at = boq.get('updated_at', '')
-                if updated_at:
-                    try:
-                        # Convert UTC to local time
-                        if updated_at.tzinfo is None:
-                            updated_at = updated_at.replace(tzinfo=timezone.utc)
-                        local_time = updated_at.astimezone()
-                        updated_str = local_time.strftime('%Y-%m-%d %H:%M')
-                    except Exception:
-                        updated_str = str(updated_at)
-                else:
-                    updated_str = "Naməlum"
-                return f"{boq['name']} ({item_count} məhsul) - Son yenilənmə: {updated_str}"
+            paging = {'has_more': len(cloud_boqs) == _CLOUD_BOQ_PAGE_SIZE}
 
             def populate_list(boqs):
                 """Populate the list with Smetas"""
-                boq_list.clear()
-                for boq in boqs:
-                    item_text = format_boq_item(boq)
-                    list_item = QListWidgetItem(item_text)
-                    list_item.setData(Qt.ItemDataRole.UserRole, boq['id'])
-                    boq_list.addItem(list_item)
+                boq_model.set_boqs(boqs)
+
+            def load_more():
+                """Fetch the next page of Smetas into the unfiltered list"""
+                if not paging['has_more'] or search_input.text().strip():
+                    return
+                try:
+                    page = self.db.get_cloud_boqs_page(len(all_boqs), _CLOUD_BOQ_PAGE_SIZE)
+                except Exception:
+                    return
+                paging['has_more'] = len(page) == _CLOUD_BOQ_PAGE_SIZE
+                all_boqs.extend(page)
+                boq_model.append_boqs(page)
+
+            def on_scroll(value):
+                """Load the next page once the list is scrolled to the bottom"""
+                if value >= boq_list.verticalScrollBar().maximum():
+                    load_more()
 
             def search_boqs():
                 """Search Smetas based on input"""
@@ -1831,19 +1680,21 @@ class SmetaWindow(QMainWindow):
                     populate_list(all_boqs)
                 else:
                     try:
-                        # Search from database
+                        # Search from database (served from the name index)
                         filtered_boqs = self.db.search_cloud_boqs(search_term)
-                        populate_list(filtered_boqs)
                     except Exception:
                         # Fallback to local filtering
-                        filtered_boqs = [b for b in all_boqs if search_term.lower() in b['name'].lower()]
-                        populate_list(filtered_boqs)
+                        search_lower = search_term.lower()
+                        filtered_boqs = [b for b in all_boqs if search_lower in b['name'].lower()]
+                    populate_list(filtered_boqs)
 
-            # Connect search input to search function
-            search_input.textChanged.connect(search_boqs)
+            # Query the server only once typing pauses, not on every keystroke
+            search_timer = _debounce_timer(dialog, search_boqs, 250)
+            search_input.textChanged.connect(search_timer.start)
 
             # Initial population
             populate_list(all_boqs)
+            boq_list.verticalScrollBar().valueChanged.connect(on_scroll)
 
             layout.addWidget(boq_list)
 
@@ -1903,66 +1754,38 @@ class SmetaWindow(QMainWindow):
 
             dialog.setLayout(layout)
 
+            def selected_rows():
+                """Sorted rows of the selected Smetas"""
+                return sorted(index.row() for index in boq_list.selectionModel().selectedIndexes())
+
             # Handle load button
             def load_selected():
-                selected_items = boq_list.selectedItems()
-                if not selected_items:
+                rows = selected_rows()
+                if not rows:
                     QMessageBox.warning(dialog, "Xəbərdarlıq", "Smeta seçin!")
                     return
 
-                boq_id = selected_items[0].data(Qt.ItemDataRole.UserRole)
+                boq_id = boq_model.boqs[rows[0]]['id']
 
                 # Confirm if current Smeta will be replaced
                 if self.boq_items:
-                    reply = QMessageBox.question(
-                        dialog,
-                        "Təsdiq",
-                        "Mövcud Smeta məlumatları əvəz olunacaq. Davam etmək istəyirsiniz?",
-                        QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
-                    )
-                    if reply != QMessageBox.StandardButton.Yes:
+                    if not _confirm(dialog, "Təsdiq", "Mövcud Smeta məlumatları əvəz olunacaq. Davam etmək istəyirsiniz?"):
                         return
 
                 # Load Smeta from cloud
                 boq_data = self.db.load_boq_from_cloud(boq_id)
                 if boq_data:
+                    loaded_items = boq_data.get('items', [])
+
+                    # Update prices from database for items that came from DB
+                    updated_count = self._refresh_loaded_items(loaded_items)
+
+                    # Swap the whole Smeta in at once, then redraw the table once
                     self.boq_name = boq_data.get('name', 'Smeta 1')
                     self.boq_name_input.setText(self.boq_name)
                     self.next_id = boq_data.get('next_id', 1)
                     self.string_count = int(boq_data.get('string_count', 0))
                     self.string_input.setValue(self.string_count)
-                    loaded_items = boq_data.get('items', [])
-
-                    # Update prices from database for items that came from DB
-                    updated_count = 0
-                    for item in loaded_items:
-                        if not item.get('is_custom') and item.get('product_id') and self.db:
-                            try:
-                                product = self.db.read_product(item['product_id'])
-                                if product:
-                                    old_price = item['unit_price']
-                                    new_price = float(product['price']) if product.get('price') else 0
-
-                                    item['unit_price'] = new_price
-                                    currency = product.get('currency', 'AZN') or 'AZN'
-                                    item['currency'] = currency
-                                    item['unit_price_azn'] = product.get('price_azn', new_price)
-                                    item['total'] = item['quantity'] * item['unit_price_azn']
-                                    item['category'] = product.get('category', '') or ''
-                                    item['source'] = product.get('mehsul_menbeyi', '') or ''
-                                    item['note'] = product.get('qeyd', '') or ''
-
-                                    if old_price != new_price:
-                                        updated_count += 1
-                            except Exception:
-                                pass
-                        currency = item.get('currency', 'AZN') or 'AZN'
-                        if 'unit_price_azn' not in item or item.get('unit_price_azn') is None:
-                            unit_price = item.get('unit_price', 0)
-                            item['unit_price_azn'] = self.currency_manager.convert_to_azn(unit_price, currency)
-                        if 'total' not in item or item.get('total') is None:
-                            item['total'] = item.get('quantity', 0) * item.get('unit_price_azn', 0)
-
                     self.boq_items = loaded_items
                     self.refresh_table()
 
@@ -1977,27 +1800,33 @@ class SmetaWindow(QMainWindow):
 
             # Handle delete button
             def delete_selected():
-                selected_items = boq_list.selectedItems()
-                if not selected_items:
+                rows = selected_rows()
+                if not rows:
                     QMessageBox.warning(dialog, "Xəbərdarlıq", "Smeta seçin!")
                     return
 
-                boq_id = selected_items[0].data(Qt.ItemDataRole.UserRole)
-                boq_name = selected_items[0].text().split(' (')[0]
-
-                reply = QMessageBox.question(
-                    dialog,
-                    "Təsdiq",
-                    f"'{boq_name}' Smeta-nu buluddan silmək istədiyinizdən əminsiniz?",
-                    QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
-                )
-
-                if reply == QMessageBox.StandardButton.Yes:
-                    if self.db.delete_cloud_boq(boq_id):
-                        boq_list.takeItem(boq_list.row(selected_items[0]))
+                boq_ids = [boq_model.boqs[row]['id'] for row in rows]
+                deleted_names = {boq_model.boqs[row]['name'] for row in rows}
+                if len(rows) == 1:
+                    message = f"'{boq_model.boqs[rows[0]]['name']}' Smeta-nu buluddan silmək istədiyinizdən əminsiniz?"
+                else:
+                    message = f"{len(rows)} Smeta-nu buluddan silmək istədiyinizdən əminsiniz?"
+
+                if _confirm(dialog, "Təsdiq", message):
+                    # One delete_many for the whole selection
+                    if self.db.delete_cloud_boqs(boq_ids):
+                        if self.boq_name in deleted_names:
+                            # The cloud copy of the open Smeta is gone
+                            self._last_cloud_hash = None
+                        boq_model.remove_rows(rows)
+                        # Keeps the next page offset in step with the server
+                        deleted = set(boq_ids)
+                        all_boqs[:] = [b for b in all_boqs if b['id'] not in deleted]
                         QMessageBox.information(dialog, "Uğurlu", "Smeta buluddan silindi!")
 
-                        if boq_list.count() == 0:
+                        if boq_model.rowCount() == 0:
+                            load_more()
+                        if boq_model.rowCount() == 0:
                             QMessageBox.information(dialog, "Məlumat", "Buludda daha Smeta qalmadı.")
                             dialog.accept()
                     else:
@@ -2008,7 +1837,7 @@ class SmetaWindow(QMainWindow):
             cancel_btn.clicked.connect(dialog.reject)
 
             # Double click to load
-            boq_list.itemDoubleClicked.connect(load_selected)
+            boq_list.doubleClicked.connect(load_selected)
 
             dialog.exec()
 
@@ -2017,13 +1846,10 @@ class SmetaWindow(QMainWindow):
 
     def combine_boqs_to_excel(self):
         """Combine multiple Smetas into a single Excel file"""
-        try:
-            import json
-            from PyQt6.QtWidgets import QFileDialog
-            from openpyxl import Workbook
-            from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
-            from openpyxl.utils import get_column_letter
+        if not self._require_openpyxl():
+            return
 
+        try:
             # Ask user to select multiple Smeta files
             file_paths, _ = QFileDialog.getOpenFileNames(
                 self,
@@ -2036,36 +1862,36 @@ class SmetaWindow(QMainWindow):
                 QMessageBox.warning(self, "Xəbərdarlıq", "Ən azı 2 Smeta faylı seçin!")
                 return
 
-            # Load all Smetas
+            # Load all Smetas, reading the files concurrently
             boqs = []
-            for file_path in file_paths:
-                try:
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        boq_data = json.load(f)
-                        boqs.append({
-                            'name': boq_data.get('boq_name', os.path.basename(file_path)),
-                            'items': boq_data.get('items', [])
-                        })
-                except Exception as e:
-                    QMessageBox.warning(self, "Xəbərdarlıq", f"Fayl oxuna bilmədi: {os.path.basename(file_path)}\n{str(e)}")
+            errors = []
+            with ThreadPoolExecutor(max_workers=min(8, len(file_paths))) as executor:
+                for file_path, (boq, error) in zip(file_paths, executor.map(_load_combine_file, file_paths)):
+                    if error:
+                        errors.append(f"{os.path.basename(file_path)}: {error}")
+                    else:
+                        boqs.append(boq)
+            if errors:
+                QMessageBox.warning(self, "Xəbərdarlıq", "Fayl oxuna bilmədi:\n" + "\n".join(errors))
 
             if len(boqs) < 2:
                 QMessageBox.warning(self, "Xəbərdarlıq", "Ən azı 2 Smeta uğurla yüklənməlidir!")
                 return
 
-            # Create a unified list of all unique items (by name)
+            # Unified list of all unique items (by name, in first-seen order)
+            # with each Smeta's quantity, built in a single pass
             all_items_dict = {}
-            item_order = []
             for boq in boqs:
+                boq_name = boq['name']
                 for item in boq['items']:
-                    item_key = item['name']
-                    if item_key not in all_items_dict:
+                    item_data = all_items_dict.get(item['name'])
+                    if item_data is None:
                         currency = item.get('currency', 'AZN') or 'AZN'
                         unit_price = item.get('unit_price', 0)
                         unit_price_azn = item.get('unit_price_azn')
                         if unit_price_azn is None:
                             unit_price_azn = self.currency_manager.convert_to_azn(unit_price, currency)
-                        all_items_dict[item_key] = {
+                        item_data = all_items_dict[item['name']] = {
                             'name': item['name'],
                             'unit': item.get('unit', 'ədəd'),
                             'unit_price': unit_price_azn,
@@ -2074,27 +1900,11 @@ class SmetaWindow(QMainWindow):
                             'note': item.get('note', ''),
                             'boq_data': {}
                         }
-                        item_order.append(item_key)
-
-            # Fill quantities for each Smeta
-            for boq_idx, boq in enumerate(boqs):
-                boq_name = boq['name']
-                for item in boq['items']:
-                    item_key = item['name']
-                    all_items_dict[item_key]['boq_data'][boq_name] = {
+                    item_data['boq_data'][boq_name] = {
                         'quantity': item.get('quantity', 0),
                         'margin_percent': item.get('margin_percent', 0)
                     }
 
-            # Ensure all items have entries for all Smetas (fill with 0 if missing)
-            for item_data in all_items_dict.values():
-                for boq in boqs:
-                    if boq['name'] not in item_data['boq_data']:
-                        item_data['boq_data'][boq['name']] = {
-                            'quantity': 0,
-                            'margin_percent': 0
-                        }
-
             # Ask user for output file
             output_path, _ = QFileDialog.getSaveFileName(
                 self,
@@ -2106,145 +1916,7 @@ class SmetaWindow(QMainWindow):
             if not output_path:
                 return
 
-            # Create Excel workbook
-            wb = Workbook()
-            ws = wb.active
-            ws.title = "Combined Smeta"
-
-            # Define styles
-            header_fill = PatternFill(start_color="2196F3", end_color="2196F3", fill_type="solid")
-            header_font = Font(bold=True, color="FFFFFF", size=11)
-            header_alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
-
-            total_fill = PatternFill(start_color="4CAF50", end_color="4CAF50", fill_type="solid")
-            total_font = Font(bold=True, color="FFFFFF", size=11)
-
-            border = Border(
-                left=Side(style='thin'),
-                right=Side(style='thin'),
-                top=Side(style='thin'),
-                bottom=Side(style='thin')
-            )
-
-            # Title
-            num_boqs = len(boqs)
-            last_col_idx = 5 + (2 * num_boqs) + 2
-            ws.merge_cells(f'A1:{get_column_letter(last_col_idx)}1')
-            ws['A1'] = "BİRLƏŞDİRİLMİŞ BILL OF QUANTITIES (BOQ)"
-            ws['A1'].font = Font(bold=True, size=16, color="2196F3")
-            ws['A1'].alignment = Alignment(horizontal="center", vertical="center")
-            ws.row_dimensions[1].height = 30
-
-            # Headers
-            headers = ["№", "Adı", "Kateqoriya", "Ölçü Vahidi", "Vahid Qiymət (AZN)"]
-            for boq in boqs:
-                headers.append(f"{boq['name']}\n(Miqdar)")
-                headers.append(f"{boq['name']}\n(Yekun AZN)")
-            headers.append("Cəmi\nMiqdar")
-            headers.append("Cəmi\nYekun (AZN)")
-
-            col_num = 1
-            for header in headers:
-                cell = ws.cell(row=3, column=col_num)
-                cell.value = header
-                cell.fill = header_fill
-                cell.font = header_font
-                cell.alignment = header_alignment
-                cell.border = border
-                col_num += 1
-
-            # Data rows
-            row_num = 4
-            qty_cols = []
-            final_cols = []
-            base_col = 6
-            for i in range(num_boqs):
-                qty_cols.append(base_col + (i * 2))
-                final_cols.append(base_col + (i * 2) + 1)
-            total_qty_col_idx = base_col + (num_boqs * 2)
-            total_final_col_idx = total_qty_col_idx + 1
-
-            for idx, item_key in enumerate(item_order, 1):
-                item_data = all_items_dict[item_key]
-                ws.cell(row=row_num, column=1, value=idx).border = border
-                ws.cell(row=row_num, column=2, value=item_data['name']).border = border
-                ws.cell(row=row_num, column=3, value=item_data['category'] or 'N/A').border = border
-                ws.cell(row=row_num, column=4, value=item_data['unit']).border = border
-                ws.cell(row=row_num, column=5, value=item_data['unit_price']).border = border
-                ws.cell(row=row_num, column=5).number_format = '0.00'
-
-                # Quantities and margin totals for each Smeta
-                col = 6
-                unit_price_value = float(item_data.get('unit_price') or 0)
-                for boq in boqs:
-                    boq_entry = item_data['boq_data'][boq['name']]
-                    qty = boq_entry['quantity']
-                    margin_pct = boq_entry['margin_percent']
-                    try:
-                        margin_pct_value = float(margin_pct)
-                    except (TypeError, ValueError):
-                        margin_pct_value = 0.0
-                    final_total = unit_price_value * float(qty or 0) * (1 + margin_pct_value / 100)
-
-                    ws.cell(row=row_num, column=col, value=qty).border = border
-                    ws.cell(row=row_num, column=col).number_format = '0.00'
-                    col += 1
-
-                    ws.cell(row=row_num, column=col, value=final_total).border = border
-                    ws.cell(row=row_num, column=col).number_format = '#,##0.00'
-                    col += 1
-
-                # Total quantity column (SUM formula of qty columns)
-                qty_sum_cells = ",".join([f"{get_column_letter(c)}{row_num}" for c in qty_cols])
-                total_qty_cell = ws.cell(row=row_num, column=total_qty_col_idx)
-                total_qty_cell.value = f"=SUM({qty_sum_cells})"
-                total_qty_cell.border = border
-                total_qty_cell.number_format = '0.00'
-                total_qty_cell.font = Font(bold=True)
-
-                # Total final price column (SUM of margin totals)
-                final_sum_cells = ",".join([f"{get_column_letter(c)}{row_num}" for c in final_cols])
-                total_final_cell = ws.cell(row=row_num, column=total_final_col_idx)
-                total_final_cell.value = f"=SUM({final_sum_cells})"
-                total_final_cell.border = border
-                total_final_cell.number_format = '#,##0.00'
-                total_final_cell.font = Font(bold=True)
-
-                row_num += 1
-
-            # Add grand total row
-            total_row = row_num + 1
-            ws.merge_cells(f'A{total_row}:{get_column_letter(total_final_col_idx - 1)}{total_row}')
-            total_label_cell = ws[f'A{total_row}']
-            total_label_cell.value = "ÜMUMİ MƏBLƏĞ:"
-            total_label_cell.fill = total_fill
-            total_label_cell.font = total_font
-            total_label_cell.alignment = Alignment(horizontal="right", vertical="center")
-            total_label_cell.border = border
-
-            # Grand total formula
-            total_final_col_letter = get_column_letter(total_final_col_idx)
-            grand_total_cell = ws[f'{total_final_col_letter}{total_row}']
-            grand_total_cell.value = f"=SUM({total_final_col_letter}4:{total_final_col_letter}{row_num - 1})"
-            grand_total_cell.fill = total_fill
-            grand_total_cell.font = total_font
-            grand_total_cell.alignment = Alignment(horizontal="center", vertical="center")
-            grand_total_cell.border = border
-            grand_total_cell.number_format = '#,##0.00'
-
-            # Adjust column widths
-            ws.column_dimensions['A'].width = 6
-            ws.column_dimensions['B'].width = 35
-            ws.column_dimensions['C'].width = 15
-            ws.column_dimensions['D'].width = 12
-            ws.column_dimensions['E'].width = 18
-
-            for i in range((2 * num_boqs) + 2):  # Smeta qty/final + Total Qty + Total Final
-                col_letter = chr(70 + i)  # Start from F
-                ws.column_dimensions[col_letter].width = 14
-
-            # Save file
-            wb.save(output_path)
+            _write_combined_workbook(boqs, list(all_items_dict.values()), output_path)
 
             QMessageBox.information(
                 self,
@@ -2263,3 +1935,518 @@ class SmetaWindow(QMainWindow):
 
         dialog = TemplateManagementWindow(self, self.db, self)
         dialog.exec()
+
+
+class SmetaTableModel(QAbstractTableModel):
+    """Table model over SmetaWindow.boq_items"""
+
+    headers = [
+        "№", "Adı", "Kateqoriya", "Miqdar", "Ölçü Vahidi", "Vahid Qiymət",
+        "Cəmi", "Marja %", "Yekun", "Mənbə", "Qeyd", "Növ"
+    ]
+    editable_columns = (3, 5, 7)
+
+    # Columns whose text comes from float formatting, cached per item
+    formatted_columns = (3, 5, 6, 7, 8)
+
+    def __init__(self, window):
+        super().__init__(window)
+        self.window = window
+        # id(item) -> (item, {column: text}); the item reference keeps the
+        # id from being reused while its entry is alive
+        self._fmt_cache = {}
+
+    def refresh(self):
+        self.beginResetModel()
+        self._fmt_cache.clear()
+        self.endResetModel()
+
+    def rowCount(self, parent=None):
+        return len(self.window.boq_items)
+
+    def columnCount(self, parent=None):
+        return len(self.headers)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.headers[section]
+        return None
+
+    def flags(self, index):
+        flags = Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable
+        if index.column() in self.editable_columns:
+            flags |= Qt.ItemFlag.ItemIsEditable
+        return flags
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        if role not in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole):
+            return None
+        item = self.window.boq_items[index.row()]
+        column = index.column()
+        if column in self.formatted_columns:
+            return self._formatted(item)[column]
+        return self._display_value(item, column)
+
+    def _formatted(self, item):
+        entry = self._fmt_cache.get(id(item))
+        if entry is None or entry[0] is not item:
+            entry = (item, {column: self._display_value(item, column) for column in self.formatted_columns})
+            self._fmt_cache[id(item)] = entry
+        return entry[1]
+
+    def setData(self, index, value, role=Qt.ItemDataRole.EditRole):
+        if not index.isValid() or role != Qt.ItemDataRole.EditRole:
+            return False
+        if not self.window.apply_cell_edit(index.row(), index.column(), str(value)):
+            return False
+        self.rows_changed(index.row())
+        return True
+
+    def append_items(self, items):
+        if not items:
+            return
+        rows = self.window.boq_items
+        first = len(rows)
+        self.beginInsertRows(QModelIndex(), first, first + len(items) - 1)
+        rows.extend(items)
+        self.endInsertRows()
+
+    def remove_rows(self, first, last):
+        items = self.window.boq_items
+        self.beginRemoveRows(QModelIndex(), first, last)
+        for item in items[first:last + 1]:
+            self._fmt_cache.pop(id(item), None)
+        del items[first:last + 1]
+        self.endRemoveRows()
+
+    def rows_changed(self, first, last=None):
+        """Repaint rows first..last after their items changed in place"""
+        if last is None:
+            last = first
+        items = self.window.boq_items
+        for row in range(first, last + 1):
+            self._fmt_cache.pop(id(items[row]), None)
+        self.dataChanged.emit(self.index(first, 0), self.index(last, self.columnCount() - 1))
+
+    def _display_value(self, item, column):
+        if column == 0:
+            return str(item['id'])
+        if column == 1:
+            return item['name']
+        if column == 2:
+            return item.get('category', '') or 'N/A'
+        if column == 3:
+            return f"{item['quantity']:.2f}"
+        if column == 4:
+            return item['unit']
+        if column == 5:
+            currency = item.get('currency', 'AZN') or 'AZN'
+            unit_price = item.get('unit_price', 0)
+            if currency == "AZN":
+                return f"{unit_price:.2f} AZN"
+            return f"AZN {item.get('unit_price_azn', 0):.2f} ({unit_price:.2f} {currency})"
+        if column == 6:
+            return f"{item.get('total', 0):.2f}"
+        if column == 7:
+            return f"{item.get('margin_percent', 0):.1f}%"
+        if column == 8:
+            final_total = item.get('total', 0) * (1 + item.get('margin_percent', 0) / 100)
+            return f"{final_total:.2f}"
+        if column == 9:
+            return item.get('source', '') or 'N/A'
+        if column == 10:
+            return item.get('note', '') or 'N/A'
+        if column == 11:
+            return "Xüsusi" if item.get('is_custom') else "DB"
+        return ""
+
+
+_CLOUD_BOQ_TIME_FORMAT = '%Y-%m-%d %H:%M'
+
+
+def _format_cloud_boq(boq, local_tz):
+    """Format a cloud Smeta summary for display"""
+    item_count = boq['items_count']
+    updated_at = boq.get('updated_at', '')
+    if updated_at:
+        try:
+            # Convert UTC to local time
+            if updated_at.tzinfo is None:
+                updated_at = updated_at.replace(tzinfo=timezone.utc)
+            local_time = updated_at.astimezone(local_tz)
+            updated_str = local_time.strftime(_CLOUD_BOQ_TIME_FORMAT)
+        except Exception:
+            updated_str = str(updated_at)
+    else:
+        updated_str = "Naməlum"
+    return f"{boq['name']} ({item_count} məhsul) - Son yenilənmə: {updated_str}"
+
+
+class CloudBoqModel(QAbstractListModel):
+    """List model over cloud Smeta summaries from get_cloud_boqs_page()"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.boqs = []
+        # Looked up once rather than by every astimezone() call
+        self._local_tz = datetime.now().astimezone().tzinfo
+
+    def set_boqs(self, boqs):
+        self.beginResetModel()
+        self.boqs = list(boqs)
+        self._local_tz = datetime.now().astimezone().tzinfo
+        self.endResetModel()
+
+    def append_boqs(self, boqs):
+        if not boqs:
+            return
+        first = len(self.boqs)
+        self.beginInsertRows(QModelIndex(), first, first + len(boqs) - 1)
+        self.boqs.extend(boqs)
+        self.endInsertRows()
+
+    def remove_rows(self, rows):
+        """Remove sorted rows, one removal per contiguous run"""
+        for first, last in reversed(_contiguous_ranges(rows)):
+            self.beginRemoveRows(QModelIndex(), first, last)
+            del self.boqs[first:last + 1]
+            self.endRemoveRows()
+
+    def rowCount(self, parent=None):
+        return len(self.boqs)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        boq = self.boqs[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return _format_cloud_boq(boq, self._local_tz)
+        if role == Qt.ItemDataRole.UserRole:
+            return boq['id']
+        return None
+
+
+def _write_boq_workbook(items, file_path):
+    """Build the Smeta workbook for items and save it to file_path.
+
+    Runs off the GUI thread, so items must already carry unit_price_azn.
+    """
+    # Write-only workbook: rows are streamed out as they are appended instead
+    # of being kept as a grid of Cell objects
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Bill of Quantities")
+
+    # Define styles
+    header_fill = PatternFill(start_color="2196F3", end_color="2196F3", fill_type="solid")
+    header_font = Font(bold=True, color="FFFFFF", size=12)
+    header_alignment = Alignment(horizontal="center", vertical="center")
+
+    total_fill = PatternFill(start_color="4CAF50", end_color="4CAF50", fill_type="solid")
+    total_font = Font(bold=True, color="FFFFFF", size=12)
+
+    # Margin header style
+    margin_fill = PatternFill(start_color="FF9800", end_color="FF9800", fill_type="solid")
+
+    border = Border(
+        left=Side(style='thin'),
+        right=Side(style='thin'),
+        top=Side(style='thin'),
+        bottom=Side(style='thin')
+    )
+    center = Alignment(horizontal="center", vertical="center")
+    right = Alignment(horizontal="right", vertical="center")
+
+    def cell(sheet, value=None, **style):
+        c = WriteOnlyCell(sheet, value=value)
+        for name, style_value in style.items():
+            setattr(c, name, style_value)
+        return c
+
+    # Column widths and merges have to be declared before rows are written
+    widths = (8, 30, 15, 10, 12, 18, 15, 10, 15, 20, 20, 10)
+    for col, width in zip("ABCDEFGHIJKL", widths):
+        ws.column_dimensions[col].width = width
+
+    data_start_row = 4
+    data_end_row = data_start_row + len(items) - 1
+    total_row = len(items) + 5
+    margin_row = total_row + 1
+    ws.merged_cells.add('A1:L1')
+    ws.merged_cells.add(f'A{total_row}:F{total_row}')
+    ws.merged_cells.add(f'A{margin_row}:F{margin_row}')
+    ws.row_dimensions[1].height = 30
+
+    # Add title
+    ws.append([cell(ws, "BILL OF QUANTITIES (BOQ)", font=Font(bold=True, size=16, color="2196F3"), alignment=center)])
+    ws.append([])
+
+    # Add headers
+    headers = ["№", "Adı", "Kateqoriya", "Miqdar", "Ölçü Vahidi", "Vahid Qiymət (AZN)", "Cəmi (AZN)", "Marja %", "Yekun (AZN)", "Mənbə", "Qeyd", "Növ"]
+    ws.append([
+        # Use orange color for margin columns
+        cell(ws, header, fill=margin_fill if col_num in (8, 9) else header_fill,
+             font=header_font, alignment=header_alignment, border=border)
+        for col_num, header in enumerate(headers, 1)
+    ])
+
+    # Add data
+    for row_num, item in enumerate(items, data_start_row):
+        ws.append([
+            cell(ws, item['id'], border=border),
+            cell(ws, item['name'], border=border),
+            cell(ws, item.get('category', '') or 'N/A', border=border),
+            cell(ws, item['quantity'], border=border, number_format='0.00'),
+            cell(ws, item['unit'], border=border),
+            cell(ws, item['unit_price_azn'], border=border, number_format='0.00'),
+            # Cəmi (cost)
+            cell(ws, f"=D{row_num}*F{row_num}", border=border, number_format='0.00'),
+            cell(ws, item.get('margin_percent', 0), border=border, number_format='0.0'),
+            # Yekun (with margin)
+            cell(ws, f"=G{row_num}*(1+H{row_num}/100)", border=border, number_format='0.00'),
+            cell(ws, item.get('source', '') or 'N/A', border=border),
+            cell(ws, item.get('note', '') or 'N/A', border=border),
+            cell(ws, "Xüsusi" if item.get('is_custom') else "DB", border=border),
+        ])
+
+    # Add total row
+    ws.append([])
+    ws.append(
+        [cell(ws, "MAYA DƏYƏRİ:", fill=header_fill, font=total_font, alignment=right, border=border)]
+        + [None] * 5
+        + [
+            cell(ws, f"=SUM(G{data_start_row}:G{data_end_row})", fill=header_fill, font=total_font,
+                 alignment=center, border=border, number_format='0.00'),
+            cell(ws, "TOPLAM:", fill=margin_fill, font=total_font, alignment=center, border=border),
+            cell(ws, f"=SUM(I{data_start_row}:I{data_end_row})", fill=total_fill, font=total_font,
+                 alignment=center, border=border, number_format='0.00'),
+        ]
+        + [cell(ws, fill=total_fill, border=border) for _ in range(3)]
+    )
+
+    # Add margin summary row
+    ws.append(
+        [cell(ws, "MARJA:", fill=margin_fill, font=total_font, alignment=right, border=border)]
+        + [None] * 5
+        + [cell(ws, f"=I{total_row}-G{total_row}", fill=margin_fill, font=total_font,
+                alignment=center, border=border, number_format='0.00')]
+        + [cell(ws, fill=margin_fill, border=border) for _ in range(5)]
+    )
+
+    # Category totals sheet
+    category_ws = wb.create_sheet(title="Category Totals")
+    category_ws.column_dimensions['A'].width = 25
+    category_ws.column_dimensions['B'].width = 18
+    category_ws.append([
+        cell(category_ws, header, fill=header_fill, font=header_font, alignment=header_alignment, border=border)
+        for header in ("Kateqoriya", "Yekun (AZN)")
+    ])
+
+    categories = []
+    seen = set()
+    for item in items:
+        category = item.get("category", "") or "N/A"
+        if category not in seen:
+            seen.add(category)
+            categories.append(category)
+
+    for idx, category in enumerate(categories, start=2):
+        category_ws.append([
+            cell(category_ws, category, border=border),
+            cell(
+                category_ws,
+                f"=SUMIF('Bill of Quantities'!$C${data_start_row}:$C${data_end_row},A{idx},'Bill of Quantities'!$I${data_start_row}:$I${data_end_row})",
+                border=border,
+                number_format='0.00'
+            ),
+        ])
+
+    category_total_row = len(categories) + 2
+    category_ws.append([
+        cell(category_ws, "CƏMİ", border=border, font=total_font),
+        cell(category_ws, f"=SUM(B2:B{category_total_row - 1})", border=border, font=total_font, number_format='0.00'),
+    ])
+
+    # Save file
+    wb.save(file_path)
+
+
+def _write_combined_workbook(boqs, items, file_path):
+    """Build the combined Smeta workbook (one quantity/total column pair per
+    Smeta) and save it to file_path"""
+    # Write-only workbook: rows are streamed out as they are appended
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Combined Smeta")
+
+    # Define styles
+    header_fill = PatternFill(start_color="2196F3", end_color="2196F3", fill_type="solid")
+    header_font = Font(bold=True, color="FFFFFF", size=11)
+    header_alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
+
+    total_fill = PatternFill(start_color="4CAF50", end_color="4CAF50", fill_type="solid")
+    total_font = Font(bold=True, color="FFFFFF", size=11)
+
+    border = Border(
+        left=Side(style='thin'),
+        right=Side(style='thin'),
+        top=Side(style='thin'),
+        bottom=Side(style='thin')
+    )
+    bold_font = Font(bold=True)
+    center = Alignment(horizontal="center", vertical="center")
+    right = Alignment(horizontal="right", vertical="center")
+    qty_format = '0.00'
+    money_format = '#,##0.00'
+
+    def cell(value=None, **style):
+        c = WriteOnlyCell(ws, value=value)
+        for name, style_value in style.items():
+            setattr(c, name, style_value)
+        return c
+
+    num_boqs = len(boqs)
+    last_col_idx = 5 + (2 * num_boqs) + 2
+    qty_cols = []
+    final_cols = []
+    base_col = 6
+    for i in range(num_boqs):
+        qty_cols.append(base_col + (i * 2))
+        final_cols.append(base_col + (i * 2) + 1)
+    total_qty_col_idx = base_col + (num_boqs * 2)
+    total_final_col_idx = total_qty_col_idx + 1
+
+    # Column widths and merges have to be declared before rows are written
+    ws.column_dimensions['A'].width = 6
+    ws.column_dimensions['B'].width = 35
+    ws.column_dimensions['C'].width = 15
+    ws.column_dimensions['D'].width = 12
+    ws.column_dimensions['E'].width = 18
+
+    # Smeta qty/final + Total Qty + Total Final, starting from F
+    for col_idx in range(base_col, total_final_col_idx + 1):
+        ws.column_dimensions[get_column_letter(col_idx)].width = 14
+
+    first_data_row = 4
+    total_row = first_data_row + len(items) + 1
+    ws.merged_cells.add(f'A1:{get_column_letter(last_col_idx)}1')
+    ws.merged_cells.add(f'A{total_row}:{get_column_letter(total_final_col_idx - 1)}{total_row}')
+    ws.row_dimensions[1].height = 30
+
+    # Title
+    ws.append([cell("BİRLƏŞDİRİLMİŞ BILL OF QUANTITIES (BOQ)",
+                    font=Font(bold=True, size=16, color="2196F3"),
+                    alignment=center)])
+    ws.append([])
+
+    # Headers
+    headers = ["№", "Adı", "Kateqoriya", "Ölçü Vahidi", "Vahid Qiymət (AZN)"]
+    for boq in boqs:
+        headers.append(f"{boq['name']}\n(Miqdar)")
+        headers.append(f"{boq['name']}\n(Yekun AZN)")
+    headers.append("Cəmi\nMiqdar")
+    headers.append("Cəmi\nYekun (AZN)")
+    ws.append([
+        cell(header, fill=header_fill, font=header_font, alignment=header_alignment, border=border)
+        for header in headers
+    ])
+
+    # Column letters for the per-row SUM formulas, resolved once
+    qty_letters = [get_column_letter(c) for c in qty_cols]
+    final_letters = [get_column_letter(c) for c in final_cols]
+
+    # Data rows
+    for idx, item_data in enumerate(items, 1):
+        row_num = first_data_row + idx - 1
+        row = [
+            cell(idx, border=border),
+            cell(item_data['name'], border=border),
+            cell(item_data['category'] or 'N/A', border=border),
+            cell(item_data['unit'], border=border),
+            cell(item_data['unit_price'], border=border, number_format=qty_format),
+        ]
+
+        # Quantities and margin totals for each Smeta
+        unit_price_value = float(item_data.get('unit_price') or 0)
+        for boq in boqs:
+            # Items missing from a Smeta count as zero there
+            boq_entry = item_data['boq_data'].get(boq['name'], _NO_COMBINED_ENTRY)
+            qty = boq_entry['quantity']
+            margin_pct = boq_entry['margin_percent']
+            try:
+                margin_pct_value = float(margin_pct)
+            except (TypeError, ValueError):
+                margin_pct_value = 0.0
+            final_total = unit_price_value * float(qty or 0) * (1 + margin_pct_value / 100)
+
+            row.append(cell(qty, border=border, number_format=qty_format))
+            row.append(cell(final_total, border=border, number_format=money_format))
+
+        # Total quantity column (SUM formula of qty columns)
+        qty_sum_cells = ",".join([f"{letter}{row_num}" for letter in qty_letters])
+        row.append(cell(f"=SUM({qty_sum_cells})", border=border, number_format=qty_format,
+                        font=bold_font))
+
+        # Total final price column (SUM of margin totals)
+        final_sum_cells = ",".join([f"{letter}{row_num}" for letter in final_letters])
+        row.append(cell(f"=SUM({final_sum_cells})", border=border, number_format=money_format,
+                        font=bold_font))
+
+        ws.append(row)
+
+    # Grand total row
+    ws.append([])
+    total_final_col_letter = get_column_letter(total_final_col_idx)
+    last_data_row = first_data_row + len(items) - 1
+    ws.append(
+        [cell("ÜMUMİ MƏBLƏĞ:", fill=total_fill, font=total_font,
+              alignment=right, border=border)]
+        + [None] * (total_final_col_idx - 2)
+        + [cell(f"=SUM({total_final_col_letter}{first_data_row}:{total_final_col_letter}{last_data_row})",
+                fill=total_fill, font=total_font,
+                alignment=center, border=border, number_format=money_format)]
+    )
+
+    # Save file
+    wb.save(file_path)
+
+
+class _ExcelExportWorker(QObject):
+    finished = pyqtSignal(str)
+    error = pyqtSignal(str)
+
+    def __init__(self, items, file_path):
+        super().__init__()
+        self.items = items
+        self.file_path = file_path
+
+    def run(self):
+        try:
+            _write_boq_workbook(self.items, self.file_path)
+            self.finished.emit(self.file_path)
+        except Exception as e:
+            self.error.emit(str(e))
+
+
+class _CloudSaveWorker(QObject):
+    finished = pyqtSignal(bool, str)
+
+    def __init__(self, db, name, items, next_id, string_count):
+        super().__init__()
+        self.db = db
+        self.name = name
+        self.items = items
+        self.next_id = next_id
+        self.string_count = string_count
+
+    def run(self):
+        try:
+            _, is_new = self.db.save_boq_to_cloud(
+                self.name,
+                self.items,
+                self.next_id,
+                self.string_count
+            )
+            self.finished.emit(is_new, "")
+        except Exception as e:
+            self.finished.emit(False, str(e))
@@ -2,18 +2,73 @@
 Database layer for the PyQt CRUD application.
 """
 
+import functools
+import hashlib
+import os
 import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from urllib.parse import quote_plus
 
-from pymongo import MongoClient, ASCENDING, TEXT
+from pymongo import MongoClient, IndexModel, ReturnDocument, ASCENDING, DESCENDING, TEXT
+from pymongo.errors import OperationFailure
 from bson.objectid import ObjectId
 import gridfs
 
 
+@functools.lru_cache(maxsize=1024)
+def _escape(term):
+    """Regex-escape a search term (memoized for live search keystrokes)"""
+    return re.escape(term)
+
+
+def _available_compressors():
+    """Wire compressors supported by this install, best first"""
+    compressors = []
+    try:
+        import zstandard  # noqa: F401
+        compressors.append("zstd")
+    except ImportError:
+        pass
+    try:
+        import snappy  # noqa: F401
+        compressors.append("snappy")
+    except ImportError:
+        pass
+    compressors.append("zlib")
+    return ",".join(compressors)
+
+
+# Local spill directory for GridFS images (files are immutable per ID)
+IMAGE_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "smeta_pro", "images")
+
 class DatabaseManager:
     """Handles all MongoDB database operations"""
 
+    # (host, port, database) keys whose indexes were ensured in this process
+    _indexes_ensured = set()
+
+    # Maximum number of price_history entries kept per product
+    PRICE_HISTORY_LIMIT = 50
+
+    # GridFS chunk size for images (default 255 KB means many chunk
+    # documents for a multi-MB photo)
+    IMAGE_CHUNK_SIZE = 1024 * 1024
+
+    # In-memory image cache budget
+    _IMAGE_CACHE_MAX_BYTES = 128 << 20
+
+    # Disk spill budget; least recently used files are trimmed past it
+    _IMAGE_DISK_CACHE_MAX_BYTES = 512 << 20
+
+    # Product search results are reused for this many seconds; any product
+    # write through this manager drops them sooner
+    _SEARCH_CACHE_TTL = 30
+    _SEARCH_CACHE_MAX_ENTRIES = 64
+
     def __init__(self, host="", port=27017, database="smeta",
                  username="", password=""):
         """
@@ -35,8 +90,20 @@ class DatabaseManager:
         self.db = None
         self.collection = None
         self.fs = None  # GridFS for storing images
+        self._image_cache = OrderedDict()  # file_id str -> bytes, LRU order
+        self._image_cache_bytes = 0
+        self._image_cache_lock = threading.Lock()
+        self._image_pool = None  # Created on first prefetch
+        self._disk_cache_bytes = None  # Size of IMAGE_CACHE_DIR, scanned on first spill
+        self._disk_cache_lock = threading.Lock()
+        self._search_cache = OrderedDict()  # search args -> (time, products), LRU order
+        self._search_cache_lock = threading.Lock()
+        self._search_cache_generation = 0  # Bumped by every invalidation
         self.connect()
-        self.setup_indexes()
+        key = (self.host, self.port, self.database)
+        if key not in DatabaseManager._indexes_ensured:
+            if self.setup_indexes():
+                DatabaseManager._indexes_ensured.add(key)
 
     def connect(self):
         """Create and maintain database connection"""
@@ -52,10 +119,18 @@ class DatabaseManager:
             else:
                 connection_string = f"mongodb://{self.host}:{self.port}/"
 
+            # Small pool for a single-user desktop client; compress traffic
+            # with whatever codecs are installed
             self.client = MongoClient(
                 connection_string,
                 serverSelectionTimeoutMS=5000,
-                connectTimeoutMS=5000
+                connectTimeoutMS=5000,
+                maxPoolSize=10,
+                minPoolSize=1,
+                maxIdleTimeMS=60000,
+                compressors=_available_compressors(),
+                retryWrites=True,
+                tz_aware=True
             )
             self.db = self.client[self.database]
             self.collection = self.db['products']
@@ -68,25 +143,65 @@ class DatabaseManager:
         except Exception as e:
             raise Exception(f"Database connection error: {e}")
 
-    def setup_indexes(self):
-        """Create indexes for faster searching"""
+    @staticmethod
+    def _ensure_indexes(collection, indexes):
+        """Create whichever of ``indexes`` (IndexModels) are missing, in one
+        createIndexes command; returns False if that failed"""
         try:
-            # Create text indexes for search functionality
-            self.collection.create_index([
+            existing = collection.index_information()
+            missing = [index for index in indexes if index.document['name'] not in existing]
+            if missing:
+                collection.create_indexes(missing)
+            return True
+        except Exception:
+            # Could not create indexes (silent for GUI app)
+            return False
+
+    def setup_indexes(self):
+        """Create indexes for faster searching; returns True when they are in place"""
+        # Each collection is handled on its own so one failure doesn't skip the
+        # rest; when its indexes already exist that costs a single round trip
+        ok = self._ensure_indexes(self.collection, [
+            # Text index for search plus regular indexes for common queries
+            IndexModel([
                 ("mehsulun_adi", TEXT),
                 ("mehsul_menbeyi", TEXT),
                 ("qeyd", TEXT),
                 ("category", TEXT)
-            ])
-
-            # Create regular indexes for common queries
-            self.collection.create_index([("mehsulun_adi", ASCENDING)])
-            self.collection.create_index([("category", ASCENDING)])
-
-            # Indexes created successfully (silent for GUI app)
-        except Exception:
-            # Could not create indexes (silent for GUI app)
-            pass
+            ]),
+            IndexModel([("mehsulun_adi", ASCENDING)]),
+            IndexModel([("category", ASCENDING)]),
+        ])
+
+        # GridFS: image deletes/reads look up chunks by files_id
+        ok = self._ensure_indexes(self.db['fs.chunks'], [
+            IndexModel([("files_id", ASCENDING), ("n", ASCENDING)], unique=True),
+        ]) and ok
+        ok = self._ensure_indexes(self.db['fs.files'], [
+            IndexModel([("uploadDate", ASCENDING)]),
+            IndexModel([("metadata.sha1", ASCENDING)]),
+        ]) and ok
+
+        # Cloud BoQs and projects are listed by last modification
+        ok = self._ensure_indexes(self.boq_collection, [
+            IndexModel([("updated_at", DESCENDING)]),
+        ]) and ok
+        ok = self._ensure_indexes(self.db['projects'], [
+            IndexModel([("updated_at", DESCENDING)]),
+        ]) and ok
+
+        # Unique Smeta and template names are best effort: databases written
+        # by older versions may already hold duplicate names, and nothing
+        # depends on the constraint, so these don't count towards the result.
+        # Templates are listed in creation order, which the _id index covers.
+        self._ensure_indexes(self.boq_collection, [
+            IndexModel([("name", ASCENDING)], unique=True),
+        ])
+        self._ensure_indexes(self.db['boq_templates'], [
+            IndexModel([("name", ASCENDING)], unique=True),
+        ])
+
+        return ok
 
     def create_product(self, mehsulun_adi, price, mehsul_menbeyi, qeyd, olcu_vahidi,
                        category, image_id=None, currency="AZN", price_azn=None, price_round=False):
@@ -107,44 +222,94 @@ class DatabaseManager:
             if image_id:
                 product['image_id'] = image_id
             result = self.collection.insert_one(product)
+            self._invalidate_search_cache()
             return str(result.inserted_id)
         except Exception as e:
             raise Exception(f"Failed to create product: {e}")
 
+    # Fields left out of list queries; price history is loaded on demand
+    # via get_price_history()
+    LIST_PROJECTION = {'price_history': 0}
+
     def read_all_products(self):
-        """Read all products"""
+        """Read all products (without price history)"""
         try:
-            products = list(self.collection.find().sort("_id", ASCENDING))
-            # Convert ObjectId to string for display
-            for product in products:
-                product['id'] = str(product['_id'])
-            return products
+            # Callers use '_id' directly; every method accepts str or ObjectId
+            return list(self.collection.find({}, self.LIST_PROJECTION).sort("_id", ASCENDING))
         except Exception as e:
             raise Exception(f"Failed to read products: {e}")
 
-    def read_product(self, product_id):
-        """Read a single product by ID"""
+    def iter_products(self, batch_size=500, projection=None):
+        """Yield products in batches of ``batch_size``.
+
+        ``projection`` defaults to everything except price history.
+        """
+        try:
+            if projection is None:
+                projection = self.LIST_PROJECTION
+            cursor = self.collection.find({}, projection).sort("_id", ASCENDING).batch_size(batch_size)
+            batch = []
+            for product in cursor:
+                batch.append(product)
+                if len(batch) >= batch_size:
+                    yield batch
+                    batch = []
+            if batch:
+                yield batch
+        except Exception as e:
+            raise Exception(f"Failed to read products: {e}")
+
+    def read_product(self, product_id, projection=None):
+        """Read a single product by ID.
+
+        ``projection`` limits the returned fields; by default the whole
+        document is returned.
+        """
         try:
             # Handle both string and ObjectId
             if isinstance(product_id, str):
                 product_id = ObjectId(product_id)
 
-            product = self.collection.find_one({'_id': product_id})
+            product = self.collection.find_one({'_id': product_id}, projection)
             if product:
                 product['id'] = str(product['_id'])
             return product
         except Exception as e:
             raise Exception(f"Failed to read product: {e}")
 
+    def read_products_bulk(self, product_ids, projection=None):
+        """Read several products in one query, keyed by their string ID"""
+        try:
+            # Items often repeat a product; ask for each ID only once
+            object_ids = set()
+            for product_id in product_ids:
+                if isinstance(product_id, str):
+                    if not ObjectId.is_valid(product_id):
+                        continue
+                    product_id = ObjectId(product_id)
+                object_ids.add(product_id)
+            if not object_ids:
+                return {}
+            return {
+                str(product['_id']): product
+                for product in self.collection.find({'_id': {'$in': list(object_ids)}}, projection)
+            }
+        except Exception as e:
+            raise Exception(f"Failed to read products: {e}")
+
     def get_price_history(self, product_id):
-        """Get price history for a product"""
+        """Get price history for a product, newest first"""
         try:
             if isinstance(product_id, str):
                 product_id = ObjectId(product_id)
 
-            product = self.collection.find_one({'_id': product_id})
+            product = self.collection.find_one({'_id': product_id}, {'price_history': 1, '_id': 0})
             if product:
-                return product.get('price_history', [])
+                # Entries are $push-ed in chronological order, so reversing
+                # the stored array is enough to get newest first
+                history = product.get('price_history', [])
+                history.reverse()
+                return history
             return []
         except Exception as e:
             raise Exception(f"Failed to get price history: {e}")
@@ -189,14 +354,21 @@ class DatabaseManager:
                     'currency': 'AZN',
                     'changed_at': datetime.now(timezone.utc)
                 }
-                update_data['$push'] = {'price_history': history_entry}
+                # Keep only the most recent entries so the document stays small
+                update_data['$push'] = {
+                    'price_history': {
+                        '$each': [history_entry],
+                        '$slice': -self.PRICE_HISTORY_LIMIT
+                    }
+                }
 
             # Handle image update
             if image_id is not None:
                 # Delete old image if exists
-                if current_product and current_product.get('image_id'):
+                old_image_id = current_product.get('image_id') if current_product else None
+                if old_image_id and str(old_image_id) != str(image_id):
                     try:
-                        self.fs.delete(current_product['image_id'])
+                        self._release_image(old_image_id, product_id)
                     except Exception:
                         pass
 
@@ -206,6 +378,7 @@ class DatabaseManager:
                     update_data['$unset'] = {'image_id': ''}
 
             result = self.collection.update_one({'_id': product_id}, update_data)
+            self._invalidate_search_cache()
             return result.modified_count > 0 or result.matched_count > 0
         except Exception as e:
             raise Exception(f"Failed to update product: {e}")
@@ -220,47 +393,116 @@ class DatabaseManager:
             product = self.collection.find_one({'_id': product_id})
             if product and product.get('image_id'):
                 try:
-                    self.fs.delete(product['image_id'])
+                    self._release_image(product['image_id'], product_id)
                 except Exception:
                     pass
 
             result = self.collection.delete_one({'_id': product_id})
+            self._invalidate_search_cache()
             return result.deleted_count > 0
         except Exception as e:
             raise Exception(f"Failed to delete product: {e}")
 
-    def search_products(self, search_term):
-        """Search products by name, source, note, or category"""
+    def search_products(self, search_term, projection=None, category=None, limit=0):
+        """Search products by name, source, note, or category.
+
+        ``projection`` limits the returned fields (e.g. for list views that
+        only show a few columns); ``None`` returns full documents.
+        ``category`` restricts results to an exact category.
+        ``limit`` caps the number of documents fetched; ``0`` means no limit.
+        Identical searches within ``_SEARCH_CACHE_TTL`` seconds are served
+        from memory; every call returns its own copies of the documents.
+        """
+        key = (search_term or None, category or None,
+               tuple(sorted(projection.items())) if projection else None, limit)
+        now = time.monotonic()
+        with self._search_cache_lock:
+            entry = self._search_cache.get(key)
+            if entry is not None and now - entry[0] < self._SEARCH_CACHE_TTL:
+                self._search_cache.move_to_end(key)
+                return [dict(product) for product in entry[1]]
+            generation = self._search_cache_generation
+
+        products = self._search_products(search_term, projection, category, limit)
+
+        with self._search_cache_lock:
+            # A product write while querying may have made these stale
+            if generation != self._search_cache_generation:
+                return products
+            self._search_cache[key] = (now, products)
+            self._search_cache.move_to_end(key)
+            while len(self._search_cache) > self._SEARCH_CACHE_MAX_ENTRIES:
+                self._search_cache.popitem(last=False)
+        # Callers may annotate the results; keep the cached documents pristine
+        return [dict(product) for product in products]
+
+    def _invalidate_search_cache(self):
+        """Forget cached search results after a product write"""
+        with self._search_cache_lock:
+            self._search_cache.clear()
+            self._search_cache_generation += 1
+
+    def _search_products(self, search_term, projection, category, limit):
+        def find(query, hint=None):
+            if hint:
+                try:
+                    return list(self.collection.find(query, projection).hint(hint)
+                                .sort("_id", ASCENDING).limit(limit))
+                except OperationFailure:
+                    # The hinted index is missing; let the planner choose
+                    pass
+            return list(self.collection.find(query, projection).sort("_id", ASCENDING).limit(limit))
+
         try:
             if not search_term:
-                return self.read_all_products()
+                if projection is None and not category and not limit:
+                    return self.read_all_products()
+                return find({'category': category} if category else {})
             # Use text search for better performance
-            products = list(self.collection.find(
-                {'$text': {'$search': search_term}}
-            ).sort("_id", ASCENDING))
+            query = {'$text': {'$search': search_term}}
+            if category:
+                query['category'] = category
+            products = find(query)
 
             # If no results with text search, try regex (fallback)
+            # Escape special regex characters to treat them as literals
+            escaped_term = _escape(search_term)
+
+            # Name prefix match first; an anchored regex can use the name index.
+            # Without the hint the planner may pick the _id index to satisfy
+            # the sort and walk every document; a category filter is served
+            # better by the category index, so leave that choice to the planner
+            if not products and search_term.replace(' ', '').isalnum():
+                query = {'mehsulun_adi': {'$regex': f'^{escaped_term}', '$options': 'i'}}
+                if category:
+                    query['category'] = category
+                products = find(query, None if category else [("mehsulun_adi", ASCENDING)])
+
             if not products:
-                # Escape special regex characters to treat them as literals
-                escaped_term = re.escape(search_term)
                 regex_pattern = {'$regex': escaped_term, '$options': 'i'}
-                products = list(self.collection.find({
+                query = {
                     '$or': [
                         {'mehsulun_adi': regex_pattern},
                         {'mehsul_menbeyi': regex_pattern},
                         {'qeyd': regex_pattern},
                         {'category': regex_pattern}
                     ]
-                }).sort("_id", ASCENDING))
-
-            # Convert ObjectId to string
-            for product in products:
-                product['id'] = str(product['_id'])
+                }
+                if category:
+                    query['category'] = category
+                products = find(query)
 
             return products
         except Exception as e:
             raise Exception(f"Failed to search products: {e}")
 
+    def get_categories(self):
+        """Get the sorted list of distinct product categories"""
+        try:
+            return sorted(c for c in self.collection.distinct('category') if c)
+        except Exception as e:
+            raise Exception(f"Failed to get categories: {e}")
+
     def find_product_by_name(self, name):
         """Find a product by exact name match"""
         try:
@@ -284,67 +526,253 @@ class DatabaseManager:
     def save_image(self, image_data, filename):
         """Save image to GridFS and return the file ID"""
         try:
-            file_id = self.fs.put(image_data, filename=filename)
+            # Identical uploads reuse the stored file instead of new chunks
+            sha1 = hashlib.sha1(image_data).hexdigest()
+            existing = self.db['fs.files'].find_one({'metadata.sha1': sha1}, {'_id': 1})
+            if existing:
+                return existing['_id']
+            file_id = self.fs.put(
+                image_data,
+                filename=filename,
+                chunkSize=self.IMAGE_CHUNK_SIZE,
+                metadata={'sha1': sha1}
+            )
             return file_id
         except Exception as e:
             raise Exception(f"Failed to save image: {e}")
 
+    def _release_image(self, image_id, product_id):
+        """Delete a product's image unless another product still uses it"""
+        if isinstance(image_id, str):
+            image_id = ObjectId(image_id)
+        # Deduplicated uploads can be shared between products
+        shared = self.collection.count_documents(
+            {'image_id': {'$in': [image_id, str(image_id)]}, '_id': {'$ne': product_id}},
+            limit=1
+        )
+        if shared:
+            return
+        self._evict_image(str(image_id))
+        self.fs.delete(image_id)
+
     def get_image(self, file_id):
-        """Retrieve image from GridFS"""
+        """Retrieve image from GridFS (memory and disk cached)"""
         try:
+            key = str(file_id)
+            data = self._cached_image(key)
+            if data is not None:
+                return data
             if isinstance(file_id, str):
                 file_id = ObjectId(file_id)
             image_file = self.fs.get(file_id)
-            return image_file.read()
+            data = image_file.read()
+            self._cache_image(key, data, spill=True)
+            return data
         except Exception as e:
             raise Exception(f"Failed to retrieve image: {e}")
 
     def delete_image(self, file_id):
         """Delete image from GridFS"""
         try:
+            self._evict_image(str(file_id))
             if isinstance(file_id, str):
                 file_id = ObjectId(file_id)
             self.fs.delete(file_id)
         except Exception as e:
             raise Exception(f"Failed to delete image: {e}")
 
+    def prefetch_images(self, file_ids):
+        """Warm the image cache for ``file_ids`` using parallel GridFS reads"""
+        pending = [fid for fid in file_ids
+                   if fid and self._cached_image(str(fid), load=False) is None]
+        if not pending:
+            return
+        if self._image_pool is None:
+            self._image_pool = ThreadPoolExecutor(max_workers=min(8, (os.cpu_count() or 1) * 2))
+        for file_id in pending:
+            self._image_pool.submit(self._prefetch_image, file_id)
+
+    def shutdown_prefetch(self):
+        """Stop the image prefetch pool, dropping downloads not yet started.
+
+        Called when this manager is replaced by a new connection and at exit,
+        so its idle threads and queued GridFS reads don't outlive it; a later
+        prefetch_images() call starts a new pool.
+        """
+        pool, self._image_pool = self._image_pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def _prefetch_image(self, file_id):
+        try:
+            self.get_image(file_id)
+        except Exception:
+            pass
+
+    def _cached_image(self, key, load=True):
+        """Return cached image bytes from memory or the disk spill, or None.
+
+        With ``load=False`` a disk hit is only checked for, not read.
+        """
+        with self._image_cache_lock:
+            data = self._image_cache.get(key)
+            if data is not None:
+                self._image_cache.move_to_end(key)
+                return data
+        path = os.path.join(IMAGE_CACHE_DIR, key)
+        if not load:
+            return b"" if os.path.exists(path) else None
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return None
+        try:
+            # Mark as recently used so disk trimming keeps it
+            os.utime(path)
+        except OSError:
+            pass
+        self._cache_image(key, data)
+        return data
+
+    def _cache_image(self, key, data, spill=False):
+        """Add image bytes to the LRU cache, optionally writing them to disk"""
+        if spill:
+            self._spill_image(key, data)
+        if len(data) > self._IMAGE_CACHE_MAX_BYTES:
+            return
+        with self._image_cache_lock:
+            old = self._image_cache.pop(key, None)
+            if old is not None:
+                self._image_cache_bytes -= len(old)
+            self._image_cache[key] = data
+            self._image_cache_bytes += len(data)
+            while self._image_cache_bytes > self._IMAGE_CACHE_MAX_BYTES:
+                _, evicted = self._image_cache.popitem(last=False)
+                self._image_cache_bytes -= len(evicted)
+
+    def _spill_image(self, key, data):
+        """Write image bytes to the disk cache, keeping it within its budget"""
+        try:
+            os.makedirs(IMAGE_CACHE_DIR, exist_ok=True)
+            path = os.path.join(IMAGE_CACHE_DIR, key)
+            # Write then rename so concurrent readers never see a partial file
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError:
+            return
+        with self._disk_cache_lock:
+            if self._disk_cache_bytes is None:
+                self._trim_disk_cache()
+            else:
+                self._disk_cache_bytes += len(data)
+                if self._disk_cache_bytes > self._IMAGE_DISK_CACHE_MAX_BYTES:
+                    self._trim_disk_cache()
+
+    def _trim_disk_cache(self):
+        """Measure the disk cache and delete the least recently used files
+        past its budget; called with _disk_cache_lock held"""
+        entries = []
+        try:
+            with os.scandir(IMAGE_CACHE_DIR) as it:
+                for entry in it:
+                    # Skip files still being written by another thread
+                    if entry.name.endswith('.tmp') or not entry.is_file():
+                        continue
+                    st = entry.stat()
+                    entries.append((st.st_mtime, st.st_size, entry.path))
+        except OSError:
+            pass
+        total = sum(size for _, size, _ in entries)
+        if total > self._IMAGE_DISK_CACHE_MAX_BYTES:
+            # Trim well below the cap so the next spills don't rescan at once
+            target = self._IMAGE_DISK_CACHE_MAX_BYTES * 3 // 4
+            entries.sort()
+            for _, size, path in entries:
+                if total <= target:
+                    break
+                try:
+                    os.remove(path)
+                    total -= size
+                except OSError:
+                    # In use (e.g. open for reading on Windows); try the next
+                    pass
+        self._disk_cache_bytes = total
+
+    def _evict_image(self, key):
+        """Drop an image from the memory and disk caches"""
+        with self._image_cache_lock:
+            data = self._image_cache.pop(key, None)
+            if data is not None:
+                self._image_cache_bytes -= len(data)
+        try:
+            os.remove(os.path.join(IMAGE_CACHE_DIR, key))
+        except OSError:
+            pass
+
     # BoQ Cloud Storage Methods
     def save_boq_to_cloud(self, boq_name, boq_items, next_id, string_count=0):
         """Save BoQ to MongoDB cloud"""
         try:
-            boq_data = {
-                'name': boq_name,
-                'items': boq_items,
-                'next_id': next_id,
-                'string_count': string_count,
-                'created_at': datetime.now(timezone.utc),
-                'updated_at': datetime.now(timezone.utc)
-            }
+            now = datetime.now(timezone.utc)
+            new_id = ObjectId()
 
-            # Check if BoQ with same name exists
-            existing_boq = self.boq_collection.find_one({'name': boq_name})
+            # Single atomic upsert; _id/created_at are only set on insert
+            existing_boq = self.boq_collection.find_one_and_update(
+                {'name': boq_name},
+                {
+                    '$set': {
+                        'items': boq_items,
+                        'items_count': len(boq_items),
+                        'next_id': next_id,
+                        'string_count': string_count,
+                        'updated_at': now
+                    },
+                    '$setOnInsert': {'_id': new_id, 'created_at': now}
+                },
+                projection={'_id': 1},
+                upsert=True,
+                return_document=ReturnDocument.BEFORE
+            )
 
             if existing_boq:
-                # Update existing BoQ
-                boq_data['created_at'] = existing_boq.get('created_at', datetime.now(timezone.utc))
-                boq_data['updated_at'] = datetime.now(timezone.utc)
-                self.boq_collection.update_one(
-                    {'name': boq_name},
-                    {'$set': boq_data}
-                )
                 return str(existing_boq['_id']), False  # False = updated
-            else:
-                # Insert new BoQ
-                result = self.boq_collection.insert_one(boq_data)
-                return str(result.inserted_id), True  # True = created new
+            return str(new_id), True  # True = created new
 
         except Exception as e:
             raise Exception(f"Failed to save BoQ to cloud: {e}")
 
+    # Fields needed to list cloud BoQs; the items themselves are only
+    # downloaded when a BoQ is opened. BoQs saved before items_count was
+    # stored get their count computed on the server.
+    BOQ_LIST_PROJECTION = {
+        'name': 1,
+        'updated_at': 1,
+        'items_count': {'$ifNull': ['$items_count', {'$size': {'$ifNull': ['$items', []]}}]},
+    }
+
     def get_all_cloud_boqs(self):
-        """Get list of all BoQs from cloud"""
+        """Get list of all BoQs from cloud (without their items)"""
+        try:
+            boqs = list(self.boq_collection.find({}, self.BOQ_LIST_PROJECTION).sort("updated_at", -1))
+            for boq in boqs:
+                boq['id'] = str(boq['_id'])
+            return boqs
+        except Exception as e:
+            raise Exception(f"Failed to retrieve cloud BoQs: {e}")
+
+    def get_cloud_boqs_page(self, skip=0, limit=50):
+        """Get one page of cloud BoQs (without their items), newest first"""
         try:
-            boqs = list(self.boq_collection.find().sort("updated_at", -1))
+            # _id breaks ties so consecutive pages never overlap
+            boqs = list(
+                self.boq_collection.find({}, self.BOQ_LIST_PROJECTION)
+                .sort([("updated_at", DESCENDING), ("_id", DESCENDING)])
+                .skip(skip)
+                .limit(limit)
+            )
             for boq in boqs:
                 boq['id'] = str(boq['_id'])
             return boqs
@@ -352,13 +780,21 @@ class DatabaseManager:
             raise Exception(f"Failed to retrieve cloud BoQs: {e}")
 
     def search_cloud_boqs(self, search_term):
-        """Search BoQs by name"""
+        """Search BoQs by name (without their items)"""
         try:
-            escaped_term = re.escape(search_term)
+            escaped_term = _escape(search_term)
             regex_pattern = {'$regex': escaped_term, '$options': 'i'}
-            boqs = list(self.boq_collection.find(
-                {'name': regex_pattern}
-            ).sort("updated_at", -1))
+            # An unanchored regex cannot bound an index scan, but matching
+            # against the keys of the name index means only the hits are
+            # fetched, instead of every BoQ document with its items
+            query = {'name': regex_pattern}
+            try:
+                boqs = list(self.boq_collection.find(query, self.BOQ_LIST_PROJECTION)
+                            .hint([("name", ASCENDING)]).sort("updated_at", -1))
+            except OperationFailure:
+                # The name index is missing (setup_indexes could not build it)
+                boqs = list(self.boq_collection.find(query, self.BOQ_LIST_PROJECTION)
+                            .sort("updated_at", -1))
             for boq in boqs:
                 boq['id'] = str(boq['_id'])
             return boqs
@@ -378,6 +814,18 @@ class DatabaseManager:
         except Exception as e:
             raise Exception(f"Failed to load BoQ from cloud: {e}")
 
+    def get_boqs_by_ids(self, boq_ids, projection=None):
+        """Load several BoQs in one query, returned in the order of ``boq_ids``"""
+        try:
+            object_ids = [ObjectId(boq_id) if isinstance(boq_id, str) else boq_id for boq_id in boq_ids]
+            boqs = {}
+            for boq in self.boq_collection.find({'_id': {'$in': object_ids}}, projection):
+                boq['id'] = str(boq['_id'])
+                boqs[boq['_id']] = boq
+            return [boqs[oid] for oid in object_ids if oid in boqs]
+        except Exception as e:
+            raise Exception(f"Failed to load BoQs from cloud: {e}")
+
     def delete_cloud_boq(self, boq_id):
         """Delete a BoQ from cloud"""
         try:
@@ -389,6 +837,17 @@ class DatabaseManager:
         except Exception as e:
             raise Exception(f"Failed to delete cloud BoQ: {e}")
 
+    def delete_cloud_boqs(self, boq_ids):
+        """Delete several BoQs from cloud in one request; returns how many were deleted"""
+        try:
+            object_ids = [ObjectId(boq_id) if isinstance(boq_id, str) else boq_id for boq_id in boq_ids]
+            if not object_ids:
+                return 0
+            result = self.boq_collection.delete_many({'_id': {'$in': object_ids}})
+            return result.deleted_count
+        except Exception as e:
+            raise Exception(f"Failed to delete cloud BoQs: {e}")
+
     # App Settings Methods
     def get_app_setting(self, key):
         """Get an application setting by key"""
@@ -414,7 +873,7 @@ class DatabaseManager:
 
     # BoQ Template Methods
     def save_template(self, template_name, items):
-        """Save a BoQ template to cloud"""
+        """Save a BoQ template to cloud and return its id"""
         try:
             # Initialize template collection if not exists
             if not hasattr(self, 'template_collection'):
@@ -427,7 +886,7 @@ class DatabaseManager:
                 if default_price is None:
                     default_price = item.get('unit_price', 0)
                 template_item = {
-                    'name': item['name'],
+                    'name': item.get('name', item.get('generic_name', '')),
                     'unit': item.get('unit', ''),
                     'default_price': default_price,
                     'default_price_azn': item.get('default_price_azn'),
@@ -445,26 +904,19 @@ class DatabaseManager:
                 }
                 template_items.append(template_item)
 
-            # Check if template exists
-            existing = self.template_collection.find_one({'name': template_name})
-            if existing:
-                # Update existing template
-                self.template_collection.update_one(
-                    {'name': template_name},
-                    {'$set': {
-                        'items': template_items,
-                        'updated_at': datetime.now(timezone.utc)
-                    }}
-                )
-            else:
-                # Create new template
-                self.template_collection.insert_one({
-                    'name': template_name,
-                    'items': template_items,
-                    'created_at': datetime.now(timezone.utc),
-                    'updated_at': datetime.now(timezone.utc)
-                })
-            return True
+            # Create or update the template in one upsert
+            now = datetime.now(timezone.utc)
+            template = self.template_collection.find_one_and_update(
+                {'name': template_name},
+                {
+                    '$set': {'items': template_items, 'updated_at': now},
+                    '$setOnInsert': {'created_at': now}
+                },
+                projection={'_id': 1},
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+            return str(template['_id'])
         except Exception as e:
             raise Exception(f"Failed to save template: {e}")
 
@@ -474,7 +926,30 @@ class DatabaseManager:
             if not hasattr(self, 'template_collection'):
                 self.template_collection = self.db['boq_templates']
 
-            templates = list(self.template_collection.find().sort("updated_at", -1))
+            # Newest first by creation time (embedded in the ObjectId)
+            templates = list(self.template_collection.find().sort("_id", -1))
+            for t in templates:
+                t['id'] = str(t['_id'])
+            return templates
+        except Exception as e:
+            raise Exception(f"Failed to get templates: {e}")
+
+    # Template list fields; the item count is computed server-side so the
+    # items arrays are never sent
+    TEMPLATE_LIST_PROJECTION = {
+        'name': 1,
+        'item_count': {'$size': {'$ifNull': ['$items', []]}},
+    }
+
+    def get_all_templates_summary(self):
+        """Get id, name and item count of all BoQ templates, newest first"""
+        try:
+            if not hasattr(self, 'template_collection'):
+                self.template_collection = self.db['boq_templates']
+
+            templates = list(
+                self.template_collection.find({}, self.TEMPLATE_LIST_PROJECTION).sort("_id", -1)
+            )
             for t in templates:
                 t['id'] = str(t['_id'])
             return templates
@@ -1,24 +1,148 @@
 """Dialog components for the PyQt CRUD application."""
 
+import functools
 import json
 import os
 from datetime import datetime, timezone
 import ast
 import math
+from contextlib import contextmanager
 
 from PyQt6.QtWidgets import (
     QDialog, QFormLayout, QLineEdit, QSpinBox, QPushButton, QMessageBox,
     QHBoxLayout, QVBoxLayout, QLabel, QTextEdit, QFileDialog,
-    QScrollArea, QTableWidget, QTableWidgetItem, QHeaderView, QComboBox,
+    QScrollArea, QTableView, QHeaderView, QComboBox,
     QDoubleSpinBox, QCheckBox, QRadioButton, QButtonGroup
 )
-from PyQt6.QtCore import Qt, QTimer, QSettings
-from PyQt6.QtGui import QFont, QColor, QPixmap
+from PyQt6.QtCore import (
+    Qt, QTimer, QSettings, QObject, QThread, pyqtSignal, QAbstractTableModel,
+    QBuffer, QIODevice, QSignalBlocker
+)
+from PyQt6.QtGui import QFont, QColor, QPixmap, QImageReader, QIcon, QPainter
 
 from db import DatabaseManager
 from currency_settings import CurrencySettingsManager
 
 
+# Shared button stylesheets
+_BTN_BLUE_QSS = """
+QPushButton {
+    background-color: #2196F3;
+    color: white;
+    padding: 8px 16px;
+    border: none;
+    border-radius: 4px;
+    font-weight: bold;
+}
+QPushButton:hover {
+    background-color: #1976D2;
+}
+"""
+
+_BTN_GREEN_QSS = """
+QPushButton {
+    background-color: #4CAF50;
+    color: white;
+    padding: 8px 16px;
+    border: none;
+    border-radius: 4px;
+    font-weight: bold;
+}
+QPushButton:hover {
+    background-color: #45a049;
+}
+"""
+
+_BTN_RED_QSS = """
+QPushButton {
+    background-color: #f44336;
+    color: white;
+    padding: 8px 16px;
+    border: none;
+    border-radius: 4px;
+    font-weight: bold;
+}
+QPushButton:hover {
+    background-color: #da190b;
+}
+"""
+
+_BTN_PURPLE_QSS = """
+QPushButton {
+    background-color: #9C27B0;
+    color: white;
+    padding: 6px 12px;
+    border: none;
+    border-radius: 4px;
+}
+QPushButton:hover {
+    background-color: #7B1FA2;
+}
+"""
+
+
+# Leading bytes of the formats we store: JPEG, PNG, GIF, BMP, WebP
+_IMAGE_MAGIC = (b'\xff\xd8\xff', b'\x89PNG', b'GIF8', b'BM', b'RIFF')
+
+
+def _looks_like_image(data):
+    """Cheap signature check so empty or corrupt blobs skip the decoder"""
+    return bool(data) and len(data) >= 8 and bytes(data[:4]).startswith(_IMAGE_MAGIC)
+
+
+def _as_float(value, default):
+    """float(value), or default when the field is missing"""
+    return float(value) if value is not None else default
+
+
+@functools.lru_cache(maxsize=None)
+def _title_font(size):
+    """Bold title font of the given point size, built once per size"""
+    font = QFont()
+    font.setPointSize(size)
+    font.setBold(True)
+    return font
+
+
+@contextmanager
+def _frozen_table(table):
+    """Fill a QTableWidget without per-cell repaints, signals or re-sorting;
+    the previous sorting state is restored on exit"""
+    sorting = table.isSortingEnabled()
+    table.setSortingEnabled(False)
+    table.setUpdatesEnabled(False)
+    blocker = QSignalBlocker(table)
+    try:
+        yield table
+    finally:
+        blocker.unblock()
+        table.setUpdatesEnabled(True)
+        table.setSortingEnabled(sorting)
+        table.viewport().update()
+
+
+@functools.lru_cache(maxsize=None)
+def _emoji_icon(glyph):
+    """Render an emoji glyph to an icon once, so buttons paint a pixmap
+    instead of shaping a colour-font glyph on every repaint"""
+    pixmap = QPixmap(32, 32)
+    pixmap.fill(Qt.GlobalColor.transparent)
+    painter = QPainter(pixmap)
+    font = QFont()
+    font.setPixelSize(24)
+    painter.setFont(font)
+    painter.drawText(pixmap.rect(), Qt.AlignmentFlag.AlignCenter, glyph)
+    painter.end()
+    return QIcon(pixmap)
+
+
+def _icon_button(glyph, text):
+    """QPushButton with a pre-rendered emoji icon and plain text label"""
+    button = QPushButton(text)
+    button.setIcon(_emoji_icon(glyph))
+    return button
+
+
 def _safe_eval_expr(expr, variables=None):
     """Safely evaluate simple arithmetic expressions."""
     node = ast.parse(expr, mode="eval")
@@ -72,12 +196,134 @@ def _format_price(value):
     return f"{value:.2f}"
 
 
+def _downscale_image(file_path, max_side=1600, quality=85):
+    """Decode an image (applying EXIF orientation), shrink it to ``max_side``
+    and re-encode it. Returns (data, extension) or None if not applicable."""
+    reader = QImageReader(file_path)
+    reader.setAutoTransform(True)
+    if reader.imageCount() > 1:
+        return None  # Keep animations as they are
+    image = reader.read()
+    if image.isNull():
+        return None
+    if max(image.width(), image.height()) > max_side:
+        image = image.scaled(
+            max_side, max_side,
+            Qt.AspectRatioMode.KeepAspectRatio,
+            Qt.TransformationMode.SmoothTransformation
+        )
+    # JPEG has no alpha channel; keep transparent images as PNG
+    if image.hasAlphaChannel():
+        fmt, extension, quality = "PNG", ".png", -1
+    else:
+        fmt, extension = "JPEG", ".jpg"
+    buffer = QBuffer()
+    buffer.open(QIODevice.OpenModeFlag.WriteOnly)
+    if not image.save(buffer, fmt, quality):
+        return None
+    return bytes(buffer.data()), extension
+
+
+class _ConnectionTestWorker(QObject):
+    finished = pyqtSignal(bool, str)
+
+    def __init__(self, params):
+        super().__init__()
+        self.params = params
+
+    def run(self):
+        try:
+            db = DatabaseManager(**self.params)
+            try:
+                success, message = db.test_connection()
+            finally:
+                db.client.close()
+            self.finished.emit(success, message)
+        except Exception as e:
+            self.finished.emit(False, str(e))
+
+
+class _ProductSaveWorker(QObject):
+    finished = pyqtSignal(str, str)
+
+    def __init__(self, db, data):
+        super().__init__()
+        self.db = db
+        self.data = data
+
+    def run(self):
+        data = self.data
+        try:
+            # Handle image upload
+            image_id = None
+            if data['image_data']:
+                image_id = self.db.save_image(data['image_data'], data['image_filename'])
+
+            self.db.create_product(
+                data['mehsulun_adi'],
+                data['price'],
+                data['mehsul_menbeyi'],
+                data['qeyd'],
+                data['olcu_vahidi'],
+                data['category'],
+                image_id=image_id,
+                currency=data.get('currency', 'AZN'),
+                price_azn=data.get('price_azn'),
+                price_round=data.get('price_round', False)
+            )
+            self.finished.emit(data['mehsulun_adi'], "")
+        except Exception as e:
+            self.finished.emit(data['mehsulun_adi'], str(e))
+
+
+class _ProductSearchWorker(QObject):
+    finished = pyqtSignal(list, str)
+
+    # Rows shown in the selection table
+    RESULT_LIMIT = 100
+
+    def __init__(self, db, search_text, category, projection):
+        super().__init__()
+        self.db = db
+        self.search_text = search_text
+        self.category = category
+        self.projection = projection
+
+    def run(self):
+        search_text = self.search_text
+        category = self.category
+        try:
+            # Use the db's search method if available
+            if hasattr(self.db, 'search_products'):
+                products = self.db.search_products(
+                    search_text if search_text else None,
+                    projection=self.projection,
+                    category=category,
+                    limit=self.RESULT_LIMIT
+                )
+            else:
+                products = self.db.read_all_products()
+                if search_text:
+                    search_lower = search_text.lower()
+                    products = [p for p in products if search_lower in p.get('mehsulun_adi', '').lower()]
+                if category:
+                    products = [p for p in products if p.get('category') == category]
+                products = products[:self.RESULT_LIMIT]
+            self.finished.emit(products, "")
+        except Exception as e:
+            self.finished.emit([], str(e))
+
+
 class DatabaseConfigDialog(QDialog):
     """Dialog for configuring database connection"""
 
+    # (mtime_ns, config) of the last parsed config file
+    _CONFIG_CACHE = None
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.config_file = os.path.join(os.path.dirname(__file__), 'db_config.json')
+        self._test_thread = None
         self.init_ui()
         self.load_saved_config()
 
@@ -156,35 +402,11 @@ class DatabaseConfigDialog(QDialog):
 
         self.connect_btn = QPushButton("✅ Qoşul")
         self.connect_btn.clicked.connect(self.accept)
-        self.connect_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #4CAF50;
-                color: white;
-                padding: 8px 16px;
-                border: none;
-                border-radius: 4px;
-                font-weight: bold;
-            }
-            QPushButton:hover {
-                background-color: #45a049;
-            }
-        """)
+        self.connect_btn.setStyleSheet(_BTN_GREEN_QSS)
 
         self.cancel_btn = QPushButton("❌ Ləğv Et")
         self.cancel_btn.clicked.connect(self.reject)
-        self.cancel_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #f44336;
-                color: white;
-                padding: 8px 16px;
-                border: none;
-                border-radius: 4px;
-                font-weight: bold;
-            }
-            QPushButton:hover {
-                background-color: #da190b;
-            }
-        """)
+        self.cancel_btn.setStyleSheet(_BTN_RED_QSS)
 
         button_layout.addWidget(self.test_btn)
         button_layout.addWidget(self.connect_btn)
@@ -195,33 +417,73 @@ class DatabaseConfigDialog(QDialog):
         self.setLayout(layout)
 
     def test_connection(self):
-        """Test the database connection with current parameters"""
-        try:
-            db = DatabaseManager(
-                host=self.host_input.text().strip(),
-                port=self.port_input.value(),
-                database=self.database_input.text().strip(),
-                username=self.user_input.text().strip(),
-                password=self.password_input.text()
+        """Test the database connection with current parameters (in background)"""
+        if self._test_thread is not None:
+            return
+
+        params = {
+            'host': self.host_input.text().strip(),
+            'port': self.port_input.value(),
+            'database': self.database_input.text().strip(),
+            'username': self.user_input.text().strip(),
+            'password': self.password_input.text()
+        }
+        self.test_btn.setEnabled(False)
+        self.test_btn.setText("⏳ Yoxlanılır...")
+
+        self._test_thread = QThread(self)
+        self._test_worker = _ConnectionTestWorker(params)
+        self._test_worker.moveToThread(self._test_thread)
+        self._test_worker.finished.connect(self._on_test_finished)
+        self._test_thread.started.connect(self._test_worker.run)
+        self._test_worker.finished.connect(self._test_thread.quit)
+        self._test_thread.finished.connect(self._test_worker.deleteLater)
+        self._test_thread.finished.connect(self._test_thread.deleteLater)
+        self._test_thread.start()
+
+    def _on_test_finished(self, success, message):
+        if self._test_thread is None:
+            # The dialog was closed while the test ran
+            return
+        self._test_thread = None
+        self._test_worker = None
+        self.test_btn.setEnabled(True)
+        self.test_btn.setText("🔌 Əlaqəni Yoxla")
+        if success:
+            QMessageBox.information(
+                self,
+                "Uğurlu",
+                f"Verilənlər bazasına əlaqə uğurlu!\n\n{message}"
             )
-            success, message = db.test_connection()
-            if success:
-                QMessageBox.information(
-                    self,
-                    "Uğurlu",
-                    f"Verilənlər bazasına əlaqə uğurlu!\n\n{message}"
-                )
-            else:
-                QMessageBox.warning(self, "Xəta", f"Əlaqə uğursuz:\n{message}")
-        except Exception as e:
-            QMessageBox.critical(self, "Xəta", f"Əlaqə xətası:\n{str(e)}")
+        else:
+            QMessageBox.warning(self, "Xəta", f"Əlaqə uğursuz:\n{message}")
+
+    def done(self, result):
+        # Let a running connection test finish before the dialog goes away.
+        # The worker's finished->quit connection is queued to this (blocked)
+        # thread, so stop the thread's event loop directly before waiting.
+        if self._test_thread is not None:
+            self._test_thread.quit()
+            self._test_thread.wait()
+            self._test_thread = None
+            self._test_worker = None
+        super().done(result)
 
     def load_saved_config(self):
         """Load saved configuration from file"""
         try:
-            if os.path.exists(self.config_file):
-                with open(self.config_file, 'r', encoding='utf-8') as f:
-                    config = json.load(f)
+            try:
+                mtime = os.stat(self.config_file).st_mtime_ns
+            except FileNotFoundError:
+                mtime = None
+            if mtime is not None:
+                cache = DatabaseConfigDialog._CONFIG_CACHE
+                if cache and cache[0] == mtime:
+                    config = cache[1]
+                else:
+                    with open(self.config_file, 'r', encoding='utf-8') as f:
+                        config = json.load(f)
+                    DatabaseConfigDialog._CONFIG_CACHE = (mtime, config)
 
                 # Load values into inputs
                 self.host_input.setText(config.get('host', ''))
@@ -247,6 +509,7 @@ class DatabaseConfigDialog(QDialog):
                 'password': self.password_input.text() if self.remember_password_checkbox.isChecked() else ""
             }
 
+            DatabaseConfigDialog._CONFIG_CACHE = None
             with open(self.config_file, 'w', encoding='utf-8') as f:
                 json.dump(config, f, ensure_ascii=False, indent=2)
         except Exception as e:
@@ -255,6 +518,7 @@ class DatabaseConfigDialog(QDialog):
     def delete_saved_config(self):
         """Delete saved configuration file"""
         try:
+            DatabaseConfigDialog._CONFIG_CACHE = None
             if os.path.exists(self.config_file):
                 os.remove(self.config_file)
         except Exception as e:
@@ -331,10 +595,15 @@ class CsvImportOptionsDialog(QDialog):
 class ImageViewerDialog(QDialog):
     """Dialog for viewing product images"""
 
-    def __init__(self, parent=None, image_data=None, product_name=""):
+    # Smooth-scaled previews keyed by image ID, so reopening is instant
+    _preview_cache = {}
+    _PREVIEW_CACHE_SIZE = 32
+
+    def __init__(self, parent=None, image_data=None, product_name="", image_key=None):
         super().__init__(parent)
         self.image_data = image_data
         self.product_name = product_name
+        self.image_key = image_key
         self.init_ui()
 
     def init_ui(self):
@@ -348,17 +617,22 @@ class ImageViewerDialog(QDialog):
         self.image_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         self.image_label.setStyleSheet("background-color: #f0f0f0; border: 2px solid #ccc;")
 
-        if self.image_data:
+        cached = self._preview_cache.get(self.image_key) if self.image_key else None
+        if cached is not None:
+            self.image_label.setPixmap(cached)
+        elif _looks_like_image(self.image_data):
             pixmap = QPixmap()
             pixmap.loadFromData(self.image_data)
 
-            # Scale image to fit window while maintaining aspect ratio
-            scaled_pixmap = pixmap.scaled(
+            # Scale image to fit window while maintaining aspect ratio:
+            # show a fast preview now, replace it with a smooth one right after
+            fast_pixmap = pixmap.scaled(
                 800, 800,
                 Qt.AspectRatioMode.KeepAspectRatio,
-                Qt.TransformationMode.SmoothTransformation
+                Qt.TransformationMode.FastTransformation
             )
-            self.image_label.setPixmap(scaled_pixmap)
+            self.image_label.setPixmap(fast_pixmap)
+            QTimer.singleShot(0, lambda: self._show_smooth(pixmap))
         else:
             self.image_label.setText("Şəkil yoxdur")
             self.image_label.setStyleSheet("color: #999; font-size: 16px;")
@@ -372,23 +646,99 @@ class ImageViewerDialog(QDialog):
         # Close button
         close_btn = QPushButton("❌ Bağla")
         close_btn.clicked.connect(self.accept)
-        close_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #2196F3;
-                color: white;
-                padding: 8px 16px;
-                border: none;
-                border-radius: 4px;
-                font-weight: bold;
-            }
-            QPushButton:hover {
-                background-color: #1976D2;
-            }
-        """)
+        close_btn.setStyleSheet(_BTN_BLUE_QSS)
         layout.addWidget(close_btn)
 
         self.setLayout(layout)
 
+    def _show_smooth(self, pixmap):
+        scaled_pixmap = pixmap.scaled(
+            800, 800,
+            Qt.AspectRatioMode.KeepAspectRatio,
+            Qt.TransformationMode.SmoothTransformation
+        )
+        self.image_label.setPixmap(scaled_pixmap)
+        if self.image_key:
+            if len(self._preview_cache) >= self._PREVIEW_CACHE_SIZE:
+                self._preview_cache.pop(next(iter(self._preview_cache)))
+            self._preview_cache[self.image_key] = scaled_pixmap
+
+
+class PriceHistoryModel(QAbstractTableModel):
+    """Read-only model for price history entries, newest first"""
+
+    headers = ["Tarix", "Köhnə Qiymət (AZN)", "Yeni Qiymət (AZN)", "Dəyişiklik"]
+    # Indexed by sign(diff) + 1: green for decrease, none, red for increase
+    _DIFF_COLORS = (QColor("#4CAF50"), None, QColor("#f44336"))
+
+    def __init__(self, history, parent=None):
+        super().__init__(parent)
+        oldest = datetime.min.replace(tzinfo=timezone.utc)
+        self._rows = list(history)
+        # get_price_history already returns newest first; only sort when
+        # handed history in some other order
+        dates = [entry.get('changed_at') or oldest for entry in self._rows]
+        if any(a < b for a, b in zip(dates, dates[1:])):
+            self._rows.sort(key=lambda x: x.get('changed_at') or oldest, reverse=True)
+        # Format dates once instead of on every paint; bulk price edits
+        # share timestamps, so each distinct value is formatted only once
+        fmt_cache = {}
+        self._dates = []
+        for entry in self._rows:
+            changed_at = entry.get('changed_at')
+            date_str = fmt_cache.get(changed_at)
+            if date_str is None:
+                date_str = self._format_date(changed_at)
+                fmt_cache[changed_at] = date_str
+            self._dates.append(date_str)
+        # Parallel columns computed once, so data() only indexes
+        self._old = [entry.get('old_price', 0) for entry in self._rows]
+        self._new = [entry.get('new_price', 0) for entry in self._rows]
+        self._diff = [new - old for old, new in zip(self._old, self._new)]
+        self._colors = [self._DIFF_COLORS[(d > 0) - (d < 0) + 1] for d in self._diff]
+
+    @staticmethod
+    def _format_date(changed_at):
+        if not changed_at:
+            return "N/A"
+        if hasattr(changed_at, 'astimezone'):
+            if changed_at.tzinfo is None:
+                changed_at = changed_at.replace(tzinfo=timezone.utc)
+            return changed_at.astimezone().strftime("%d.%m.%Y %H:%M")
+        return str(changed_at)
+
+    def rowCount(self, parent=None):
+        return len(self._rows)
+
+    def columnCount(self, parent=None):
+        return len(self.headers)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.headers[section]
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        row = index.row()
+        column = index.column()
+
+        if role == Qt.ItemDataRole.DisplayRole:
+            if column == 0:
+                return self._dates[row]
+            if column == 1:
+                return f"{self._old[row]:.2f}"
+            if column == 2:
+                return f"{self._new[row]:.2f}"
+            if column == 3:
+                return f"{self._diff[row]:+.2f}"
+
+        if role == Qt.ItemDataRole.ForegroundRole and column == 3:
+            return self._colors[row]
+
+        return None
+
 
 class PriceHistoryDialog(QDialog):
     """Dialog to show price change history for a product"""
@@ -409,10 +759,7 @@ class PriceHistoryDialog(QDialog):
 
         # Title
         title = QLabel(f"Qiymət Tarixi: {self.product_name}")
-        title_font = QFont()
-        title_font.setPointSize(14)
-        title_font.setBold(True)
-        title.setFont(title_font)
+        title.setFont(_title_font(14))
         title.setStyleSheet("color: #2196F3; padding: 10px;")
         layout.addWidget(title)
 
@@ -421,14 +768,13 @@ class PriceHistoryDialog(QDialog):
         current_label.setStyleSheet("font-size: 14px; font-weight: bold; color: #4CAF50; padding: 5px;")
         layout.addWidget(current_label)
 
-        # Table for history
-        self.table = QTableWidget()
-        self.table.setColumnCount(4)
-        self.table.setHorizontalHeaderLabels(["Tarix", "Köhnə Qiymət (AZN)", "Yeni Qiymət (AZN)", "Dəyişiklik"])
+        # Table for history (newest first)
+        self.table = QTableView()
+        self.table.setModel(PriceHistoryModel(self.price_history, self))
         self.table.verticalHeader().hide()
         self.table.setAlternatingRowColors(True)
-        self.table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
-        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.table.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
+        self.table.setEditTriggers(QTableView.EditTrigger.NoEditTriggers)
 
         # Resize columns
         header = self.table.horizontalHeader()
@@ -437,45 +783,6 @@ class PriceHistoryDialog(QDialog):
         header.setSectionResizeMode(2, QHeaderView.ResizeMode.ResizeToContents)
         header.setSectionResizeMode(3, QHeaderView.ResizeMode.ResizeToContents)
 
-        # Populate table (newest first)
-        sorted_history = sorted(self.price_history, key=lambda x: x.get('changed_at', datetime.min), reverse=True)
-
-        for entry in sorted_history:
-            row = self.table.rowCount()
-            self.table.insertRow(row)
-
-            # Date
-            changed_at = entry.get('changed_at')
-            if changed_at:
-                if hasattr(changed_at, 'astimezone'):
-                    if changed_at.tzinfo is None:
-                        changed_at = changed_at.replace(tzinfo=timezone.utc)
-                    local_time = changed_at.astimezone()
-                    date_str = local_time.strftime("%d.%m.%Y %H:%M")
-                else:
-                    date_str = str(changed_at)
-            else:
-                date_str = "N/A"
-            self.table.setItem(row, 0, QTableWidgetItem(date_str))
-
-            # Old price
-            old_price = entry.get('old_price', 0)
-            self.table.setItem(row, 1, QTableWidgetItem(f"{old_price:.2f}"))
-
-            # New price
-            new_price = entry.get('new_price', 0)
-            self.table.setItem(row, 2, QTableWidgetItem(f"{new_price:.2f}"))
-
-            # Change (difference)
-            diff = new_price - old_price
-            diff_text = f"+{diff:.2f}" if diff >= 0 else f"{diff:.2f}"
-            diff_item = QTableWidgetItem(diff_text)
-            if diff > 0:
-                diff_item.setForeground(QColor("#f44336"))  # Red for increase
-            elif diff < 0:
-                diff_item.setForeground(QColor("#4CAF50"))  # Green for decrease
-            self.table.setItem(row, 3, diff_item)
-
         layout.addWidget(self.table)
 
         # Info label if no history
@@ -488,19 +795,7 @@ class PriceHistoryDialog(QDialog):
         # Close button
         close_btn = QPushButton("❌ Bağla")
         close_btn.clicked.connect(self.accept)
-        close_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #2196F3;
-                color: white;
-                padding: 8px 16px;
-                border: none;
-                border-radius: 4px;
-                font-weight: bold;
-            }
-            QPushButton:hover {
-                background-color: #1976D2;
-            }
-        """)
+        close_btn.setStyleSheet(_BTN_BLUE_QSS)
         layout.addWidget(close_btn)
 
         self.setLayout(layout)
@@ -526,11 +821,10 @@ class ProductDialog(QDialog):
         self.image_filename = None
         self.remove_image = False  # Flag to indicate image removal
 
-        # Timer for clearing status messages in dialog
-        if self.mode == "add":
-            self.status_clear_timer = QTimer()
-            self.status_clear_timer.setSingleShot(True)
-            self.status_clear_timer.timeout.connect(self._clear_dialog_status)
+        # Timer for clearing status messages, created on first status update
+        self.status_clear_timer = None
+        self._save_thread = None
+        self._save_worker = None
 
         self.init_ui()
 
@@ -590,27 +884,16 @@ class ProductDialog(QDialog):
 
         # Image upload section
         image_layout = QHBoxLayout()
-        self.upload_image_btn = QPushButton("📷 Şəkil Yüklə")
+        self.upload_image_btn = _icon_button("📷", "Şəkil Yüklə")
         self.upload_image_btn.clicked.connect(self.upload_image)
-        self.upload_image_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #9C27B0;
-                color: white;
-                padding: 6px 12px;
-                border: none;
-                border-radius: 4px;
-            }
-            QPushButton:hover {
-                background-color: #7B1FA2;
-            }
-        """)
+        self.upload_image_btn.setStyleSheet(_BTN_PURPLE_QSS)
         image_layout.addWidget(self.upload_image_btn)
 
         self.image_status_label = QLabel("Şəkil yoxdur")
         self.image_status_label.setStyleSheet("color: #666; font-style: italic;")
         image_layout.addWidget(self.image_status_label)
 
-        self.remove_image_btn = QPushButton("🗑️ Şəkli Sil")
+        self.remove_image_btn = _icon_button("🗑️", "Şəkli Sil")
         self.remove_image_btn.clicked.connect(self.remove_image_action)
         self.remove_image_btn.setVisible(False)
         self.remove_image_btn.setStyleSheet("""
@@ -671,41 +954,17 @@ class ProductDialog(QDialog):
         button_layout = QHBoxLayout()
 
         if self.mode == "add":
-            self.save_btn = QPushButton("💾 Əlavə Et və Davam Et")
+            self.save_btn = _icon_button("💾", "Əlavə Et və Davam Et")
             self.save_btn.clicked.connect(self.save_and_continue)
         else:
-            self.save_btn = QPushButton("💾 Yadda Saxla")
+            self.save_btn = _icon_button("💾", "Yadda Saxla")
             self.save_btn.clicked.connect(self.accept)
 
-        self.save_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #4CAF50;
-                color: white;
-                padding: 8px 16px;
-                border: none;
-                border-radius: 4px;
-                font-weight: bold;
-            }
-            QPushButton:hover {
-                background-color: #45a049;
-            }
-        """)
+        self.save_btn.setStyleSheet(_BTN_GREEN_QSS)
 
-        self.cancel_btn = QPushButton("❌ Bağla" if self.mode == "add" else "❌ Ləğv Et")
+        self.cancel_btn = _icon_button("❌", "Bağla" if self.mode == "add" else "Ləğv Et")
         self.cancel_btn.clicked.connect(self.reject)
-        self.cancel_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #f44336;
-                color: white;
-                padding: 8px 16px;
-                border: none;
-                border-radius: 4px;
-                font-weight: bold;
-            }
-            QPushButton:hover {
-                background-color: #da190b;
-            }
-        """)
+        self.cancel_btn.setStyleSheet(_BTN_RED_QSS)
 
         button_layout.addWidget(self.save_btn)
         button_layout.addWidget(self.cancel_btn)
@@ -725,9 +984,18 @@ class ProductDialog(QDialog):
 
         if file_path:
             try:
-                with open(file_path, 'rb') as f:
-                    self.image_data = f.read()
-                    self.image_filename = os.path.basename(file_path)
+                self.image_filename = os.path.basename(file_path)
+                # Store a downscaled copy when it is smaller than the original
+                # (EXIF metadata is dropped by re-encoding)
+                downscaled = _downscale_image(file_path)
+                if downscaled and len(downscaled[0]) < os.path.getsize(file_path):
+                    self.image_data, extension = downscaled
+                    self.image_filename = os.path.splitext(self.image_filename)[0] + extension
+                else:
+                    # Read into bytes so the file isn't held open (and locked
+                    # on Windows) and every save stores the whole image
+                    with open(file_path, 'rb') as f:
+                        self.image_data = f.read()
 
                 self.image_status_label.setText(f"✓ {self.image_filename}")
                 self.image_status_label.setStyleSheet("color: #4CAF50; font-weight: bold;")
@@ -801,62 +1069,71 @@ class ProductDialog(QDialog):
 
     def save_and_continue(self):
         """Save product and clear form for adding another (add mode only)"""
+        if self._save_thread is not None:
+            return
         if not self.name_input.text().strip():
             self.status_label.setText("⚠️ Məhsulun adı mütləqdir!")
             self.status_label.setStyleSheet("color: #f44336; font-weight: bold; padding: 5px;")
             return
 
+        # Call parent window's database to create product (in background)
+        if not (self.parent_window and self.parent_window.db):
+            return
         data = self.get_data()
-        try:
-            # Call parent window's database to create product
-            if self.parent_window and self.parent_window.db:
-                # Handle image upload
-                image_id = None
-                if data['image_data']:
-                    image_id = self.parent_window.db.save_image(data['image_data'], data['image_filename'])
-
-                self.parent_window.db.create_product(
-                    data['mehsulun_adi'],
-                    data['price'],
-                    data['mehsul_menbeyi'],
-                    data['qeyd'],
-                    data['olcu_vahidi'],
-                    data['category'],
-                    image_id=image_id,
-                    currency=data.get('currency', 'AZN'),
-                    price_azn=data.get('price_azn'),
-                    price_round=data.get('price_round', False)
-                )
+        self.save_btn.setEnabled(False)
+
+        self._save_thread = QThread(self)
+        self._save_worker = _ProductSaveWorker(self.parent_window.db, data)
+        self._save_worker.moveToThread(self._save_thread)
+        self._save_worker.finished.connect(self._on_product_saved)
+        self._save_thread.started.connect(self._save_worker.run)
+        self._save_worker.finished.connect(self._save_thread.quit)
+        self._save_thread.finished.connect(self._save_worker.deleteLater)
+        self._save_thread.finished.connect(self._save_thread.deleteLater)
+        self._save_thread.start()
+
+    def _on_product_saved(self, product_name, error):
+        self._save_thread = None
+        self._save_worker = None
+        self.save_btn.setEnabled(True)
+
+        if error:
+            self.status_label.setText(f"❌ Xəta: {error}")
+            self.status_label.setStyleSheet("color: #f44336; font-weight: bold; padding: 5px;")
+            # Auto-clear error after 4 seconds
+            self._schedule_status_clear(4000)
+            return
 
-                # Show success status in dialog
-                self.status_label.setText(f"✅ '{data['mehsulun_adi']}' uğurla əlavə edildi!")
-                self.status_label.setStyleSheet("color: #4CAF50; font-weight: bold; padding: 5px;")
+        # Show success status in dialog
+        self.status_label.setText(f"✅ '{product_name}' uğurla əlavə edildi!")
+        self.status_label.setStyleSheet("color: #4CAF50; font-weight: bold; padding: 5px;")
 
-                # Auto-clear dialog status after 2 seconds
-                self.status_clear_timer.stop()
-                self.status_clear_timer.start(2000)
+        # Auto-clear dialog status after 2 seconds
+        self._schedule_status_clear(2000)
 
-                # Update parent window's table
-                self.parent_window.load_products(preserve_status=True)
+        # Update parent window's table
+        self.parent_window.load_products(preserve_status=True)
 
-                # Show status in main window
-                self.parent_window.show_status(
-                    f"✅ '{data['mehsulun_adi']}' məhsulu əlavə edildi",
-                    color="#4CAF50"
-                )
+        # Show status in main window
+        self.parent_window.show_status(
+            f"✅ '{product_name}' məhsulu əlavə edildi",
+            color="#4CAF50"
+        )
 
-                # Clear form for next entry
-                self.clear_form()
+        # Clear form for next entry
+        self.clear_form()
 
-                # Set focus back to name field
-                self.name_input.setFocus()
+        # Set focus back to name field
+        self.name_input.setFocus()
 
-        except Exception as e:
-            self.status_label.setText(f"❌ Xəta: {str(e)}")
-            self.status_label.setStyleSheet("color: #f44336; font-weight: bold; padding: 5px;")
-            # Auto-clear error after 4 seconds
-            self.status_clear_timer.stop()
-            self.status_clear_timer.start(4000)
+    def done(self, result):
+        # Let an in-flight product save finish before the dialog goes away;
+        # quit first, as the worker's finished->quit is queued to this thread.
+        # _on_product_saved still runs afterwards and refreshes the parent.
+        if self._save_thread is not None:
+            self._save_thread.quit()
+            self._save_thread.wait()
+        super().done(result)
 
     def clear_form(self):
         """Clear all input fields"""
@@ -877,6 +1154,14 @@ class ProductDialog(QDialog):
         self.image_status_label.setStyleSheet("color: #666; font-style: italic;")
         self.remove_image_btn.setVisible(False)
 
+    def _schedule_status_clear(self, msec):
+        """(Re)start the status clear timer, creating it on first use"""
+        if self.status_clear_timer is None:
+            self.status_clear_timer = QTimer(self)
+            self.status_clear_timer.setSingleShot(True)
+            self.status_clear_timer.timeout.connect(self._clear_dialog_status)
+        self.status_clear_timer.start(msec)
+
     def _clear_dialog_status(self):
         """Clear the status label in the dialog"""
         if hasattr(self, 'status_label'):
@@ -1027,8 +1312,12 @@ class SmetaItemDialog(QDialog):
         self.final_total_label.setStyleSheet("font-weight: bold; color: #4CAF50;")
         layout.addRow("Yekun (Marja ilə):", self.final_total_label)
 
-        # Connect quantity change to update total
-        self.margin_input.valueChanged.connect(self.update_total)
+        # Recalculate totals; margin spin/typing is coalesced by a short timer
+        self._recalc_timer = QTimer(self)
+        self._recalc_timer.setSingleShot(True)
+        self._recalc_timer.setInterval(50)
+        self._recalc_timer.timeout.connect(self.update_total)
+        self.margin_input.valueChanged.connect(self._recalc_timer.start)
         self.currency_input.currentTextChanged.connect(self.update_total)
 
         # Load product info button (for add_from_db mode)
@@ -1052,23 +1341,25 @@ class SmetaItemDialog(QDialog):
 
         # Fill fields if editing
         if self.item:
-            self.name_input.setText(self.item.get('name', ''))
-            self.quantity_input.setText(_format_price(float(self.item.get('quantity', 1))))
-            self.unit_input.setText(self.item.get('unit', ''))
-            self.price_input.setText(_format_price(float(self.item.get('unit_price', 0))))
-            self.quantity_round_checkbox.setChecked(bool(self.item.get('quantity_round')))
-            self.price_round_checkbox.setChecked(bool(self.item.get('price_round')))
-            currency = self.item.get('currency', 'AZN') or 'AZN'
-            self._original_price = float(self.item.get('unit_price') or 0)
+            get = self.item.get
+            unit_price = _as_float(get('unit_price'), 0.0)
+            currency = get('currency') or 'AZN'
+            self.name_input.setText(get('name', ''))
+            self.quantity_input.setText(_format_price(_as_float(get('quantity'), 1.0)))
+            self.unit_input.setText(get('unit', ''))
+            self.price_input.setText(_format_price(unit_price))
+            self.quantity_round_checkbox.setChecked(bool(get('quantity_round')))
+            self.price_round_checkbox.setChecked(bool(get('price_round')))
+            self._original_price = unit_price
             self._original_currency = currency
-            self._stored_unit_price_azn = self.item.get('unit_price_azn')
+            self._stored_unit_price_azn = get('unit_price_azn')
             idx = self.currency_input.findText(currency)
             if idx >= 0:
                 self.currency_input.setCurrentIndex(idx)
-            self.margin_input.setValue(float(self.item.get('margin_percent', 0)))
-            self.category_input.setText(self.item.get('category', '') or '')
-            self.source_input.setText(self.item.get('source', '') or '')
-            self.note_input.setPlainText(self.item.get('note', '') or '')
+            self.margin_input.setValue(_as_float(get('margin_percent'), 0.0))
+            self.category_input.setText(get('category') or '')
+            self.source_input.setText(get('source') or '')
+            self.note_input.setPlainText(get('note') or '')
             self._sync_quantity_from_input()
             self._sync_price_from_input()
 
@@ -1077,35 +1368,11 @@ class SmetaItemDialog(QDialog):
 
         self.save_btn = QPushButton("💾 Əlavə Et" if self.mode != "edit" else "💾 Yadda Saxla")
         self.save_btn.clicked.connect(self.accept)
-        self.save_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #4CAF50;
-                color: white;
-                padding: 8px 16px;
-                border: none;
-                border-radius: 4px;
-                font-weight: bold;
-            }
-            QPushButton:hover {
-                background-color: #45a049;
-            }
-        """)
+        self.save_btn.setStyleSheet(_BTN_GREEN_QSS)
 
         self.cancel_btn = QPushButton("❌ Ləğv Et")
         self.cancel_btn.clicked.connect(self.reject)
-        self.cancel_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #f44336;
-                color: white;
-                padding: 8px 16px;
-                border: none;
-                border-radius: 4px;
-                font-weight: bold;
-            }
-            QPushButton:hover {
-                background-color: #da190b;
-            }
-        """)
+        self.cancel_btn.setStyleSheet(_BTN_RED_QSS)
 
         button_layout.addWidget(self.save_btn)
         button_layout.addWidget(self.cancel_btn)
@@ -1147,6 +1414,7 @@ class SmetaItemDialog(QDialog):
 
     def update_total(self):
         """Update total price and final total with margin"""
+        self._recalc_timer.stop()
         quantity = self._current_quantity
         unit_price = self._current_unit_price
         currency = self.currency_input.currentText()
@@ -1164,6 +1432,8 @@ class SmetaItemDialog(QDialog):
 
     def get_data(self):
         """Get form data"""
+        if self._recalc_timer.isActive():
+            self.update_total()
         product_id = None
         if self.mode == "add_from_db" and hasattr(self, 'product_combo') and self.product_combo.text().strip():
             product_id = self.product_combo.text().strip()
@@ -1513,9 +1783,87 @@ class TemplateItemDialog(QDialog):
         self.amount_input.setText(self._amount_expr)
 
 
+class ProductSelectionModel(QAbstractTableModel):
+    """Read-only model over product search results"""
+
+    headers = ["ID", "Məhsul Adı", "Kateqoriya", "Qiymət"]
+
+    def __init__(self, currency_manager, parent=None):
+        super().__init__(parent)
+        self.currency_manager = currency_manager
+        self._rows = []
+        self._ids = []
+        self._prices = []
+
+    def set_products(self, products):
+        """Replace the results in one model reset"""
+        self.beginResetModel()
+        self._rows = list(products)
+        # Parallel columns computed once, so data() only indexes
+        self._ids = [str(product['_id']) for product in self._rows]
+        self._prices = [self._format_price(product) for product in self._rows]
+        self.endResetModel()
+
+    def product(self, row):
+        return self._rows[row]
+
+    def _format_price(self, product):
+        currency = product.get('currency', 'AZN') or 'AZN'
+        price_value = product.get('price')
+        if price_value is None:
+            price_value = 0
+        price = float(price_value)
+        if currency == "AZN":
+            return f"{price:.2f} AZN"
+        price_azn = product.get('price_azn')
+        if price_azn is None:
+            price_azn = self.currency_manager.convert_to_azn(price, currency)
+        return f"{price_azn:.2f} AZN ({price:.2f} {currency})"
+
+    def rowCount(self, parent=None):
+        return len(self._rows)
+
+    def columnCount(self, parent=None):
+        return len(self.headers)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.headers[section]
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role != Qt.ItemDataRole.DisplayRole:
+            return None
+        row = index.row()
+        column = index.column()
+        if column == 0:
+            return self._ids[row]
+        if column == 1:
+            return self._rows[row].get('mehsulun_adi', '')
+        if column == 2:
+            return self._rows[row].get('category', '')
+        if column == 3:
+            return self._prices[row]
+        return None
+
+
 class ProductSelectionDialog(QDialog):
     """Dialog for selecting a product when loading a generic template item"""
 
+    # Fields needed to render the result table; the full document is
+    # fetched only for the product the user actually picks.
+    SEARCH_PROJECTION = {
+        '_id': 1,
+        'mehsulun_adi': 1,
+        'category': 1,
+        'olcu_vahidi': 1,
+        'price': 1,
+        'price_azn': 1,
+        'price_round': 1,
+        'currency': 1,
+        'mehsul_menbeyi': 1,
+    }
+
     def __init__(self, parent=None, db=None, generic_name="", category=""):
         super().__init__(parent)
         self.db = db
@@ -1524,6 +1872,10 @@ class ProductSelectionDialog(QDialog):
         self.selected_product = None
         self.skip_all = False
         self.currency_manager = CurrencySettingsManager(self.db)
+        self._search_thread = None
+        self._search_worker = None
+        # A search asked for while another is still running
+        self._search_pending = False
         # Column preferences
         self.settings = QSettings("SmetaPro", "ProductSelectionDialog")
         self.column_widths = {}
@@ -1552,24 +1904,42 @@ class ProductSelectionDialog(QDialog):
         self.search_input = QLineEdit()
         self.search_input.setPlaceholderText("Məhsul adı ilə axtar...")
         self.search_input.setText(self.generic_name)  # Pre-fill with generic name
-        self.search_input.textChanged.connect(self.search_products)
+        # Search once typing pauses instead of on every keystroke
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(200)
+        self._search_timer.timeout.connect(self.search_products)
+        self.search_input.textChanged.connect(self._search_timer.start)
         search_layout.addWidget(search_label)
         search_layout.addWidget(self.search_input)
+
+        category_label = QLabel("Kateqoriya:")
+        self.category_filter = QComboBox()
+        self.category_filter.addItem("Hamısı", None)
+        if hasattr(self.db, 'get_categories'):
+            try:
+                for category in self.db.get_categories():
+                    self.category_filter.addItem(category, category)
+            except Exception:
+                pass
+        self.category_filter.currentIndexChanged.connect(self.search_products)
+        search_layout.addWidget(category_label)
+        search_layout.addWidget(self.category_filter)
         layout.addLayout(search_layout)
 
         # Products table
-        self.products_table = QTableWidget()
-        self.products_table.setColumnCount(4)
-        self.products_table.setHorizontalHeaderLabels(["ID", "Məhsul Adı", "Kateqoriya", "Qiymət"])
+        self.products_model = ProductSelectionModel(self.currency_manager, self)
+        self.products_table = QTableView()
+        self.products_table.setModel(self.products_model)
         self.products_table.verticalHeader().hide()
-        self.products_table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
-        self.products_table.setSelectionMode(QTableWidget.SelectionMode.SingleSelection)
-        self.products_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.products_table.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
+        self.products_table.setSelectionMode(QTableView.SelectionMode.SingleSelection)
+        self.products_table.setEditTriggers(QTableView.EditTrigger.NoEditTriggers)
         self.products_table.doubleClicked.connect(self.accept)
 
         header = self.products_table.horizontalHeader()
         # Set interactive resizing
-        for i in range(self.products_table.columnCount()):
+        for i in range(self.products_model.columnCount()):
             header.setSectionResizeMode(i, QHeaderView.ResizeMode.Interactive)
         
         # Set default column widths and minimums
@@ -1615,47 +1985,43 @@ class ProductSelectionDialog(QDialog):
         self.search_products()
 
     def search_products(self):
-        """Search products by name"""
-        self.products_table.setRowCount(0)
-        search_text = self.search_input.text().strip()
-
-        try:
-            # Use the db's search method if available
-            if hasattr(self.db, 'search_products'):
-                products = self.db.search_products(search_text if search_text else None)
-            else:
-                products = self.db.read_all_products()
-                if search_text:
-                    search_lower = search_text.lower()
-                    products = [p for p in products if search_lower in p.get('mehsulun_adi', '').lower()]
-
-            for product in products[:100]:  # Limit to 100 results
-                row = self.products_table.rowCount()
-                self.products_table.insertRow(row)
-
-                id_item = QTableWidgetItem(str(product['_id']))
-                id_item.setData(Qt.ItemDataRole.UserRole, product)
-                self.products_table.setItem(row, 0, id_item)
-
-                self.products_table.setItem(row, 1, QTableWidgetItem(product.get('mehsulun_adi', '')))
-                self.products_table.setItem(row, 2, QTableWidgetItem(product.get('category', '')))
-
-                currency = product.get('currency', 'AZN') or 'AZN'
-                price_value = product.get('price')
-                if price_value is None:
-                    price_value = 0
-                price = float(price_value)
-                price_azn = product.get('price_azn')
-                if price_azn is None:
-                    price_azn = self.currency_manager.convert_to_azn(price, currency)
-                if currency == "AZN":
-                    price_text = f"{price:.2f} AZN"
-                else:
-                    price_text = f"{price_azn:.2f} AZN ({price:.2f} {currency})"
-                self.products_table.setItem(row, 3, QTableWidgetItem(price_text))
+        """Search products by name on a worker thread"""
+        self._search_timer.stop()
+        if self._search_thread is not None:
+            # Re-run with the latest input once the current query is back
+            self._search_pending = True
+            return
+        self._search_pending = False
+
+        self._search_thread = QThread(self)
+        self._search_worker = _ProductSearchWorker(
+            self.db,
+            self.search_input.text().strip(),
+            self.category_filter.currentData(),
+            self.SEARCH_PROJECTION
+        )
+        self._search_worker.moveToThread(self._search_thread)
+        self._search_worker.finished.connect(self._on_search_finished)
+        self._search_thread.started.connect(self._search_worker.run)
+        self._search_worker.finished.connect(self._search_thread.quit)
+        self._search_thread.finished.connect(self._search_worker.deleteLater)
+        self._search_thread.finished.connect(self._search_thread.deleteLater)
+        self._search_thread.start()
+
+    def _on_search_finished(self, products, error):
+        if self._search_thread is None:
+            # The dialog was closed while the search ran
+            return
+        self._search_thread = None
+        self._search_worker = None
+        if self._search_pending:
+            # The input changed meanwhile; these results are already stale
+            self.search_products()
+            return
+        if error:
+            print(f"Search error: {error}")
 
-        except Exception as e:
-            print(f"Search error: {e}")
+        self.products_model.set_products(products)
 
     def get_selected_product(self):
         """Get the selected product"""
@@ -1666,6 +2032,17 @@ class ProductSelectionDialog(QDialog):
         self.skip_all = True
         self.reject()
 
+    def done(self, result):
+        # Let an in-flight search finish before the dialog goes away
+        # Quit first: the worker's finished->quit is queued to this thread
+        self._search_pending = False
+        if self._search_thread is not None:
+            self._search_thread.quit()
+            self._search_thread.wait()
+            self._search_thread = None
+            self._search_worker = None
+        super().done(result)
+
     def on_column_resized(self, logicalIndex, oldSize, newSize):
         """Save column width preferences, ensuring minimum size."""
         if logicalIndex in self.column_min_widths:
@@ -1679,9 +2056,16 @@ class ProductSelectionDialog(QDialog):
         self.settings.setValue(f"column_width_{logicalIndex}", newSize)
 
     def accept(self):
-        selected_row = self.products_table.currentRow()
+        selected_row = self.products_table.currentIndex().row()
         if selected_row >= 0:
-            self.selected_product = self.products_table.item(selected_row, 0).data(Qt.ItemDataRole.UserRole)
+            product = self.products_model.product(selected_row)
+            # Search results are projected; load the full document (note etc.)
+            if product and hasattr(self.db, 'read_product'):
+                try:
+                    product = self.db.read_product(product['_id']) or product
+                except Exception:
+                    pass
+            self.selected_product = product
             super().accept()
         else:
             QMessageBox.warning(self, "Xəbərdarlıq", "Məhsul seçin!")
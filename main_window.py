@@ -9,7 +9,10 @@ from PyQt6.QtWidgets import (
     QPushButton, QLineEdit, QLabel, QMessageBox, QHeaderView,
     QMenu, QFileDialog, QDialog
 )
-from PyQt6.QtCore import Qt, QTimer, QAbstractTableModel, QSortFilterProxyModel, QSettings
+from PyQt6.QtCore import (
+    Qt, QTimer, QAbstractTableModel, QSortFilterProxyModel, QSettings,
+    QModelIndex, QObject, QThread, pyqtSignal
+)
 from PyQt6.QtGui import QFont, QColor, QShortcut, QKeySequence
 
 from db import DatabaseManager
@@ -23,6 +26,31 @@ from settings_dialog import CurrencySettingsDialog
 from currency_settings import CurrencySettingsManager
 
 
+class _ProductLoadWorker(QObject):
+    batch_loaded = pyqtSignal(list)
+    finished = pyqtSignal()
+    error = pyqtSignal(str)
+
+    BATCH_SIZE = 500
+
+    def __init__(self, db):
+        super().__init__()
+        self.db = db
+        # Set from the GUI thread to stop between batches
+        self.cancelled = False
+
+    def run(self):
+        try:
+            for batch in self.db.iter_products(batch_size=self.BATCH_SIZE,
+                                               projection=ProductTableModel.PROJECTION):
+                if self.cancelled:
+                    return
+                self.batch_loaded.emit(batch)
+            self.finished.emit()
+        except Exception as e:
+            self.error.emit(str(e))
+
+
 class MainWindow(QMainWindow):
     """Main application window"""
 
@@ -31,6 +59,9 @@ class MainWindow(QMainWindow):
         self.db = None
         self.boq_window = None  # Single Smeta window instance
         self.project_window = None  # Single Project window instance
+        self._load_thread = None
+        self._load_pending = False
+        self._load_preserve_status = False
         self.currency_manager = CurrencySettingsManager()
         self.table_model = ProductTableModel(self.currency_manager)
         self.proxy_model = ProductFilterProxyModel()
@@ -174,6 +205,8 @@ class MainWindow(QMainWindow):
         self.table.setFocusPolicy(Qt.FocusPolicy.StrongFocus)
         self.table.setModel(self.proxy_model)
         self.table.verticalHeader().hide()
+        # Fixed row height: the view never has to measure row contents
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
 
         # Table styling
         self.table.setAlternatingRowColors(True)
@@ -467,7 +500,11 @@ class MainWindow(QMainWindow):
         if dialog.exec():
             config = dialog.get_config()
             try:
-                self.db = DatabaseManager(**config)
+                new_db = DatabaseManager(**config)
+                if self.db:
+                    # The old connection's prefetch threads would otherwise idle on
+                    self.db.shutdown_prefetch()
+                self.db = new_db
                 self.currency_manager = CurrencySettingsManager(self.db)
                 self.table_model.set_currency_manager(self.currency_manager)
                 user_display = f"{config['username']}@" if config['username'] else ""
@@ -495,17 +532,73 @@ class MainWindow(QMainWindow):
                 )
 
     def load_products(self, preserve_status=False):
-        """Load all products into table"""
+        """Load all products into table (query runs on a worker thread)"""
         if not self.db:
             return
 
-        try:
-            products = self.db.read_all_products()
-            self.populate_table(products)
-            if not preserve_status:
-                self._update_info_label(filtered=bool(self.search_input.text().strip()))
-        except Exception as e:
-            QMessageBox.critical(self, "Xəta", f"Məhsullar yüklənə bilmədi:\n{str(e)}")
+        if self._load_thread is not None:
+            # A load is in flight; run one more when it completes
+            self._load_pending = True
+            self._load_preserve_status = self._load_preserve_status and preserve_status
+            return
+
+        self._load_pending = False
+        self._load_preserve_status = preserve_status
+        self._load_first_batch = True
+
+        self._load_thread = QThread(self)
+        self._load_worker = _ProductLoadWorker(self.db)
+        self._load_worker.moveToThread(self._load_thread)
+        self._load_worker.batch_loaded.connect(self._on_products_batch)
+        self._load_worker.finished.connect(self._on_products_loaded)
+        self._load_worker.error.connect(self._on_products_load_error)
+        self._load_thread.started.connect(self._load_worker.run)
+        self._load_worker.finished.connect(self._load_thread.quit)
+        self._load_worker.error.connect(self._load_thread.quit)
+        self._load_thread.finished.connect(self._load_worker.deleteLater)
+        self._load_thread.finished.connect(self._load_thread.deleteLater)
+        self._load_thread.finished.connect(self._on_load_thread_finished)
+        self._load_thread.start()
+
+    def _on_products_batch(self, products):
+        # The first batch replaces the old rows, later ones are appended
+        if self._load_first_batch:
+            self._load_first_batch = False
+            self.table_model.set_products(products)
+        else:
+            self.table_model.append_products(products)
+
+    def _on_products_loaded(self):
+        if self._load_first_batch:
+            # Empty collection: no batch arrived to clear the old rows
+            self._load_first_batch = False
+            self.table_model.set_products([])
+        self._refresh_filter_state()
+        self._prefetch_visible_images()
+        if not self._load_preserve_status:
+            self._update_info_label(filtered=bool(self.search_input.text().strip()))
+
+    def _on_products_load_error(self, message):
+        QMessageBox.critical(self, "Xəta", f"Məhsullar yüklənə bilmədi:\n{message}")
+
+    def _on_load_thread_finished(self):
+        self._load_thread = None
+        self._load_worker = None
+        if self._load_pending:
+            self.load_products(preserve_status=self._load_preserve_status)
+
+    def closeEvent(self, event):
+        # Stop a running product load so its QThread isn't destroyed while
+        # running; quit directly, as the worker's finished->quit is queued
+        # to this thread and could not run while wait() blocks
+        self._load_pending = False
+        if self._load_thread is not None:
+            self._load_worker.cancelled = True
+            self._load_thread.quit()
+            self._load_thread.wait()
+        if self.db:
+            self.db.shutdown_prefetch()
+        super().closeEvent(event)
 
     def on_column_resized(self, logicalIndex, oldSize, newSize):
         """Save column width preferences, ensuring minimum size."""
@@ -545,7 +638,7 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, "Xəbərdarlıq", "Zəhmət olmasa redaktə etmək üçün məhsul seçin!")
             return
 
-        product_id = product['id']
+        product_id = product['_id']
 
         try:
             product = self.db.read_product(product_id)
@@ -603,7 +696,7 @@ class MainWindow(QMainWindow):
         # Collect product IDs and names
         products_to_delete = []
         for product in selected_products:
-            products_to_delete.append((product['id'], product['mehsulun_adi']))
+            products_to_delete.append((product['_id'], product['mehsulun_adi']))
 
         # Confirm deletion
         if len(products_to_delete) == 1:
@@ -654,7 +747,7 @@ class MainWindow(QMainWindow):
 
         try:
             # Get product ID from the selected row
-            product_id = product['id']
+            product_id = product['_id']
             product_name = product['mehsulun_adi']
 
             # Retrieve product data
@@ -671,7 +764,10 @@ class MainWindow(QMainWindow):
                     image_data = self.db.get_image(product['image_id'])
 
                     # Show image viewer dialog
-                    viewer = ImageViewerDialog(self, image_data, product_name)
+                    viewer = ImageViewerDialog(
+                        self, image_data, product_name,
+                        image_key=str(product['image_id'])
+                    )
                     viewer.exec()
                 except Exception as e:
                     QMessageBox.warning(self, "Xəbərdarlıq", f"Şəkil yüklənə bilmədi: {e}")
@@ -691,7 +787,7 @@ class MainWindow(QMainWindow):
             return
 
         try:
-            product_id = product['id']
+            product_id = product['_id']
             product_name = product['mehsulun_adi']
 
             product = self.db.read_product(product_id)
@@ -761,7 +857,7 @@ class MainWindow(QMainWindow):
 
         try:
             # Get product ID and data
-            product_id = product['id']
+            product_id = product['_id']
             product = self.db.read_product(product_id)
 
             if not product:
@@ -831,7 +927,7 @@ class MainWindow(QMainWindow):
             if not product:
                 QMessageBox.warning(self, "Xəta", "Məhsul tapılmadı!")
                 return
-            product_id = product['id']
+            product_id = product['_id']
             product = self.db.read_product(product_id)
 
             if not product:
@@ -862,11 +958,7 @@ class MainWindow(QMainWindow):
             dialog.setWindowTitle(f"Smeta-a Əlavə Et: {product['mehsulun_adi']}")
 
             if dialog.exec():
-                data = dialog.get_data()
-                data['id'] = self.boq_window.next_id
-                self.boq_window.next_id += 1
-                self.boq_window.boq_items.append(data)
-                self.boq_window.refresh_table()
+                self.boq_window.append_items([dialog.get_data()])
                 self.show_status(f"'{product['mehsulun_adi']}' Smeta-a əlavə edildi", "#4CAF50")
 
         except Exception as e:
@@ -891,7 +983,7 @@ class MainWindow(QMainWindow):
         # Process each selected product
         added_count = 0
         for product in selected_products:
-            product_id = product['id']
+            product_id = product['_id']
 
             try:
                 # Load product from database
@@ -924,13 +1016,8 @@ class MainWindow(QMainWindow):
                 dialog.setWindowTitle(f"Smeta-a Əlavə Et: {product['mehsulun_adi']}")
 
                 if dialog.exec():
-                    # Get the data from dialog
-                    data = dialog.get_data()
-                    data['id'] = self.boq_window.next_id
-                    self.boq_window.next_id += 1
-
-                    # Add to Smeta
-                    self.boq_window.boq_items.append(data)
+                    # Add to Smeta; only the new row is inserted into its table
+                    self.boq_window.append_items([dialog.get_data()])
                     added_count += 1
                 else:
                     # User cancelled, stop processing remaining items
@@ -940,9 +1027,8 @@ class MainWindow(QMainWindow):
                 QMessageBox.critical(self, "Xəta", f"Məhsul əlavə edilərkən xəta:\n{str(e)}")
                 continue
 
-        # Refresh Smeta table and show success message
+        # Show success message
         if added_count > 0:
-            self.boq_window.refresh_table()
             if added_count == 1:
                 self.show_status("1 məhsul Smeta-a əlavə edildi", "#4CAF50")
             else:
@@ -991,9 +1077,14 @@ class MainWindow(QMainWindow):
 
     def open_boq_window(self):
         """Open the Bill of Quantities window (singleton)"""
-        if self.boq_window is None or not self.boq_window.isVisible():
+        if self.boq_window is None:
             self.boq_window = SmetaWindow(self, self.db)
             self.boq_window.show()
+        elif not self.boq_window.isVisible():
+            # A closed Smeta window is only hidden; reuse it with an empty
+            # Smeta rather than constructing (and leaking) another one
+            self.boq_window.reset_boq(self.db)
+            self.boq_window.show()
         else:
             # Bring existing window to front
             self.boq_window.raise_()
@@ -1026,6 +1117,23 @@ class MainWindow(QMainWindow):
         source_index = self.proxy_model.mapToSource(index)
         return self.table_model.product_at(source_index.row())
 
+    def _prefetch_visible_images(self):
+        """Start background downloads for images of the rows currently on screen"""
+        first = self.table.rowAt(0)
+        if first < 0:
+            return
+        last = self.table.rowAt(self.table.viewport().height() - 1)
+        if last < 0:
+            last = self.proxy_model.rowCount() - 1
+        image_ids = []
+        for row in range(first, last + 1):
+            source_index = self.proxy_model.mapToSource(self.proxy_model.index(row, 0))
+            product = self.table_model.product_at(source_index.row())
+            if product and product.get('image_id'):
+                image_ids.append(product['image_id'])
+        if image_ids:
+            self.db.prefetch_images(image_ids)
+
     def _selected_products(self):
         selected_rows = self.table.selectionModel().selectedRows()
         products = []
@@ -1186,7 +1294,7 @@ class MainWindow(QMainWindow):
                             price_last_changed = price_last_changed.replace(tzinfo=timezone.utc)
                         price_last_changed = price_last_changed.isoformat()
                     writer.writerow({
-                        "id": product.get("id"),
+                        "id": str(product["_id"]),
                         "mehsulun_adi": product.get("mehsulun_adi"),
                         "category": product.get("category", ""),
                         "price": product.get("price", 0),
@@ -1364,10 +1472,27 @@ class ProductTableModel(QAbstractTableModel):
         "Qiymət Dəyişdi (Gün)", "Məhsul Mənbəyi", "Ölçü Vahidi", "Qeyd"
     ]
 
+    # Only the fields the table shows, filters on or prefetches; actions on
+    # a row re-read the full document with read_product()
+    PROJECTION = {
+        'mehsulun_adi': 1,
+        'category': 1,
+        'price': 1,
+        'price_azn': 1,
+        'currency': 1,
+        'price_last_changed': 1,
+        'mehsul_menbeyi': 1,
+        'olcu_vahidi': 1,
+        'qeyd': 1,
+        'image_id': 1,
+    }
+
     def __init__(self, currency_manager, products=None, parent=None):
         super().__init__(parent)
         self.currency_manager = currency_manager
         self._products = list(products or [])
+        # Lower-cased search text per row, built on first filter
+        self._search_texts = [None] * len(self._products)
 
     def set_currency_manager(self, manager):
         self.currency_manager = manager
@@ -1376,8 +1501,18 @@ class ProductTableModel(QAbstractTableModel):
     def set_products(self, products):
         self.beginResetModel()
         self._products = list(products)
+        self._search_texts = [None] * len(self._products)
         self.endResetModel()
 
+    def append_products(self, products):
+        if not products:
+            return
+        first = len(self._products)
+        self.beginInsertRows(QModelIndex(), first, first + len(products) - 1)
+        self._products.extend(products)
+        self._search_texts.extend([None] * len(products))
+        self.endInsertRows()
+
     def rowCount(self, parent=None):
         return len(self._products)
 
@@ -1427,6 +1562,19 @@ class ProductTableModel(QAbstractTableModel):
             return None
         return self._products[row]
 
+    # Fields matched by the search box
+    SEARCH_FIELDS = ("_id", "mehsulun_adi", "category", "mehsul_menbeyi", "qeyd", "olcu_vahidi")
+
+    def search_text(self, row):
+        """Lower-cased searchable text of a row, computed once per product"""
+        text = self._search_texts[row]
+        if text is None:
+            product = self._products[row]
+            values = (product.get(field, "") for field in self.SEARCH_FIELDS)
+            text = " ".join(str(value) for value in values if value).lower()
+            self._search_texts[row] = text
+        return text
+
     def _display_value(self, product, column):
         if column == 0:
             return product.get("mehsulun_adi", "")
@@ -1493,16 +1641,6 @@ class ProductFilterProxyModel(QSortFilterProxyModel):
         if not self._search_text:
             return True
         model = self.sourceModel()
-        product = model.product_at(source_row)
-        if not product:
+        if source_row < 0 or source_row >= model.rowCount():
             return False
-        haystacks = [
-            product.get("id", ""),
-            product.get("mehsulun_adi", ""),
-            product.get("category", ""),
-            product.get("mehsul_menbeyi", ""),
-            product.get("qeyd", ""),
-            product.get("olcu_vahidi", ""),
-        ]
-        joined = " ".join(str(value) for value in haystacks if value)
-        return self._search_text in joined.lower()
+        return self._search_text in model.search_text(source_row)
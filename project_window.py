@@ -1,12 +1,29 @@
 """Project management window implementation."""
 
+from datetime import datetime
+
 from PyQt6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QTableWidget,
     QTableWidgetItem, QHeaderView, QPushButton, QMessageBox, QDialog,
-    QFormLayout, QLineEdit, QTextEdit
+    QFormLayout, QLineEdit, QTextEdit, QComboBox
 )
-from PyQt6.QtCore import Qt, QSettings
-from PyQt6.QtGui import QFont
+from PyQt6.QtCore import Qt, QSettings, QObject, QThread, pyqtSignal
+
+from dialogs import _title_font, _frozen_table
+
+
+class _ProjectLoadWorker(QObject):
+    finished = pyqtSignal(list, str)
+
+    def __init__(self, db):
+        super().__init__()
+        self.db = db
+
+    def run(self):
+        try:
+            self.finished.emit(self.db.get_all_projects(), "")
+        except Exception as e:
+            self.finished.emit([], str(e))
 
 
 class ProjectWindow(QMainWindow):
@@ -16,6 +33,10 @@ class ProjectWindow(QMainWindow):
         super().__init__(parent)
         self.parent_window = parent
         self.db = db
+        self._load_thread = None
+        self._load_worker = None
+        # A reload asked for while another is still running
+        self._load_pending = False
         
         # Column width preferences
         self.settings = QSettings("SmetaPro", "ProjectWindow")
@@ -39,10 +60,7 @@ class ProjectWindow(QMainWindow):
 
         # Title
         title = QLabel("Layihə İdarəetməsi")
-        title_font = QFont()
-        title_font.setPointSize(16)
-        title_font.setBold(True)
-        title.setFont(title_font)
+        title.setFont(_title_font(16))
         title.setStyleSheet("color: #2196F3; padding: 10px;")
         main_layout.addWidget(title)
 
@@ -195,38 +213,77 @@ class ProjectWindow(QMainWindow):
         self.load_projects()
 
     def load_projects(self):
-        """Load all projects into the table"""
+        """Load all projects into the table (queried on a worker thread)"""
         if not self.db:
             return
+        if self._load_thread is not None:
+            # Reload once the current query is back, so edits show up
+            self._load_pending = True
+            return
+        self._load_pending = False
+
+        self._load_thread = QThread(self)
+        self._load_worker = _ProjectLoadWorker(self.db)
+        self._load_worker.moveToThread(self._load_thread)
+        self._load_worker.finished.connect(self._on_projects_loaded)
+        self._load_thread.started.connect(self._load_worker.run)
+        self._load_worker.finished.connect(self._load_thread.quit)
+        self._load_thread.finished.connect(self._load_worker.deleteLater)
+        self._load_thread.finished.connect(self._load_thread.deleteLater)
+        self._load_thread.start()
+
+    def _on_projects_loaded(self, projects, error):
+        if self._load_thread is None:
+            # The window was closed while the query ran
+            return
+        self._load_thread = None
+        self._load_worker = None
+        if self._load_pending:
+            self.load_projects()
+            return
+        if error:
+            QMessageBox.critical(self, "Xəta", f"Layihələr yüklənərkən xəta:\n{error}")
+            return
 
         try:
-            projects = self.db.get_all_projects()
-            self.table.setRowCount(0)
-
-            for project in projects:
-                row = self.table.rowCount()
-                self.table.insertRow(row)
-
-                name_item = QTableWidgetItem(project['name'])
-                name_item.setData(Qt.ItemDataRole.UserRole, project['id'])
-                self.table.setItem(row, 0, name_item)
-
-                self.table.setItem(row, 1, QTableWidgetItem(project.get('description', '')))
-                self.table.setItem(row, 2, QTableWidgetItem(project.get('status', 'Aktiv')))
-                self.table.setItem(row, 3, QTableWidgetItem(str(len(project.get('boq_ids', [])))))
-
-                updated_at = project.get('updated_at')
-                if updated_at and hasattr(updated_at, 'astimezone'):
-                    date_str = updated_at.astimezone().strftime("%d.%m.%Y %H:%M")
-                else:
-                    date_str = "N/A"
-                self.table.setItem(row, 4, QTableWidgetItem(date_str))
+            local_tz = datetime.now().astimezone().tzinfo
+
+            # Size the table once and fill it without per-row repaints/signals
+            with _frozen_table(self.table):
+                self.table.setRowCount(0)
+                self.table.setRowCount(len(projects))
+                for row, project in enumerate(projects):
+                    name_item = QTableWidgetItem(project['name'])
+                    name_item.setData(Qt.ItemDataRole.UserRole, project['id'])
+                    self.table.setItem(row, 0, name_item)
+
+                    self.table.setItem(row, 1, QTableWidgetItem(project.get('description', '')))
+                    self.table.setItem(row, 2, QTableWidgetItem(project.get('status', 'Aktiv')))
+                    self.table.setItem(row, 3, QTableWidgetItem(str(len(project.get('boq_ids', [])))))
+
+                    updated_at = project.get('updated_at')
+                    if updated_at and hasattr(updated_at, 'astimezone'):
+                        date_str = updated_at.astimezone(local_tz).strftime("%d.%m.%Y %H:%M")
+                    else:
+                        date_str = "N/A"
+                    self.table.setItem(row, 4, QTableWidgetItem(date_str))
 
             self.summary_label.setText(f"Cəmi {len(projects)} layihə tapıldı")
 
         except Exception as e:
             QMessageBox.critical(self, "Xəta", f"Layihələr yüklənərkən xəta:\n{str(e)}")
 
+    def closeEvent(self, event):
+        # Let a running project query finish before the window goes away;
+        # quit first, as the worker's finished->quit is queued to this thread
+        self._load_pending = False
+        if self._load_thread is not None:
+            self._load_thread.quit()
+            self._load_thread.wait()
+            self._load_thread = None
+            self._load_worker = None
+        super().closeEvent(event)
+
     def create_project(self):
         """Create a new project"""
         if not self.db:
@@ -246,7 +303,6 @@ class ProjectWindow(QMainWindow):
         desc_input.setMaximumHeight(100)
         layout.addRow("Təsvir:", desc_input)
 
-        from PyQt6.QtWidgets import QComboBox
         status_combo = QComboBox()
         status_combo.addItems(["Aktiv", "Gözləmədə", "Tamamlandı", "Ləğv edildi"])
         layout.addRow("Status:", status_combo)
@@ -306,7 +362,6 @@ class ProjectWindow(QMainWindow):
         desc_input.setMaximumHeight(100)
         layout.addRow("Təsvir:", desc_input)
 
-        from PyQt6.QtWidgets import QComboBox
         status_combo = QComboBox()
         status_combo.addItems(["Aktiv", "Gözləmədə", "Tamamlandı", "Ləğv edildi"])
         current_status = project.get('status', 'Aktiv')
@@ -410,28 +465,31 @@ class ProjectWindow(QMainWindow):
 
         total_project_amount = 0
 
-        for boq_id in boq_ids:
-            try:
-                boq = self.db.load_boq_from_cloud(boq_id)
-                if boq:
-                    row = boq_table.rowCount()
-                    boq_table.insertRow(row)
-
-                    name_item = QTableWidgetItem(boq['name'])
-                    name_item.setData(Qt.ItemDataRole.UserRole, boq_id)
-                    boq_table.setItem(row, 0, name_item)
-
-                    items = boq.get('items', [])
-                    boq_table.setItem(row, 1, QTableWidgetItem(str(len(items))))
-
-                    boq_total = sum(
-                        item.get('total', 0) * (1 + item.get('margin_percent', 0) / 100)
-                        for item in items
-                    )
-                    total_project_amount += boq_total
-                    boq_table.setItem(row, 2, QTableWidgetItem(f"{boq_total:.2f} AZN"))
-            except Exception:
-                pass
+        try:
+            # One query for all BoQs, only the fields shown here
+            boqs = self.db.get_boqs_by_ids(
+                boq_ids,
+                projection={'name': 1, 'items.total': 1, 'items.margin_percent': 1}
+            )
+        except Exception:
+            boqs = []
+
+        # Size the table once instead of inserting row by row
+        boq_table.setRowCount(len(boqs))
+        for row, boq in enumerate(boqs):
+            name_item = QTableWidgetItem(boq['name'])
+            name_item.setData(Qt.ItemDataRole.UserRole, boq['id'])
+            boq_table.setItem(row, 0, name_item)
+
+            items = boq.get('items', [])
+            boq_table.setItem(row, 1, QTableWidgetItem(str(len(items))))
+
+            boq_total = sum(
+                item.get('total', 0) * (1 + item.get('margin_percent', 0) / 100)
+                for item in items
+            )
+            total_project_amount += boq_total
+            boq_table.setItem(row, 2, QTableWidgetItem(f"{boq_total:.2f} AZN"))
 
         layout.addWidget(boq_table)
 
@@ -516,19 +574,18 @@ class ProjectWindow(QMainWindow):
             header.setSectionResizeMode(1, QHeaderView.ResizeMode.ResizeToContents)
             header.setSectionResizeMode(2, QHeaderView.ResizeMode.ResizeToContents)
 
-            for boq in available_boqs:
-                row = boq_table.rowCount()
-                boq_table.insertRow(row)
-
+            boq_table.setRowCount(len(available_boqs))
+            local_tz = datetime.now().astimezone().tzinfo
+            for row, boq in enumerate(available_boqs):
                 name_item = QTableWidgetItem(boq['name'])
                 name_item.setData(Qt.ItemDataRole.UserRole, boq['id'])
                 boq_table.setItem(row, 0, name_item)
 
-                boq_table.setItem(row, 1, QTableWidgetItem(str(len(boq.get('items', [])))))
+                boq_table.setItem(row, 1, QTableWidgetItem(str(boq['items_count'])))
 
                 updated_at = boq.get('updated_at')
                 if updated_at and hasattr(updated_at, 'astimezone'):
-                    date_str = updated_at.astimezone().strftime("%d.%m.%Y")
+                    date_str = updated_at.astimezone(local_tz).strftime("%d.%m.%Y")
                 else:
                     date_str = "N/A"
                 boq_table.setItem(row, 2, QTableWidgetItem(date_str))
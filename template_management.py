@@ -9,7 +9,7 @@ import ast
 import math
 import re
 
-from dialogs import TemplateItemDialog, ProductSelectionDialog, _parse_calc_text
+from dialogs import TemplateItemDialog, ProductSelectionDialog, _parse_calc_text, _frozen_table
 
 
 def _extract_expr_names(expr):
@@ -236,23 +236,49 @@ class TemplateManagementWindow(QDialog):
         self.refresh_template_list()
 
     def refresh_template_list(self):
-        """Refresh the template list from database"""
+        """Refresh the template list from database.
+
+        Rows carry only the template id, name and item count; a template's
+        items are fetched by on_template_selected when it is clicked.
+        """
         self.template_list.setRowCount(0)
 
         try:
-            templates = self.db.get_all_templates()
-            for template in templates:
-                row = self.template_list.rowCount()
-                self.template_list.insertRow(row)
-
-                name_item = QTableWidgetItem(template['name'])
-                name_item.setData(Qt.ItemDataRole.UserRole, template['id'])
-                self.template_list.setItem(row, 0, name_item)
-
-                item_count = len(template.get('items', []))
-                self.template_list.setItem(row, 1, QTableWidgetItem(str(item_count)))
+            templates = self.db.get_all_templates_summary()
         except Exception as e:
             print(f"Error loading templates: {e}")
+            return
+
+        # Size the table once and fill it without per-row repaints/signals
+        with _frozen_table(self.template_list):
+            self.template_list.setRowCount(len(templates))
+            for row, template in enumerate(templates):
+                self._set_template_row(row, template['id'], template['name'],
+                                       template['item_count'])
+
+    def _set_template_row(self, row, template_id, name, item_count):
+        """Set the cells of one template list row"""
+        name_item = QTableWidgetItem(name)
+        name_item.setData(Qt.ItemDataRole.UserRole, template_id)
+        self.template_list.setItem(row, 0, name_item)
+        self.template_list.setItem(row, 1, QTableWidgetItem(str(item_count)))
+
+    def _find_template_row(self, template_id):
+        """Return the template list row holding template_id, or -1"""
+        for row in range(self.template_list.rowCount()):
+            item = self.template_list.item(row, 0)
+            if item and item.data(Qt.ItemDataRole.UserRole) == template_id:
+                return row
+        return -1
+
+    def _upsert_template_row(self, template_id, name, item_count):
+        """Update a saved template's row in place, or add it at the top (newest first)"""
+        row = self._find_template_row(template_id)
+        if row < 0:
+            row = 0
+            self.template_list.insertRow(row)
+        self._set_template_row(row, template_id, name, item_count)
+        return row
 
     def on_template_selected(self):
         """Load selected template into editor"""
@@ -264,6 +290,7 @@ class TemplateManagementWindow(QDialog):
         template_name = self.template_list.item(selected_row, 0).text()
 
         try:
+            # The list holds no item payloads; load this template's items now
             template = self.db.load_template(template_id)
             if template:
                 self.current_template_id = template_id
@@ -275,40 +302,43 @@ class TemplateManagementWindow(QDialog):
 
     def refresh_items_table(self):
         """Refresh the items table"""
-        self.items_table.setRowCount(0)
-
-        for item in self.template_items:
-            row = self.items_table.rowCount()
-            self.items_table.insertRow(row)
-
-            self.items_table.setItem(row, 0, QTableWidgetItem(item.get('generic_name', item.get('name', ''))))
-            self.items_table.setItem(row, 1, QTableWidgetItem(item.get('var_name', '') or ''))
-            amount_expr = item.get('amount_expr')
-            if amount_expr is None:
-                amount_expr = item.get('amount', 1)
-            self.items_table.setItem(row, 2, QTableWidgetItem(str(amount_expr)))
-            self.items_table.setItem(row, 3, QTableWidgetItem(item.get('unit', '')))
-
-            price_expr = item.get('price_expr', '')
-            default_price = item.get('default_price', item.get('unit_price', 0))
-            currency = item.get('currency', 'AZN') or 'AZN'
-            default_price_azn = item.get('default_price_azn')
-            if price_expr:
-                price_text = price_expr
-            elif item.get('product_id'):
-                price_text = "DB qiyməti"
+        # Size the table once and fill it without per-row repaints/signals
+        with _frozen_table(self.items_table):
+            self.items_table.setRowCount(0)
+            self.items_table.setRowCount(len(self.template_items))
+            for row, item in enumerate(self.template_items):
+                self._fill_items_row(row, item)
+
+    def _fill_items_row(self, row, item):
+        """Set the cells of one items table row"""
+        self.items_table.setItem(row, 0, QTableWidgetItem(item.get('generic_name', item.get('name', ''))))
+        self.items_table.setItem(row, 1, QTableWidgetItem(item.get('var_name', '') or ''))
+        amount_expr = item.get('amount_expr')
+        if amount_expr is None:
+            amount_expr = item.get('amount', 1)
+        self.items_table.setItem(row, 2, QTableWidgetItem(str(amount_expr)))
+        self.items_table.setItem(row, 3, QTableWidgetItem(item.get('unit', '')))
+
+        price_expr = item.get('price_expr', '')
+        default_price = item.get('default_price', item.get('unit_price', 0))
+        currency = item.get('currency', 'AZN') or 'AZN'
+        default_price_azn = item.get('default_price_azn')
+        if price_expr:
+            price_text = price_expr
+        elif item.get('product_id'):
+            price_text = "DB qiyməti"
+        else:
+            if default_price_azn is None:
+                default_price_azn = default_price if currency == 'AZN' else 0
+            if currency == "AZN":
+                price_text = f"{default_price:.2f} AZN"
             else:
-                if default_price_azn is None:
-                    default_price_azn = default_price if currency == 'AZN' else 0
-                if currency == "AZN":
-                    price_text = f"{default_price:.2f} AZN"
-                else:
-                    price_text = f"AZN {default_price_azn:.2f} ({default_price:.2f} {currency})"
-            self.items_table.setItem(row, 4, QTableWidgetItem(price_text))
+                price_text = f"AZN {default_price_azn:.2f} ({default_price:.2f} {currency})"
+        self.items_table.setItem(row, 4, QTableWidgetItem(price_text))
 
-            # Type: Generic or DB-linked
-            item_type = "DB" if item.get('product_id') else "Generik"
-            self.items_table.setItem(row, 5, QTableWidgetItem(item_type))
+        # Type: Generic or DB-linked
+        item_type = "DB" if item.get('product_id') else "Generik"
+        self.items_table.setItem(row, 5, QTableWidgetItem(item_type))
 
     def create_new_template(self):
         """Create a new empty template"""
@@ -337,7 +367,7 @@ class TemplateManagementWindow(QDialog):
         if reply == QMessageBox.StandardButton.Yes:
             try:
                 self.db.delete_template(template_id)
-                self.refresh_template_list()
+                self.template_list.removeRow(selected_row)
                 if self.current_template_id == template_id:
                     self.create_new_template()
                 QMessageBox.information(self, "Uğurlu", "Şablon silindi!")
@@ -459,28 +489,9 @@ class TemplateManagementWindow(QDialog):
                     return
                 used_vars[key] = True
 
-            # Convert items format for saving
-            items_to_save = []
-            for item in self.template_items:
-                items_to_save.append({
-                    'generic_name': item.get('generic_name', ''),
-                    'name': item.get('name', item.get('generic_name', '')),
-                    'var_name': item.get('var_name', ''),
-                    'amount_expr': item.get('amount_expr', '1'),
-                    'price_expr': item.get('price_expr', ''),
-                    'amount_round': bool(item.get('amount_round')),
-                    'price_round': bool(item.get('price_round')),
-                    'unit': item.get('unit', ''),
-                    'default_price': item.get('default_price', 0),
-                    'currency': item.get('currency', 'AZN') or 'AZN',
-                    'default_price_azn': item.get('default_price_azn'),
-                    'product_id': item.get('product_id'),
-                    'category': item.get('category', ''),
-                    'is_generic': not bool(item.get('product_id'))
-                })
-
-            self.db.save_template(template_name, items_to_save)
-            self.refresh_template_list()
+            # save_template() builds the stored item documents itself
+            template_id = self.db.save_template(template_name, self.template_items)
+            self._upsert_template_row(template_id, template_name, len(self.template_items))
             QMessageBox.information(self, "Uğurlu", f"Şablon '{template_name}' olaraq saxlanıldı!")
         except Exception as e:
             QMessageBox.critical(self, "Xəta", f"Şablon saxlanılarkən xəta: {str(e)}")
@@ -503,8 +514,8 @@ class TemplateManagementWindow(QDialog):
 
             new_name = self._generate_copy_name(template_name)
             items = template.get('items', [])
-            self.db.save_template(new_name, items)
-            self.refresh_template_list()
+            new_id = self.db.save_template(new_name, items)
+            self._upsert_template_row(new_id, new_name, len(items))
             self._select_template_by_name(new_name)
             QMessageBox.information(self, "Uğurlu", f"Şablon '{new_name}' olaraq kopyalandı!")
         except Exception as e:
@@ -540,9 +551,11 @@ class TemplateManagementWindow(QDialog):
                 return
 
             items = template.get('items', [])
-            self.db.save_template(new_name, items)
+            new_id = self.db.save_template(new_name, items)
             self.db.delete_template(template_id)
-            self.refresh_template_list()
+            self.template_list.removeRow(self._find_template_row(template_id))
+            if new_id != template_id:
+                self._upsert_template_row(new_id, new_name, len(items))
             self._select_template_by_name(new_name)
             QMessageBox.information(self, "Uğurlu", f"Şablon '{new_name}' olaraq dəyişdirildi!")
         except Exception as e:
@@ -550,7 +563,7 @@ class TemplateManagementWindow(QDialog):
 
     def _generate_copy_name(self, base_name):
         try:
-            templates = self.db.get_all_templates()
+            templates = self.db.get_all_templates_summary()
         except Exception:
             templates = []
         existing = {t.get('name', '') for t in templates}
@@ -659,6 +672,16 @@ class TemplateManagementWindow(QDialog):
                         price_value = float(math.ceil(price_value))
             resolved[idx]['price'] = price_value
 
+        # Current data of every DB-linked product in one $in query,
+        # shared by all items that reference the same product
+        linked_ids = [
+            template_item['product_id'] for template_item in self.template_items
+            if not template_item.get('is_generic') and template_item.get('product_id')
+        ]
+        products_by_id = (
+            self.db.read_products_bulk(linked_ids, self.db.LIST_PROJECTION) if linked_ids else {}
+        )
+
         # Process each template item
         items_added = 0
         skip_remaining_generic = False
@@ -709,8 +732,8 @@ class TemplateManagementWindow(QDialog):
                     self.boq_window.next_id += 1
                     items_added += 1
             else:
-                # DB-linked item - get current data from DB
-                product = self.db.read_product(template_item.get('product_id'))
+                # DB-linked item - current data fetched above
+                product = products_by_id.get(str(template_item.get('product_id')))
                 if product:
                     currency = product.get('currency', 'AZN') or 'AZN'
                     if price_override is not None: